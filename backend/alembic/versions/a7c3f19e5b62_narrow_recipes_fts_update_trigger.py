@@ -0,0 +1,54 @@
+"""narrow_recipes_fts_update_trigger
+
+Revision ID: a7c3f19e5b62
+Revises: f4b8e2d71a3c
+Create Date: 2026-02-23 10:05:00.000000
+
+SQLite: recipes_fts_au only fires when an indexed column (title_lower /
+ingredients_lower) is updated, so view count / popularity writes do not
+re-index the recipe in recipes_fts.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7c3f19e5b62"
+down_revision = "f4b8e2d71a3c"
+branch_labels = None
+depends_on = None
+
+
+def _has_fts_trigger(connection):
+    return connection.execute(sa.text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'recipes_fts_au'"
+    )).first() is not None
+
+
+def _create_trigger(update_of):
+    op.execute(
+        f"CREATE TRIGGER recipes_fts_au AFTER UPDATE{update_of} ON recipes BEGIN "
+        "INSERT INTO recipes_fts(recipes_fts, rowid, title_lower, ingredients_lower) "
+        "VALUES ('delete', old.id, old.title_lower, old.ingredients_lower); "
+        "INSERT INTO recipes_fts(rowid, title_lower, ingredients_lower) "
+        "VALUES (new.id, new.title_lower, new.ingredients_lower); "
+        "END"
+    )
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    # FTS5 table only exists on SQLite 3.34+ (see c52e7a1f0b93)
+    if connection.dialect.name != "sqlite" or not _has_fts_trigger(connection):
+        return
+    op.execute("DROP TRIGGER recipes_fts_au")
+    _create_trigger(" OF title_lower, ingredients_lower")
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    if connection.dialect.name != "sqlite" or not _has_fts_trigger(connection):
+        return
+    op.execute("DROP TRIGGER recipes_fts_au")
+    _create_trigger("")
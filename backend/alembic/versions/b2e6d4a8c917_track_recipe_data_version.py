@@ -0,0 +1,81 @@
+"""track_recipe_data_version
+
+Revision ID: b2e6d4a8c917
+Revises: a7c3f19e5b62
+Create Date: 2026-02-23 10:40:00.000000
+
+data_versions counter 'recipes': bumped on recipe inserts / deletes, title or
+available_ingredients updates and any recipe_ingredients write, so the
+RecipeRepository in other processes rebuilds its derived indices after
+in-place edits (see db/data_versions.py).
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b2e6d4a8c917"
+down_revision = "a7c3f19e5b62"
+branch_labels = None
+depends_on = None
+
+# Kept here so the migration does not change if db/data_versions.py does
+TRACKED = [
+    ("recipes", ("title", "available_ingredients")),
+    ("recipe_ingredients", None),
+]
+
+
+def _sqlite_triggers(table, columns):
+    bump = "BEGIN UPDATE data_versions SET version = version + 1 WHERE name = 'recipes'; END"
+    update_of, when = "", ""
+    if columns:
+        update_of = " OF " + ", ".join(columns)
+        when = " WHEN " + " OR ".join(f"old.{c} IS NOT new.{c}" for c in columns)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_version_ai AFTER INSERT ON {table} {bump}",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_version_ad AFTER DELETE ON {table} {bump}",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_version_au AFTER UPDATE{update_of} ON {table}{when} {bump}",
+    ]
+
+
+def _pg_triggers(table, columns):
+    update_of, when = "", ""
+    if columns:
+        update_of = " OF " + ", ".join(columns)
+        when = " WHEN (" + " OR ".join(f"OLD.{c} IS DISTINCT FROM NEW.{c}" for c in columns) + ")"
+    return [
+        f"CREATE TRIGGER {table}_version_aid AFTER INSERT OR DELETE ON {table} "
+        "FOR EACH STATEMENT EXECUTE PROCEDURE bump_data_version('recipes')",
+        f"CREATE TRIGGER {table}_version_au AFTER UPDATE{update_of} ON {table} "
+        f"FOR EACH ROW{when} EXECUTE PROCEDURE bump_data_version('recipes')",
+    ]
+
+
+def upgrade() -> None:
+    op.execute("INSERT INTO data_versions (name, version) VALUES ('recipes', 0)")
+
+    dialect = op.get_bind().dialect.name
+    for table, columns in TRACKED:
+        if dialect == "postgresql":
+            statements = _pg_triggers(table, columns)
+        elif dialect == "sqlite":
+            statements = _sqlite_triggers(table, columns)
+        else:
+            statements = []
+        for statement in statements:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table, _ in TRACKED:
+        if dialect == "postgresql":
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_version_au ON {table}")
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_version_aid ON {table}")
+        elif dialect == "sqlite":
+            for suffix in ("au", "ad", "ai"):
+                op.execute(f"DROP TRIGGER IF EXISTS {table}_version_{suffix}")
+
+    op.execute("DELETE FROM data_versions WHERE name = 'recipes'")
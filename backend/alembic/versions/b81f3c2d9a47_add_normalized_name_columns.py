@@ -0,0 +1,104 @@
+"""add_normalized_name_columns
+
+Revision ID: b81f3c2d9a47
+Revises: e4d5cb9f867f
+Create Date: 2026-02-02 10:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b81f3c2d9a47"
+down_revision = "e4d5cb9f867f"
+branch_labels = None
+depends_on = None
+
+# Rows per executemany batch of the backfill
+BACKFILL_BATCH_SIZE = 1000
+
+# Same mapping as SearchEngine.normalize_turkish (kept here so the migration
+# does not change if the application code does)
+TURKISH_CHAR_MAP = str.maketrans("ığüşöç", "igusoc")
+
+
+def _lower(text):
+    return text.lower() if text else text
+
+
+def _normalized(text):
+    # "İ".lower() is "i" + combining dot
+    return text.lower().translate(TURKISH_CHAR_MAP).replace("i\u0307", "i") if text else text
+
+
+def _backfill(connection, table, rows, values):
+    """UPDATE table SET values(row) WHERE id = row.id, executemany in batches"""
+    if not rows:
+        return
+    statement = (
+        table.update()
+        .where(table.c.id == sa.bindparam("row_id"))
+        .values({name: sa.bindparam(name) for name in values(rows[0])})
+    )
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        batch = rows[start:start + BACKFILL_BATCH_SIZE]
+        connection.execute(statement, [dict(values(row), row_id=row.id) for row in batch])
+
+
+def upgrade() -> None:
+    op.add_column("ingredients", sa.Column("name_lower", sa.String(length=255), nullable=True))
+    op.add_column("ingredients", sa.Column("name_normalized", sa.String(length=255), nullable=True))
+    op.create_index(op.f("ix_ingredients_name_normalized"), "ingredients", ["name_normalized"], unique=False)
+
+    op.add_column("recipes", sa.Column("title_lower", sa.String(length=255), nullable=True))
+    op.add_column("recipes", sa.Column("title_normalized", sa.String(length=255), nullable=True))
+    op.add_column("recipes", sa.Column("ingredients_lower", sa.Text(), nullable=True))
+    op.add_column("recipes", sa.Column("ingredients_normalized", sa.Text(), nullable=True))
+
+    # Backfill existing rows
+    connection = op.get_bind()
+
+    ingredients = sa.table(
+        "ingredients",
+        sa.column("id", sa.Integer),
+        sa.column("name", sa.String),
+        sa.column("name_lower", sa.String),
+        sa.column("name_normalized", sa.String),
+    )
+    rows = connection.execute(sa.select(ingredients.c.id, ingredients.c.name)).fetchall()
+    _backfill(connection, ingredients, rows, lambda row: {
+        "name_lower": _lower(row.name),
+        "name_normalized": _normalized(row.name),
+    })
+
+    recipes = sa.table(
+        "recipes",
+        sa.column("id", sa.Integer),
+        sa.column("title", sa.String),
+        sa.column("available_ingredients", sa.Text),
+        sa.column("title_lower", sa.String),
+        sa.column("title_normalized", sa.String),
+        sa.column("ingredients_lower", sa.Text),
+        sa.column("ingredients_normalized", sa.Text),
+    )
+    rows = connection.execute(
+        sa.select(recipes.c.id, recipes.c.title, recipes.c.available_ingredients)
+    ).fetchall()
+    _backfill(connection, recipes, rows, lambda row: {
+        "title_lower": _lower(row.title),
+        "title_normalized": _normalized(row.title),
+        "ingredients_lower": _lower(row.available_ingredients),
+        "ingredients_normalized": _normalized(row.available_ingredients),
+    })
+
+
+def downgrade() -> None:
+    op.drop_column("recipes", "ingredients_normalized")
+    op.drop_column("recipes", "ingredients_lower")
+    op.drop_column("recipes", "title_normalized")
+    op.drop_column("recipes", "title_lower")
+
+    op.drop_index(op.f("ix_ingredients_name_normalized"), table_name="ingredients")
+    op.drop_column("ingredients", "name_normalized")
+    op.drop_column("ingredients", "name_lower")
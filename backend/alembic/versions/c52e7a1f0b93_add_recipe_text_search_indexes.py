@@ -0,0 +1,95 @@
+"""add_recipe_text_search_indexes
+
+Revision ID: c52e7a1f0b93
+Revises: b81f3c2d9a47
+Create Date: 2026-02-09 14:40:00.000000
+
+PostgreSQL: pg_trgm extension + GIN trigram indexes on the lowercase columns
+SQLite: FTS5 trigram table recipes_fts kept in sync with triggers
+(see db/text_search.py)
+
+"""
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c52e7a1f0b93"
+down_revision = "b81f3c2d9a47"
+branch_labels = None
+depends_on = None
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# FTS5 trigram tokenizer requires SQLite 3.34+
+SQLITE_TRIGRAM_MIN_VERSION = (3, 34, 0)
+
+
+def _sqlite_version(connection):
+    version = connection.execute(sa.text("SELECT sqlite_version()")).scalar()
+    return tuple(int(part) for part in version.split("."))
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+    dialect = connection.dialect.name
+
+    if dialect == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        op.create_index(
+            "ix_recipes_title_lower_trgm", "recipes", ["title_lower"],
+            postgresql_using="gin", postgresql_ops={"title_lower": "gin_trgm_ops"}
+        )
+        op.create_index(
+            "ix_recipes_ingredients_lower_trgm", "recipes", ["ingredients_lower"],
+            postgresql_using="gin", postgresql_ops={"ingredients_lower": "gin_trgm_ops"}
+        )
+
+    elif dialect == "sqlite":
+        if _sqlite_version(connection) < SQLITE_TRIGRAM_MIN_VERSION:
+            logger.warning("SQLite < 3.34: FTS5 trigram tokenizer yok, recipe text search LIKE kullanacak")
+            return
+
+        op.execute(
+            "CREATE VIRTUAL TABLE recipes_fts USING fts5("
+            "title_lower, ingredients_lower, "
+            "content='recipes', content_rowid='id', tokenize='trigram')"
+        )
+        op.execute(
+            "CREATE TRIGGER recipes_fts_ai AFTER INSERT ON recipes BEGIN "
+            "INSERT INTO recipes_fts(rowid, title_lower, ingredients_lower) "
+            "VALUES (new.id, new.title_lower, new.ingredients_lower); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER recipes_fts_ad AFTER DELETE ON recipes BEGIN "
+            "INSERT INTO recipes_fts(recipes_fts, rowid, title_lower, ingredients_lower) "
+            "VALUES ('delete', old.id, old.title_lower, old.ingredients_lower); "
+            "END"
+        )
+        op.execute(
+            "CREATE TRIGGER recipes_fts_au AFTER UPDATE ON recipes BEGIN "
+            "INSERT INTO recipes_fts(recipes_fts, rowid, title_lower, ingredients_lower) "
+            "VALUES ('delete', old.id, old.title_lower, old.ingredients_lower); "
+            "INSERT INTO recipes_fts(rowid, title_lower, ingredients_lower) "
+            "VALUES (new.id, new.title_lower, new.ingredients_lower); "
+            "END"
+        )
+        op.execute("INSERT INTO recipes_fts(recipes_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    dialect = connection.dialect.name
+
+    if dialect == "postgresql":
+        op.drop_index("ix_recipes_ingredients_lower_trgm", table_name="recipes")
+        op.drop_index("ix_recipes_title_lower_trgm", table_name="recipes")
+
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS recipes_fts_au")
+        op.execute("DROP TRIGGER IF EXISTS recipes_fts_ad")
+        op.execute("DROP TRIGGER IF EXISTS recipes_fts_ai")
+        op.execute("DROP TABLE IF EXISTS recipes_fts")
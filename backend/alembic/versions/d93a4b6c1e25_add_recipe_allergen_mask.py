@@ -0,0 +1,28 @@
+"""add_recipe_allergen_mask
+
+Revision ID: d93a4b6c1e25
+Revises: c52e7a1f0b93
+Create Date: 2026-02-16 11:20:00.000000
+
+recipes.allergen_mask: one bit per allergen category (utils.allergen_mapping
+ALLERGEN_BITS) found in available_ingredients. NULL = not computed yet; filled
+by the ORM on insert/update and by scripts/seed_database.py for existing rows.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d93a4b6c1e25"
+down_revision = "c52e7a1f0b93"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("recipes", sa.Column("allergen_mask", sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("recipes", "allergen_mask")
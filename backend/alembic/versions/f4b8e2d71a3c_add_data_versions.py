@@ -0,0 +1,85 @@
+"""add_data_versions
+
+Revision ID: f4b8e2d71a3c
+Revises: d93a4b6c1e25
+Create Date: 2026-02-23 09:30:00.000000
+
+data_versions: per-table change counter bumped by triggers on every insert /
+delete and on content updates, so in-memory catalogs in other processes see
+in-place edits (see db/data_versions.py). Counter 'ingredients' tracks the
+ingredients table (name + nutrition columns).
+
+PostgreSQL: plpgsql function bump_data_version() + triggers
+SQLite: triggers
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f4b8e2d71a3c"
+down_revision = "d93a4b6c1e25"
+branch_labels = None
+depends_on = None
+
+# Kept here so the migration does not change if db/data_versions.py does
+INGREDIENT_COLUMNS = ("name", "portion_g", "calories", "fat_g", "carbs_g", "protein_g", "sugar_g", "fiber_g")
+
+
+def _sqlite_triggers(name, table, columns):
+    bump = f"BEGIN UPDATE data_versions SET version = version + 1 WHERE name = '{name}'; END"
+    update_of = " OF " + ", ".join(columns)
+    when = " WHEN " + " OR ".join(f"old.{c} IS NOT new.{c}" for c in columns)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {table}_version_ai AFTER INSERT ON {table} {bump}",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_version_ad AFTER DELETE ON {table} {bump}",
+        f"CREATE TRIGGER IF NOT EXISTS {table}_version_au AFTER UPDATE{update_of} ON {table}{when} {bump}",
+    ]
+
+
+def _pg_triggers(name, table, columns):
+    update_of = " OF " + ", ".join(columns)
+    when = " WHEN (" + " OR ".join(f"OLD.{c} IS DISTINCT FROM NEW.{c}" for c in columns) + ")"
+    return [
+        f"CREATE TRIGGER {table}_version_aid AFTER INSERT OR DELETE ON {table} "
+        f"FOR EACH STATEMENT EXECUTE PROCEDURE bump_data_version('{name}')",
+        f"CREATE TRIGGER {table}_version_au AFTER UPDATE{update_of} ON {table} "
+        f"FOR EACH ROW{when} EXECUTE PROCEDURE bump_data_version('{name}')",
+    ]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "data_versions",
+        sa.Column("name", sa.String(length=50), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    op.execute("INSERT INTO data_versions (name, version) VALUES ('ingredients', 0)")
+
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute(
+            "CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$ "
+            "BEGIN UPDATE data_versions SET version = version + 1 WHERE name = TG_ARGV[0]; "
+            "RETURN NULL; END; $$ LANGUAGE plpgsql"
+        )
+        for statement in _pg_triggers("ingredients", "ingredients", INGREDIENT_COLUMNS):
+            op.execute(statement)
+    elif dialect == "sqlite":
+        for statement in _sqlite_triggers("ingredients", "ingredients", INGREDIENT_COLUMNS):
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS ingredients_version_au ON ingredients")
+        op.execute("DROP TRIGGER IF EXISTS ingredients_version_aid ON ingredients")
+        op.execute("DROP FUNCTION IF EXISTS bump_data_version()")
+    elif dialect == "sqlite":
+        op.execute("DROP TRIGGER IF EXISTS ingredients_version_au")
+        op.execute("DROP TRIGGER IF EXISTS ingredients_version_ad")
+        op.execute("DROP TRIGGER IF EXISTS ingredients_version_ai")
+
+    op.drop_table("data_versions")
@@ -57,6 +57,26 @@ async def get_ingredient_names(service: IngredientService = Depends(get_ingredie
     """Tüm malzeme isimlerini getir (autocomplete için)"""
     return service.get_ingredient_names()
 
+@router.get("/autocomplete", response_model=IngredientSearchResponse)
+async def autocomplete_ingredients(
+    q: str = Query(..., min_length=1, description="Yazılan önek"),
+    limit: int = Query(10, ge=1, le=50, description="Sonuç limiti (en fazla INGREDIENT_AUTOCOMPLETE_TOP_K)"),
+    service: IngredientService = Depends(get_ingredient_service)
+):
+    """
+    Malzeme autocomplete (her tuş vuruşu için)
+    - **q**: Yazılan önek (isim veya kelime başı, Türkçe karaktersiz de olur: "sut" -> "Süt")
+    - **limit**: Maksimum sonuç sayısı
+
+    Önceden hesaplanmış prefix trie kullanır, DB'ye gitmez.
+    """
+    results = service.autocomplete(q, limit)
+    return IngredientSearchResponse(
+        results=results,
+        total=len(results),
+        query=q
+    )
+
 @router.get("/{name}", response_model=Ingredient)
 async def get_ingredient_by_name(name: str, service: IngredientService = Depends(get_ingredient_service)):
     """İsme göre malzeme detayını getir"""
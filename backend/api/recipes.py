@@ -10,13 +10,14 @@ from models.recipe import (
     RecipeRecommendationResponse
 )
 from services.recipe_service import RecipeService, ensure_image_url, get_default_image_url
+from services.recipe_repository import get_recipe_repository
 from db.base import get_db
 
 router = APIRouter()
 
 def get_recipe_service(db: Session = Depends(get_db)) -> RecipeService:
-    """Get recipe service with DB session"""
-    return RecipeService(db=db)
+    """Per-request recipe service view over the shared repository"""
+    return RecipeService(db=db, repository=get_recipe_repository())
 
 @router.get("/filter", response_model=List[Recipe])
 async def filter_recipes(
@@ -46,12 +47,16 @@ async def get_recipe_recommendations(
 ):
     """
     Malzemelere göre tarif önerileri getir
-    - **ingredients**: Buzdolabındaki malzemeler
+    - **ingredients**: Buzdolabındaki malzemeler; tarif malzemesinin kendisi
+      ya da tam kelime olarak başı eşleşir ("tavuk" -> "tavuk göğsü")
     - **dietary_preferences**: Diyet tercihleri (opsiyonel)
     - **max_cooking_time**: Maksimum pişirme süresi (dakika)
     - **max_calories**: Maksimum kalori
     - **limit**: Sonuç limiti
     - **user_context**: Kullanıcı bağlamı (alerjenler, tercihler, vs.)
+    - **max_missing**: Verilirse sadece en fazla bu kadar eksik malzemesi olan
+      tarifler (0 = eldeki malzemelerle tamamen pişirilebilir)
+    - **match_all**: Sadece verilen malzemelerin hepsini kullanan tarifler
     """
     recipes, matched_ingredients = service.get_recipe_recommendations(
         ingredients=request.ingredients,
@@ -59,7 +64,9 @@ async def get_recipe_recommendations(
         max_cooking_time=request.max_cooking_time,
         max_calories=request.max_calories,
         limit=request.limit,
-        user_context=request.user_context
+        user_context=request.user_context,
+        max_missing=request.max_missing,
+        match_all=request.match_all
     )
     
     # Response oluşturulmadan önce image_url kontrolü
@@ -1,6 +1,9 @@
 """
 Semantic search and RAG API endpoints
 """
+import logging
+import threading
+import time
 from fastapi import APIRouter, Query, Depends, HTTPException
 from typing import Optional, List, Dict, Any
 from pydantic import BaseModel
@@ -11,9 +14,12 @@ from services.rag_service import RAGService
 from services.llm_service import OllamaLLMService
 from services.cache_service import get_cache
 from models.ingredient import Ingredient
+from models.recipe import RecipeSearchResult
 from models.user_context import UserContext
+from config import settings
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 # === Request/Response Models ===
@@ -33,18 +39,9 @@ class SemanticSearchResponse(BaseModel):
     explanation: Optional[str] = None
 
 
-class RecipeSearchResult(BaseModel):
-    """Recipe search result"""
-    id: int
-    title: str
-    ingredients: List[str]
-    similarity_score: float
-    popularity_score: float
-
-
 class RecipeSearchResponse(BaseModel):
     """Recipe search response"""
-    recipes: List[Dict[str, Any]]
+    recipes: List[RecipeSearchResult]
     total: int
     query: str
     latency_ms: float
@@ -80,14 +77,74 @@ _semantic_service = None
 _rag_service = None
 _llm_service = None
 
+# Semantic service loading: not_started → loading → ready | failed
+RETRY_AFTER_SECONDS = 5
+_semantic_state = {"status": "not_started", "error": None, "load_seconds": None}
+_semantic_lock = threading.Lock()
+
 
-def get_semantic_service(db: Session = Depends(get_db)) -> SemanticSearchService:
-    """Get semantic search service"""
+def _load_semantic_service():
+    """Build the semantic service (model, FAISS indices, recipe data) off the request path"""
     global _semantic_service
+    start_time = time.time()
+    try:
+        service = SemanticSearchService()
+        if service.model is None:
+            raise RuntimeError("encoder model not loaded")
+    except Exception as e:
+        logger.exception(f"❌ Semantic service yüklenemedi: {e}")
+        with _semantic_lock:
+            _semantic_state.update(status="failed", error=str(e))
+        return
+
+    with _semantic_lock:
+        _semantic_service = service
+        _semantic_state.update(status="ready", error=None, load_seconds=round(time.time() - start_time, 1))
+    logger.info(f"✅ Semantic service hazır ({_semantic_state['load_seconds']}s)")
+
+
+def start_semantic_loading() -> bool:
+    """
+    Start loading the semantic service in a background thread
+
+    No-op while loading or once ready; a failed load is retried.
+
+    Returns:
+        True if a new load was started
+    """
+    with _semantic_lock:
+        if _semantic_state["status"] in ("loading", "ready"):
+            return False
+        _semantic_state.update(status="loading", error=None)
+
+    threading.Thread(target=_load_semantic_service, name="semantic-warmup", daemon=True).start()
+    return True
+
+
+def get_semantic_readiness() -> Dict[str, Any]:
+    """Semantic service loading state (for /health)"""
+    with _semantic_lock:
+        return {"ready": _semantic_state["status"] == "ready", **_semantic_state}
+
+
+def get_semantic_service() -> SemanticSearchService:
+    """
+    Get semantic search service
+
+    Until the background load has finished, answers 503 with Retry-After
+    instead of blocking the request (the first request starts the load if
+    startup warm-up is disabled).
+
+    The service is shared by all request threads, so it never holds a
+    request's DB session; endpoints pass their own session to it.
+    """
     if _semantic_service is None:
-        _semantic_service = SemanticSearchService(db=db)
-    else:
-        _semantic_service.db = db
+        start_semantic_loading()
+        raise HTTPException(
+            status_code=503,
+            detail="Semantic search is not ready yet, try again shortly",
+            headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+        )
     return _semantic_service
 
 
@@ -99,10 +156,10 @@ def get_llm_service() -> OllamaLLMService:
     return _llm_service
 
 
-def get_rag_service(db: Session = Depends(get_db)) -> RAGService:
+def get_rag_service() -> RAGService:
     """Get RAG service"""
     global _rag_service
-    semantic = get_semantic_service(db)
+    semantic = get_semantic_service()
     llm = get_llm_service()
     if _rag_service is None:
         _rag_service = RAGService(semantic_service=semantic, llm_service=llm)
@@ -115,14 +172,16 @@ def get_rag_service(db: Session = Depends(get_db)) -> RAGService:
 async def semantic_search(
     q: str = Query(..., description="Arama sorgusu"),
     limit: int = Query(10, ge=1, le=50, description="Sonuç limiti"),
-    service: SemanticSearchService = Depends(get_semantic_service)
+    min_similarity: Optional[float] = Query(None, ge=-1, le=1, description="Minimum cosine benzerliği"),
+    service: SemanticSearchService = Depends(get_semantic_service),
+    db: Session = Depends(get_db)
 ):
     """
     Semantic search for ingredients using embeddings
     """
     print(f"\n🧠 Semantic Ingredient Search: '{q}'")
 
-    search_results = service.search(q, limit)
+    search_results = service.search(q, limit, min_similarity=min_similarity, db=db)
 
     results = []
     for i, (ingredient, similarity) in enumerate(search_results):
@@ -148,9 +207,10 @@ async def semantic_search(
 # === Recipe Semantic Search ===
 
 @router.get("/recipes/search", response_model=RecipeSearchResponse)
-async def search_recipes(
+def search_recipes(
     q: str = Query(..., description="Arama sorgusu (Türkçe veya İngilizce)"),
     limit: int = Query(10, ge=1, le=50, description="Sonuç limiti"),
+    min_similarity: Optional[float] = Query(None, ge=-1, le=1, description="Minimum cosine benzerliği"),
     service: SemanticSearchService = Depends(get_semantic_service)
 ):
     """
@@ -158,13 +218,15 @@ async def search_recipes(
 
     Supports Turkish queries to find English recipes.
     Example: "tavuklu makarna" → finds Chicken Pasta recipes
+
+    Sync endpoint: runs in the threadpool, so concurrent requests reach the
+    service's micro-batcher together instead of queuing on the event loop.
     """
     print(f"\n🔍 Recipe Semantic Search: '{q}'")
 
-    import time
     start_time = time.time()
 
-    recipes = service.search_recipes(q, limit=limit)
+    recipes = service.search_recipes(q, limit=limit, min_similarity=min_similarity)
     latency_ms = (time.time() - start_time) * 1000
 
     return RecipeSearchResponse(
@@ -178,7 +240,7 @@ async def search_recipes(
 # === RAG Endpoint ===
 
 @router.post("/rag/ask", response_model=RAGResponse)
-async def rag_ask(
+def rag_ask(
     request: RAGRequest,
     rag_service: RAGService = Depends(get_rag_service)
 ):
@@ -263,6 +325,8 @@ async def track_recipe_view(
     base_score = recipe.get('popularity_score', 0.5)
     view_boost = min(0.1, recipe['view_count'] / 1000)  # Max 0.1 boost
     recipe['popularity_score'] = min(1.0, base_score + view_boost)
+    if service.recipe_store is not None:
+        service.recipe_store.set_popularity(recipe_id, recipe['popularity_score'])
 
     return {
         "recipe_id": recipe_id,
@@ -284,9 +348,15 @@ async def semantic_status(
     return {
         "semantic": {
             "model_loaded": service.model is not None,
+            "encoder_backend": service.model.backend if service.model else None,
             "ingredient_index": service.ingredient_index.ntotal if service.ingredient_index else 0,
             "recipe_index": service.recipe_index.ntotal if service.recipe_index else 0,
-            "recipes_loaded": len(service.recipes_data) if service.recipes_data else 0
+            "recipe_search_params": service.get_search_params(),
+            "index_mmap": settings.semantic_index_mmap,
+            "recipe_index_benchmark": service.recipe_index_benchmark,
+            "recipes_loaded": len(service.recipes_data) if service.recipes_data else 0,
+            "query_cache": service.query_cache_stats(),
+            "batching": service.recipe_batcher.stats() if service.recipe_batcher else None
         },
         "llm": {
             "available": llm.is_available(),
@@ -47,6 +47,39 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     
+    # Semantic Search
+    # flat: exact (brute force) | ivf: IVF-Flat | hnsw: HNSW graph | ivfpq: IVF-PQ (compressed)
+    recipe_index_type: str = Field(default="flat", env="RECIPE_INDEX_TYPE")
+    recipe_index_nprobe: int = Field(default=16, env="RECIPE_INDEX_NPROBE")
+    recipe_index_ef_search: int = Field(default=64, env="RECIPE_INDEX_EF_SEARCH")
+    # ivfpq: re-score top-N candidates with exact vectors (0 = disabled)
+    recipe_rerank_candidates: int = Field(default=100, env="RECIPE_RERANK_CANDIDATES")
+    # Memory-map FAISS indices / vectors so workers share pages via the OS page cache
+    semantic_index_mmap: bool = Field(default=False, env="SEMANTIC_INDEX_MMAP")
+    # Query embedding cache (normalized query -> vector)
+    query_cache_size: int = Field(default=2048, env="QUERY_CACHE_SIZE")
+    query_cache_persistent: bool = Field(default=False, env="QUERY_CACHE_PERSISTENT")
+    query_cache_ttl: int = Field(default=7 * 24 * 3600, env="QUERY_CACHE_TTL")
+    # Query encoder: torch (SentenceTransformer) | onnx (ONNX Runtime, see scripts/export_onnx_encoder.py)
+    encoder_backend: str = Field(default="torch", env="ENCODER_BACKEND")
+    encoder_onnx_dir: str = Field(default="data/models/multilingual-minilm-onnx", env="ENCODER_ONNX_DIR")
+    encoder_onnx_quantized: bool = Field(default=True, env="ENCODER_ONNX_QUANTIZED")
+    # Micro-batching: concurrent recipe searches share one encode batch + one FAISS search
+    semantic_batching: bool = Field(default=True, env="SEMANTIC_BATCHING")
+    semantic_batch_max_size: int = Field(default=32, env="SEMANTIC_BATCH_MAX_SIZE")
+    semantic_batch_wait_ms: float = Field(default=2.0, env="SEMANTIC_BATCH_WAIT_MS")
+    # Load model + indices in the background at startup (false: on first semantic request)
+    semantic_warmup: bool = Field(default=True, env="SEMANTIC_WARMUP")
+    # RAG: recipes below this cosine similarity are not used as sources
+    rag_min_similarity: float = Field(default=0.3, env="RAG_MIN_SIMILARITY")
+
+    # Ingredient catalog: shared in-memory list, table fingerprint re-checked every N seconds
+    ingredient_catalog_ttl: int = Field(default=60, env="INGREDIENT_CATALOG_TTL")
+    # Ingredient autocomplete: completions precomputed per trie node (max results per keystroke)
+    ingredient_autocomplete_top_k: int = Field(default=10, env="INGREDIENT_AUTOCOMPLETE_TOP_K")
+    # Recipe repository: JSON file mtime / DB version re-checked every N seconds
+    recipe_repository_ttl: int = Field(default=60, env="RECIPE_REPOSITORY_TTL")
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
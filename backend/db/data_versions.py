@@ -0,0 +1,94 @@
+"""
+Data versions
+Tablo başına DB tarafında tutulan değişiklik sayacı (data_versions tablosu)
+
+Trigger'lar izlenen tablolardaki her insert / delete ve içerik kolonlarının
+update'inde sayacı artırır. Hangi process (ya da ham SQL) yazmış olursa
+olsun değişir; process içi SQLAlchemy event'leri sadece kendi commit'lerini
+görür. Sayaçlar in-memory katalogların fingerprint'ine girer.
+
+- PostgreSQL / SQLite: trigger'lar (migration'lar ve create_all)
+- Diğer veritabanları: trigger yok, sayaç 0 kalır
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .models import DataVersion
+
+# Counter name -> [(table, content columns (None = every update))]
+TRACKED_TABLES: Dict[str, List[Tuple[str, Optional[Sequence[str]]]]] = {
+    "ingredients": [
+        ("ingredients", ("name", "portion_g", "calories", "fat_g", "carbs_g",
+                         "protein_g", "sugar_g", "fiber_g")),
+    ],
+    "recipes": [
+        ("recipes", ("title", "available_ingredients")),
+        ("recipe_ingredients", None),
+    ],
+}
+
+PG_FUNCTION = "bump_data_version"
+
+
+def get_data_version(session: Session, name: str) -> int:
+    """Current counter (0 if the row does not exist)"""
+    version = session.query(DataVersion.version).filter(DataVersion.name == name).scalar()
+    return version or 0
+
+
+def version_trigger_statements(dialect: str, name: str, table: str,
+                               columns: Optional[Sequence[str]]) -> List[str]:
+    """DDL that bumps counter `name` on writes to `table`"""
+    if dialect == "sqlite":
+        bump = f"BEGIN UPDATE data_versions SET version = version + 1 WHERE name = '{name}'; END"
+        update_of, when = "", ""
+        if columns:
+            update_of = " OF " + ", ".join(columns)
+            when = " WHEN " + " OR ".join(f"old.{c} IS NOT new.{c}" for c in columns)
+        return [
+            f"CREATE TRIGGER IF NOT EXISTS {table}_version_ai AFTER INSERT ON {table} {bump}",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_version_ad AFTER DELETE ON {table} {bump}",
+            f"CREATE TRIGGER IF NOT EXISTS {table}_version_au AFTER UPDATE{update_of} ON {table}{when} {bump}",
+        ]
+
+    if dialect == "postgresql":
+        update_of, when = "", ""
+        if columns:
+            update_of = " OF " + ", ".join(columns)
+            when = " WHEN (" + " OR ".join(f"OLD.{c} IS DISTINCT FROM NEW.{c}" for c in columns) + ")"
+        return [
+            f"DROP TRIGGER IF EXISTS {table}_version_aid ON {table}",
+            f"CREATE TRIGGER {table}_version_aid AFTER INSERT OR DELETE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE PROCEDURE {PG_FUNCTION}('{name}')",
+            f"DROP TRIGGER IF EXISTS {table}_version_au ON {table}",
+            f"CREATE TRIGGER {table}_version_au AFTER UPDATE{update_of} ON {table} "
+            f"FOR EACH ROW{when} EXECUTE PROCEDURE {PG_FUNCTION}('{name}')",
+        ]
+
+    return []
+
+
+def install_version_triggers(connection, names: Optional[Sequence[str]] = None):
+    """Create the counter rows and triggers (idempotent)"""
+    dialect = connection.dialect.name
+    if dialect not in ("sqlite", "postgresql"):
+        return
+
+    if dialect == "postgresql":
+        connection.execute(text(
+            f"CREATE OR REPLACE FUNCTION {PG_FUNCTION}() RETURNS trigger AS $$ "
+            "BEGIN UPDATE data_versions SET version = version + 1 WHERE name = TG_ARGV[0]; "
+            "RETURN NULL; END; $$ LANGUAGE plpgsql"
+        ))
+
+    for name in names or TRACKED_TABLES:
+        exists = connection.execute(
+            text("SELECT 1 FROM data_versions WHERE name = :name"), {"name": name}
+        ).first()
+        if not exists:
+            connection.execute(text("INSERT INTO data_versions (name, version) VALUES (:name, 0)"), {"name": name})
+        for table, columns in TRACKED_TABLES[name]:
+            for statement in version_trigger_statements(dialect, name, table, columns):
+                connection.execute(text(statement))
@@ -1,7 +1,7 @@
 """
 SQLAlchemy Database Models
 """
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table, Text, DateTime
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table, Text, DateTime, event, inspect
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .base import Base
@@ -38,6 +38,10 @@ class Ingredient(Base):
     fiber_g = Column(Float, nullable=False)
     embedding = Column(Text, nullable=True)  # Store as JSON string
 
+    # Precomputed search forms (lower() / normalize_turkish), kept in sync on insert/update
+    name_lower = Column(String(255), nullable=True)
+    name_normalized = Column(String(255), nullable=True, index=True)
+
     recipes = relationship("Recipe", secondary=recipe_ingredients, back_populates="ingredients")
 
 class Recipe(Base):
@@ -59,8 +63,24 @@ class Recipe(Base):
     view_count = Column(Integer, default=0)
     favorite_count = Column(Integer, default=0)
 
+    # Precomputed search forms (lower() / normalize_turkish), kept in sync on insert/update
+    title_lower = Column(String(255), nullable=True)
+    title_normalized = Column(String(255), nullable=True)
+    ingredients_lower = Column(Text, nullable=True)
+    ingredients_normalized = Column(Text, nullable=True)
+
+    # Allergen categories in available_ingredients (ALLERGEN_BITS), NULL = not computed yet
+    allergen_mask = Column(Integer, nullable=True)
+
     ingredients = relationship("Ingredient", secondary=recipe_ingredients, back_populates="recipes")
 
+class DataVersion(Base):
+    """Per-table change counter, bumped by DB triggers (see db/data_versions.py)"""
+    __tablename__ = 'data_versions'
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
 class Embedding(Base):
     __tablename__ = 'embeddings'
 
@@ -68,4 +88,63 @@ class Embedding(Base):
     entity_type = Column(String(50), nullable=False, index=True)  # 'ingredient' or 'recipe'
     entity_id = Column(Integer, nullable=False, index=True)
     embedding_text = Column(Text, nullable=False)  # JSON array
-    created_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
+    created_at = Column(DateTime, server_default=func.now())
+
+
+def _search_forms(text):
+    """(lower, Turkish-normalized) of a text, None stays None"""
+    if text is None:
+        return None, None
+    # Imported on first flush: the models (Alembic, scripts) don't depend on utils
+    from utils.search_utils import SearchEngine
+    return text.lower(), SearchEngine.normalize_turkish(text)
+
+
+def _changed(target, name):
+    """Attribute modified since load (updates only recompute what depends on it)"""
+    return inspect(target).attrs[name].history.has_changes()
+
+
+@event.listens_for(Ingredient, "before_insert")
+def _fill_ingredient_search_forms(mapper, connection, target):
+    target.name_lower, target.name_normalized = _search_forms(target.name)
+
+
+@event.listens_for(Ingredient, "before_update")
+def _update_ingredient_search_forms(mapper, connection, target):
+    if _changed(target, "name"):
+        _fill_ingredient_search_forms(mapper, connection, target)
+
+
+def _fill_recipe_title_forms(target):
+    target.title_lower, target.title_normalized = _search_forms(target.title)
+
+
+def _fill_recipe_ingredient_forms(target):
+    target.ingredients_lower, target.ingredients_normalized = _search_forms(target.available_ingredients)
+    from utils.allergen_mapping import compute_allergen_mask
+    target.allergen_mask = compute_allergen_mask(target.available_ingredients or "")
+
+
+@event.listens_for(Recipe, "before_insert")
+def _fill_recipe_search_forms(mapper, connection, target):
+    _fill_recipe_title_forms(target)
+    _fill_recipe_ingredient_forms(target)
+
+
+@event.listens_for(Recipe, "before_update")
+def _update_recipe_search_forms(mapper, connection, target):
+    # View count / rating bumps leave the derived columns alone, so their
+    # UPDATE only sets the bumped column
+    if _changed(target, "title"):
+        _fill_recipe_title_forms(target)
+    if _changed(target, "available_ingredients"):
+        _fill_recipe_ingredient_forms(target)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def _install_data_version_triggers(metadata, connection, tables=(), **kw):
+    # seed_database.py builds the schema with create_all instead of migrations
+    if DataVersion.__table__ in tables:
+        from .data_versions import install_version_triggers
+        install_version_triggers(connection)
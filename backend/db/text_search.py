@@ -0,0 +1,143 @@
+"""
+Recipe text search
+Substring eşleşmelerini indeksli ve sıralı yapar:
+- PostgreSQL: pg_trgm GIN index (title_lower / ingredients_lower) + similarity sıralaması
+- SQLite: FTS5 trigram tablosu (recipes_fts) + bm25 sıralaması
+- Diğer durumlarda (index/migration yoksa): LIKE taraması
+
+Index'ler alembic migration c52e7a1f0b93 ile oluşturulur.
+"""
+import logging
+import threading
+import time
+import weakref
+from typing import List
+
+from sqlalchemy import case, func, literal_column, or_, table, column, text
+from sqlalchemy.orm import Query, Session
+
+from db import models as db_models
+
+logger = logging.getLogger(__name__)
+
+BACKEND_PG_TRGM = "pg_trgm"
+BACKEND_FTS5 = "fts5"
+BACKEND_LIKE = "like"
+
+FTS_TABLE = "recipes_fts"
+# Trigram index'ler 3 karakterden kısa terimleri bulamaz
+MIN_INDEXED_TERM_LENGTH = 3
+
+_fts = table(FTS_TABLE, column("rowid"), column("rank"))
+
+# Engine -> (backend, detected at); entries go away with their engine (e.g.
+# in-memory test DBs). Re-detected after BACKEND_RECHECK_SECONDS so a
+# migration run against a live process's database is picked up.
+BACKEND_RECHECK_SECONDS = 300
+_backends: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+_backends_lock = threading.Lock()
+
+
+def get_text_search_backend(session: Session) -> str:
+    """Backend of the session's database (detected per engine, re-checked periodically)"""
+    bind = session.get_bind()
+    engine = getattr(bind, "engine", bind)
+    entry = _backends.get(engine)
+    if entry is None or time.monotonic() - entry[1] >= BACKEND_RECHECK_SECONDS:
+        with _backends_lock:
+            entry = _backends.get(engine)
+            if entry is None or time.monotonic() - entry[1] >= BACKEND_RECHECK_SECONDS:
+                backend = _detect_backend(session, bind.dialect.name)
+                if entry is None or entry[0] != backend:
+                    logger.info(f"Recipe text search backend: {backend}")
+                entry = (backend, time.monotonic())
+                _backends[engine] = entry
+    return entry[0]
+
+
+def _detect_backend(session: Session, dialect: str) -> str:
+    try:
+        if dialect == "postgresql":
+            found = session.execute(
+                text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            ).first()
+            return BACKEND_PG_TRGM if found else BACKEND_LIKE
+        if dialect == "sqlite":
+            found = session.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE}
+            ).first()
+            return BACKEND_FTS5 if found else BACKEND_LIKE
+    except Exception as e:
+        logger.warning(f"Text search backend tespit edilemedi ({e}), LIKE kullanılıyor")
+    return BACKEND_LIKE
+
+
+def _fts_phrase(term: str) -> str:
+    """FTS5 phrase (trigram tokenizer: substring match)"""
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _indexable(terms: List[str]) -> bool:
+    return all(len(term) >= MIN_INDEXED_TERM_LENGTH for term in terms)
+
+
+def filter_by_text(session: Session, query: Query, q: str) -> Query:
+    """
+    Recipes whose title or ingredients contain q, best matches first
+
+    Same matches as LIKE '%q%' on title_lower / ingredients_lower.
+    """
+    q_lower = q.lower()
+    pattern = f"%{q_lower}%"
+    backend = get_text_search_backend(session)
+    Recipe = db_models.Recipe
+
+    if backend == BACKEND_FTS5 and _indexable([q_lower]):
+        return (
+            query.join(_fts, _fts.c.rowid == Recipe.id)
+            .filter(literal_column(FTS_TABLE).op("MATCH")(_fts_phrase(q_lower)))
+            .order_by(_fts.c.rank)
+        )
+
+    query = query.filter(or_(Recipe.title_lower.like(pattern), Recipe.ingredients_lower.like(pattern)))
+    if backend == BACKEND_PG_TRGM:
+        # LIKE uses the GIN trigram indexes; rank by trigram similarity
+        query = query.order_by(
+            func.greatest(
+                func.similarity(Recipe.title_lower, q_lower),
+                func.word_similarity(q_lower, Recipe.ingredients_lower)
+            ).desc()
+        )
+    return query
+
+
+def filter_by_ingredients(session: Session, query: Query, ingredients: List[str]) -> Query:
+    """
+    Recipes containing any of the ingredients, recipes matching more first
+
+    Same matches as OR-ed LIKE '%ingredient%' on ingredients_lower.
+    """
+    terms = [ing.lower() for ing in ingredients if ing]
+    if not terms:
+        return query
+
+    backend = get_text_search_backend(session)
+    Recipe = db_models.Recipe
+
+    if backend == BACKEND_FTS5 and _indexable(terms):
+        # Column filter: only the ingredients column
+        match = "ingredients_lower : (" + " OR ".join(_fts_phrase(term) for term in terms) + ")"
+        return (
+            query.join(_fts, _fts.c.rowid == Recipe.id)
+            .filter(literal_column(FTS_TABLE).op("MATCH")(match))
+            .order_by(_fts.c.rank)
+        )
+
+    conditions = [Recipe.ingredients_lower.like(f"%{term}%") for term in terms]
+    query = query.filter(or_(*conditions))
+    if backend == BACKEND_PG_TRGM:
+        # Number of matched ingredients (each LIKE uses the GIN index)
+        matched = sum(case((condition, 1), else_=0) for condition in conditions)
+        query = query.order_by(matched.desc())
+    return query
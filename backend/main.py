@@ -7,6 +7,7 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager
 from pathlib import Path
 import uvicorn
 import logging
@@ -32,12 +33,22 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup: semantic model + indices load in the background, the API serves immediately"""
+    if SEMANTIC_AVAILABLE and settings.semantic_warmup:
+        semantic.start_semantic_loading()
+    yield
+
+
 app = FastAPI(
     title="Yemek Öneri Sistemi API",
     description="RAG Tabanlı Kişiselleştirilmiş Yemek Öneri Sistemi",
     version="0.1.0",
     docs_url="/docs" if settings.is_development else None,  # Production'da docs kapalı
-    redoc_url="/redoc" if settings.is_development else None
+    redoc_url="/redoc" if settings.is_development else None,
+    lifespan=lifespan
 )
 
 # CORS ayarları - Config'den al
@@ -100,8 +111,11 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    semantic_state = semantic.get_semantic_readiness() if SEMANTIC_AVAILABLE else None
     return {
         "status": "healthy",
+        "ready": semantic_state is None or semantic_state["ready"],
+        "semantic": semantic_state if SEMANTIC_AVAILABLE else "disabled",
         "environment": settings.environment,
         "debug": settings.debug
     }
@@ -1,7 +1,7 @@
 """
 Tarif (Recipe) modeli
 """
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from .user_context import UserContext
 
@@ -19,6 +19,16 @@ class Recipe(BaseModel):
     instructions: List[str] = []
 
 
+class RecipeSearchResult(BaseModel):
+    """Semantic tarif arama sonucu (sadece listede gösterilen alanlar)"""
+    id: int
+    title: str
+    ingredients: List[str]
+    similarity_score: float
+    popularity_score: float
+    image_name: Optional[str] = None
+
+
 class RecipeRecommendationRequest(BaseModel):
     """Tarif önerisi istek modeli"""
     ingredients: List[str]
@@ -27,6 +37,8 @@ class RecipeRecommendationRequest(BaseModel):
     max_calories: Optional[int] = None
     limit: int = 20
     user_context: Optional[UserContext] = None
+    max_missing: Optional[int] = Field(None, ge=0)  # "Ne pişirebilirim" modu: en fazla bu kadar eksik malzeme
+    match_all: bool = False  # Sadece malzemelerin hepsini kullanan tarifler
 
 
 class RecipeRecommendationResponse(BaseModel):
@@ -0,0 +1,98 @@
+"""
+Micro-batching
+Eşzamanlı gelen istekleri tek bir batch halinde işleyen worker thread
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects items submitted from many threads into batches for one handler call
+
+    The worker takes the first queued item, then keeps collecting for up to
+    `max_wait_ms` (or until `max_batch_size` items). Items that queue up while
+    a batch is being processed form the next batch, so batches grow with
+    concurrency and a lone request waits at most `max_wait_ms`.
+
+    The handler receives a list of items and must return one result per item
+    in the same order.
+    """
+
+    def __init__(self, handler: Callable[[List[Any]], List[Any]], max_batch_size: int = 32,
+                 max_wait_ms: float = 2.0, name: str = "micro-batcher"):
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.max_batch_seen = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        """Queue an item, the future resolves to its handler result"""
+        future = Future()
+        self._queue.put((item, future))
+        return future
+
+    def __call__(self, item: Any) -> Any:
+        """Submit an item and block until its result is ready"""
+        return self.submit(item).result()
+
+    def _collect(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    batch.append(self._queue.get(timeout=timeout))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+            futures = [future for _, future in batch]
+
+            with self._lock:
+                self.batches += 1
+                self.items += len(items)
+                self.max_batch_seen = max(self.max_batch_seen, len(items))
+
+            try:
+                results = self.handler(items)
+                for future, result in zip(futures, results):
+                    future.set_result(result)
+            except Exception as e:
+                logger.error(f"Micro-batch hatası: {e}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self) -> Dict[str, Any]:
+        """Batch counters"""
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait * 1000,
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0,
+                "max_batch_seen": self.max_batch_seen,
+                "queued": self._queue.qsize()
+            }
@@ -5,6 +5,8 @@ DiskCache ile kalıcı önbellekleme
 
 import hashlib
 import json
+import threading
+from collections import OrderedDict
 from typing import Any, Optional, Dict
 from pathlib import Path
 import logging
@@ -146,6 +148,64 @@ class CacheService:
             return {"available": False, "error": str(e)}
 
 
+class LRUCache:
+    """
+    Bellek içi, boyutu sınırlı LRU cache (thread-safe)
+    
+    Process içinde sık tekrarlanan hesaplamalar için (ör. sorgu embedding'leri).
+    Kalıcı katman gerekiyorsa CacheService ile birlikte kullanılır.
+    """
+    
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key: str) -> Optional[Any]:
+        """Değeri döndür ve en son kullanılan olarak işaretle"""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+    
+    def set(self, key: str, value: Any) -> None:
+        """Değeri kaydet, limit aşılırsa en eski kaydı at"""
+        if self.max_size <= 0:
+            return
+        
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Tüm kayıtları ve sayaçları sıfırla"""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache istatistikleri"""
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+
 # Singleton instance
 _cache_service = None
 
@@ -0,0 +1,130 @@
+"""
+Query Encoder Backends
+SentenceTransformer (PyTorch) veya ONNX Runtime (opsiyonel int8) ile embedding üretimi
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+# ONNX Runtime import (opsiyonel)
+try:
+    import onnxruntime as ort
+    from transformers import AutoTokenizer
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+# Files written by scripts/export_onnx_encoder.py
+ONNX_MODEL_FILE = "model.onnx"
+ONNX_QUANTIZED_MODEL_FILE = "model_int8.onnx"
+ONNX_CONFIG_FILE = "encoder_config.json"
+
+
+class SentenceTransformerEncoder:
+    """PyTorch SentenceTransformer encoder"""
+
+    backend = "torch"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name)
+        self.dimension = self.model.get_sentence_embedding_dimension()
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode texts, returns a (len(texts), dim) float32 matrix"""
+        return self.model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+
+
+class OnnxEncoder:
+    """
+    ONNX Runtime encoder for an exported SentenceTransformer
+
+    Runs the exported transformer and applies the same mean pooling as the
+    SentenceTransformer pipeline (see export_onnx_encoder.py parity check).
+    """
+
+    backend = "onnx"
+
+    def __init__(self, model_dir: Path, quantized: bool = True):
+        model_file = ONNX_QUANTIZED_MODEL_FILE if quantized else ONNX_MODEL_FILE
+        model_path = model_dir / model_file
+        if not model_path.exists():
+            raise FileNotFoundError(f"{model_path} not found. Run scripts/export_onnx_encoder.py first.")
+
+        with open(model_dir / ONNX_CONFIG_FILE, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+
+        self.model_name = config["model_name"]
+        self.max_seq_length = config["max_seq_length"]
+        self.quantized = quantized
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(model_path), session_options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.dimension = self.session.get_outputs()[0].shape[-1]
+
+    def encode(self, texts: List[str], batch_size: int = 32) -> np.ndarray:
+        """Encode texts, returns a (len(texts), dim) float32 matrix"""
+        embeddings = []
+        for i in range(0, len(texts), batch_size):
+            batch = self.tokenizer(
+                texts[i:i + batch_size],
+                padding=True,
+                truncation=True,
+                max_length=self.max_seq_length,
+                return_tensors="np"
+            )
+            inputs = {name: batch[name].astype(np.int64) for name in self.input_names}
+            token_embeddings = self.session.run(None, inputs)[0]
+
+            # Mean pooling over non-padding tokens
+            mask = batch["attention_mask"][..., None].astype(np.float32)
+            summed = (token_embeddings * mask).sum(axis=1)
+            counts = np.clip(mask.sum(axis=1), 1e-9, None)
+            embeddings.append((summed / counts).astype(np.float32))
+
+        return np.vstack(embeddings)
+
+
+def get_onnx_model_dir() -> Path:
+    """ONNX export directory from settings (relative paths are under backend/)"""
+    model_dir = Path(settings.encoder_onnx_dir)
+    return model_dir if model_dir.is_absolute() else BACKEND_DIR / model_dir
+
+
+def create_encoder(model_name: str):
+    """
+    Create the query encoder selected by settings.encoder_backend
+
+    Falls back to the PyTorch encoder if the ONNX backend is unavailable.
+    """
+    if settings.encoder_backend == "onnx":
+        if not ONNX_AVAILABLE:
+            logger.warning("onnxruntime/transformers bulunamadı, PyTorch encoder kullanılıyor")
+        else:
+            try:
+                encoder = OnnxEncoder(get_onnx_model_dir(), quantized=settings.encoder_onnx_quantized)
+                if encoder.model_name == model_name:
+                    return encoder
+                # Farklı model = farklı embedding uzayı, index ile uyumsuz
+                logger.warning(f"ONNX model {encoder.model_name} != {model_name}, PyTorch encoder kullanılıyor")
+            except Exception as e:
+                logger.warning(f"ONNX encoder yüklenemedi ({e}), PyTorch encoder kullanılıyor")
+
+    return SentenceTransformerEncoder(model_name)
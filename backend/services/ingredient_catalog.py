@@ -0,0 +1,258 @@
+"""
+Ingredient Catalog
+Process genelinde paylaşılan, versiyonlu malzeme listesi (istek başına tablo okuma yok)
+"""
+
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from config import settings
+from db import models as db_models
+from db.base import SessionLocal
+from db.data_versions import get_data_version
+from models.ingredient import Ingredient
+from utils.search_utils import PrefixTrie, SearchEngine, TrigramIndex
+
+logger = logging.getLogger(__name__)
+
+INGREDIENTS_JSON = Path(__file__).parent.parent / "data" / "ingredients.json"
+
+
+class IngredientSnapshot:
+    """
+    One immutable version of the ingredient list
+
+    Requests keep using the snapshot they got even if the catalog reloads in
+    the meantime; derived structures are built once per version.
+    """
+
+    def __init__(self, ingredients: List[Ingredient], version: int, fingerprint: Tuple,
+                 names_lower: List[str], names_normalized: List[str]):
+        self.ingredients = ingredients
+        self.version = version
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+        self.names = [ing.name for ing in ingredients]
+        # Search forms (DB columns name_lower / name_normalized)
+        self.names_lower = names_lower
+        self.names_normalized = names_normalized
+        self._by_lower_name = {}
+        for lower, ing in zip(names_lower, ingredients):
+            self._by_lower_name.setdefault(lower, ing)
+        self._search_index = None
+        self._autocomplete = None
+        self._lock = threading.Lock()
+
+    def get_by_name(self, name: str) -> Optional[Ingredient]:
+        """Case-insensitive exact name lookup"""
+        return self._by_lower_name.get(name.lower())
+
+    @property
+    def search_index(self) -> TrigramIndex:
+        """SearchEngine index of this version (built on first use)"""
+        if self._search_index is None:
+            with self._lock:
+                if self._search_index is None:
+                    self._search_index = TrigramIndex(
+                        self.names, lower=self.names_lower, norm=self.names_normalized
+                    )
+        return self._search_index
+
+    @property
+    def autocomplete(self) -> PrefixTrie:
+        """Autocomplete trie of this version (built on first use)"""
+        if self._autocomplete is None:
+            with self._lock:
+                if self._autocomplete is None:
+                    self._autocomplete = PrefixTrie(
+                        self.names, top_k=settings.ingredient_autocomplete_top_k,
+                        lower=self.names_lower, norm=self.names_normalized
+                    )
+        return self._autocomplete
+
+
+class IngredientCatalog:
+    """
+    Process-wide ingredient catalog
+
+    - Loaded once, then served from memory
+    - Every `ttl` seconds a cheap fingerprint (row count + max id + the
+      trigger-maintained data_versions counter, or the JSON file mtime) is
+      checked; the list is reloaded only if it changed. The counter also
+      catches in-place edits and delete+insert pairs made by other processes
+    - Commits that insert/update/delete ingredients in this process
+      invalidate it immediately (SQLAlchemy events)
+    """
+
+    def __init__(self, source: str = "db", ttl: float = 60):
+        self.source = source
+        self.ttl = ttl
+        self._snapshot: Optional[IngredientSnapshot] = None
+        self._checked_at = 0.0
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def invalidate(self):
+        """Reload on next access"""
+        self._dirty = True
+
+    def snapshot(self, db: Optional[Session] = None) -> IngredientSnapshot:
+        """Current version, refreshed if stale"""
+        snapshot = self._snapshot
+        if snapshot is not None and not self._dirty and time.time() - self._checked_at < self.ttl:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and not self._dirty and time.time() - self._checked_at < self.ttl:
+                return self._snapshot
+            try:
+                self._refresh(db)
+            except Exception as e:
+                if self._snapshot is None:
+                    raise
+                # Eski versiyonla devam et, sonraki TTL'de tekrar dene
+                logger.error(f"Malzeme kataloğu yenilenemedi: {e}")
+                self._checked_at = time.time()
+            return self._snapshot
+
+    def _refresh(self, db: Optional[Session]):
+        if self.source == "json":
+            self._refresh_from(None)
+            return
+
+        own_session = db is None
+        session = SessionLocal() if own_session else db
+        try:
+            self._refresh_from(session)
+        finally:
+            if own_session:
+                session.close()
+
+    def _refresh_from(self, session: Optional[Session]):
+        # Cleared before loading: an invalidation during the load triggers another reload
+        dirty = self._dirty
+        self._dirty = False
+        try:
+            fingerprint = self._fingerprint(session)
+            if self._snapshot is not None and not dirty and fingerprint == self._snapshot.fingerprint:
+                self._checked_at = time.time()
+                return
+            start_time = time.time()
+            ingredients, names_lower, names_normalized = self._load(session)
+        except Exception:
+            self._dirty = self._dirty or dirty
+            raise
+
+        self._checked_at = time.time()
+        version = self._snapshot.version + 1 if self._snapshot else 1
+        self._snapshot = IngredientSnapshot(ingredients, version, fingerprint, names_lower, names_normalized)
+        self.reloads += 1
+        print(f"✅ Malzeme kataloğu v{version}: {len(ingredients)} malzeme ({self.source}), "
+              f"{(time.time() - start_time) * 1000:.1f}ms")
+
+    def _fingerprint(self, session: Optional[Session]) -> Tuple:
+        if session is None:
+            return (INGREDIENTS_JSON.stat().st_mtime_ns,)
+        count, max_id = session.query(
+            func.count(db_models.Ingredient.id), func.max(db_models.Ingredient.id)
+        ).one()
+        return (count, max_id, get_data_version(session, "ingredients"))
+
+    def _load(self, session: Optional[Session]) -> Tuple[List[Ingredient], List[str], List[str]]:
+        """Ingredients + their lower / normalized names"""
+        if session is None:
+            with open(INGREDIENTS_JSON, 'r', encoding='utf-8') as f:
+                ingredients = [Ingredient(**item) for item in json.load(f)]
+            return (
+                ingredients,
+                [ing.name.lower() for ing in ingredients],
+                [SearchEngine.normalize_turkish(ing.name) for ing in ingredients]
+            )
+
+        rows = session.query(
+            db_models.Ingredient.name,
+            db_models.Ingredient.portion_g,
+            db_models.Ingredient.calories,
+            db_models.Ingredient.fat_g,
+            db_models.Ingredient.carbs_g,
+            db_models.Ingredient.protein_g,
+            db_models.Ingredient.sugar_g,
+            db_models.Ingredient.fiber_g,
+            db_models.Ingredient.name_lower,
+            db_models.Ingredient.name_normalized
+        ).order_by(db_models.Ingredient.id).all()
+        ingredients = [
+            Ingredient(
+                name=row.name,
+                portion_g=row.portion_g,
+                calories=row.calories,
+                fat_g=row.fat_g,
+                carbs_g=row.carbs_g,
+                protein_g=row.protein_g,
+                sugar_g=row.sugar_g,
+                fiber_g=row.fiber_g
+            ) for row in rows
+        ]
+        # Rows written outside the ORM may not have the columns filled yet
+        names_lower = [row.name_lower or row.name.lower() for row in rows]
+        names_normalized = [row.name_normalized or SearchEngine.normalize_turkish(row.name) for row in rows]
+        return ingredients, names_lower, names_normalized
+
+    def stats(self) -> Dict:
+        """Catalog state"""
+        snapshot = self._snapshot
+        return {
+            "source": self.source,
+            "version": snapshot.version if snapshot else 0,
+            "size": len(snapshot.ingredients) if snapshot else 0,
+            "loaded_at": snapshot.loaded_at if snapshot else None,
+            "reloads": self.reloads,
+            "ttl": self.ttl
+        }
+
+
+# Singleton instances (DB and JSON fallback)
+_catalogs: Dict[str, IngredientCatalog] = {}
+_catalogs_lock = threading.Lock()
+
+def get_ingredient_catalog(source: str = "db") -> IngredientCatalog:
+    """Singleton catalog per source"""
+    catalog = _catalogs.get(source)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.setdefault(
+                source, IngredientCatalog(source=source, ttl=settings.ingredient_catalog_ttl)
+            )
+    return catalog
+
+
+# Invalidate on ingredient writes from this process (after the commit, so the
+# reload sees the new rows)
+_CHANGED_KEY = "ingredients_changed"
+
+def _mark_changed(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info[_CHANGED_KEY] = True
+
+for _event_name in ("after_insert", "after_update", "after_delete"):
+    event.listen(db_models.Ingredient, _event_name, _mark_changed)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_CHANGED_KEY, False):
+        catalog = _catalogs.get("db")
+        if catalog is not None:
+            catalog.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop(_CHANGED_KEY, None)
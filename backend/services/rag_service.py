@@ -8,7 +8,7 @@ from typing import Dict, Any, List, Optional
 from .semantic_service import SemanticSearchService
 from .llm_service import OllamaLLMService
 from models.user_context import UserContext
-from utils.allergen_mapping import filter_recipes_by_allergens
+from config import settings
 
 
 class RAGService:
@@ -48,46 +48,44 @@ Tariflerin İngilizce isimlerini Türkçe'ye çevirerek kullan."""
                 context_obj = UserContext(**user_context)
 
         # Step 1: Retrieve relevant recipes
+        # Allergen, cooking time and calorie constraints are applied inside the
+        # vector search, so restrictive contexts still get a full result page.
+        # Weak matches (cosine < rag_min_similarity) are not used as sources.
         print(f"🔍 RAG: Searching for relevant recipes...")
-        recipes = self.semantic_service.search_recipes(query, limit=limit * 2)  # Get more for filtering
-
-        if not recipes:
-            return {
-                "answer": "Üzgünüm, bu sorguyla eşleşen tarif bulamadım. Lütfen farklı kelimelerle tekrar deneyin.",
-                "sources": [],
-                "confidence": 0.0,
-                "latency_ms": round((time.time() - start_time) * 1000, 1)
-            }
-
-        # Step 1.5: Apply allergen hard filter
-        if context_obj and context_obj.allergens:
-            pre_filter_count = len(recipes)
-            recipes = filter_recipes_by_allergens(recipes, context_obj.allergens)
-            print(f"🛡️ RAG: Allergen filter: {pre_filter_count} -> {len(recipes)} recipes")
-
-        # Apply cooking time and calorie filters
         if context_obj:
-            if context_obj.max_cooking_time:
-                recipes = [r for r in recipes if r.get('cooking_time', 999) <= context_obj.max_cooking_time]
-            if context_obj.max_calories:
-                recipes = [r for r in recipes if r.get('calories', 9999) <= context_obj.max_calories]
-
-        # Limit after filtering
-        recipes = recipes[:limit]
+            recipes = self.semantic_service.search_recipes_filtered(
+                query,
+                limit=limit,
+                allergens=context_obj.allergens,
+                max_cooking_time=context_obj.max_cooking_time,
+                max_calories=context_obj.max_calories,
+                min_similarity=settings.rag_min_similarity
+            )
+        else:
+            recipes = self.semantic_service.search_recipes(
+                query, limit=limit, min_similarity=settings.rag_min_similarity
+            )
 
         if not recipes:
-            allergen_msg = ""
-            if context_obj and context_obj.allergens:
-                allergen_msg = f" (alerjen filtresi: {', '.join(context_obj.allergens)})"
+            if context_obj and (context_obj.allergens or context_obj.max_cooking_time or context_obj.max_calories):
+                allergen_msg = ""
+                if context_obj.allergens:
+                    allergen_msg = f" (alerjen filtresi: {', '.join(context_obj.allergens)})"
+                answer = f"Üzgünüm, kriterlerinize uygun tarif bulamadım{allergen_msg}. Lütfen farklı kelimelerle tekrar deneyin."
+            else:
+                answer = "Üzgünüm, bu sorguyla eşleşen tarif bulamadım. Lütfen farklı kelimelerle tekrar deneyin."
             return {
-                "answer": f"Üzgünüm, kriterlerinize uygun tarif bulamadım{allergen_msg}. Lütfen farklı kelimelerle tekrar deneyin.",
+                "answer": answer,
                 "sources": [],
                 "confidence": 0.0,
                 "latency_ms": round((time.time() - start_time) * 1000, 1)
             }
 
-        # Step 2: Build context from recipes
-        context = self._build_context(recipes, context_obj)
+        # Step 2: Build context from recipes (full records incl. instructions)
+        context = self._build_context(
+            self.semantic_service.get_recipe_context([r.id for r in recipes]),
+            context_obj
+        )
 
         # Step 3: Generate answer using LLM
         print(f"🤖 RAG: Generating response...")
@@ -95,9 +93,9 @@ Tariflerin İngilizce isimlerini Türkçe'ye çevirerek kullan."""
 
         llm_result = self.llm_service.generate(prompt)
 
-        # Step 4: Calculate confidence
-        avg_similarity = sum(r.get('similarity_score', 0) for r in recipes) / len(recipes)
-        confidence = min(1.0, avg_similarity * 2)  # Scale to 0-1
+        # Step 4: Calculate confidence (mean cosine similarity of the sources)
+        avg_similarity = sum(r.similarity_score for r in recipes) / len(recipes)
+        confidence = max(0.0, min(1.0, avg_similarity))
 
         latency_ms = (time.time() - start_time) * 1000
 
@@ -105,9 +103,9 @@ Tariflerin İngilizce isimlerini Türkçe'ye çevirerek kullan."""
             "answer": llm_result.get("response", "Yanıt oluşturulamadı."),
             "sources": [
                 {
-                    "id": r["id"],
-                    "title": r["title"],
-                    "similarity_score": r.get("similarity_score", 0)
+                    "id": r.id,
+                    "title": r.title,
+                    "similarity_score": r.similarity_score
                 }
                 for r in recipes
             ],
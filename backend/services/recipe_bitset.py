@@ -0,0 +1,313 @@
+"""
+Recipe Bitset Matrix
+Tarif x kanonik malzeme sözlüğü bit matrisi (NumPy uint64)
+
+Her tarifin malzeme kümesi, sözlük üzerinde paketlenmiş bir bitset'tir.
+"Tamamen pişirebileceğim tarifler", "en fazla k eksik malzeme" ve
+"alerjenlerimi içermeyenler" sorguları tüm tarifler üzerinde tek seferde
+AND / popcount ile hesaplanır.
+
+Artifact'ler scripts/build_recipe_bitsets.py ile üretilir:
+- recipe_bitsets_db.npz: DB (available_ingredients + recipe_ingredients)
+- recipe_bitsets_en_full.npz: recipes_en_full.json (JSON demo modundaki
+  İngilizce tarifler bu satırları kullanır)
+"""
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from db import models as db_models
+from db.data_versions import get_data_version
+from services.recipe_index import canonical_ingredient, db_ingredient_pairs, text_ingredient_pairs, word_prefix_keys
+from utils.allergen_mapping import compute_allergen_mask, contains_allergen, get_allergen_mask
+
+ARTIFACT_DIR = Path(__file__).parent.parent / "data" / "embeddings"
+WORD_BITS = 64
+
+# Bits set in each 16-bit value (popcount fallback for NumPy < 2.0)
+_POPCOUNT_BYTE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+_POPCOUNT_TABLE = _POPCOUNT_BYTE[np.arange(1 << 16) & 0xFF] + _POPCOUNT_BYTE[np.arange(1 << 16) >> 8]
+
+
+def artifact_path(source: str) -> Path:
+    """Artifact file of a source ("db" | "en_full")"""
+    return ARTIFACT_DIR / f"recipe_bitsets_{source}.npz"
+
+
+def popcount_rows(words: np.ndarray) -> np.ndarray:
+    """Number of set bits in each row of a 2-D uint64 array"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int32)
+    # NumPy < 2.0: lookup table over 16-bit chunks
+    chunks = np.ascontiguousarray(words).view(np.uint16)
+    return np.take(_POPCOUNT_TABLE, chunks).sum(axis=1, dtype=np.int32)
+
+
+class RecipeBitsetMatrix:
+    """
+    Packed recipe x ingredient matrix
+
+    Row i is the ingredient set of recipe_ids[i]; bit j of a row is set if
+    the recipe uses vocabulary[j]. Vocabulary terms are canonical ingredient
+    names (see recipe_index.canonical_ingredient).
+    """
+
+    def __init__(self, recipe_ids: np.ndarray, vocabulary: Sequence[str], bits: np.ndarray,
+                 allergen_mask: Optional[np.ndarray] = None, fingerprint: Tuple = ()):
+        self.recipe_ids = np.asarray(recipe_ids, dtype=np.int64)
+        self.vocabulary = list(vocabulary)
+        self.term_index = {term: i for i, term in enumerate(self.vocabulary)}
+        self._sorted_terms = sorted(self.vocabulary)
+        self.bits = np.ascontiguousarray(bits, dtype=np.uint64)
+        # Allergen categories found in the full ingredient text, including
+        # lines that did not map to a vocabulary term
+        self.allergen_mask = (
+            np.asarray(allergen_mask, dtype=np.int64) if allergen_mask is not None
+            else np.zeros(len(self.recipe_ids), dtype=np.int64)
+        )
+        self.row_of = {int(recipe_id): row for row, recipe_id in enumerate(self.recipe_ids.tolist())}
+        self.fingerprint = tuple(fingerprint)
+        self.sizes = popcount_rows(self.bits)
+        self._allergen_vectors: Dict[Tuple[str, ...], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.recipe_ids)
+
+    @property
+    def n_words(self) -> int:
+        return self.bits.shape[1]
+
+    @classmethod
+    def from_pairs(cls, recipe_ids: Sequence[int], pairs: Iterable[Tuple[int, str]],
+                   allergen_texts: Optional[Dict[int, str]] = None,
+                   vocabulary: Optional[Sequence[str]] = None,
+                   fingerprint: Tuple = ()) -> "RecipeBitsetMatrix":
+        """
+        Build from (recipe_id, canonical ingredient) pairs
+
+        Args:
+            recipe_ids: Row order
+            pairs: Recipe ingredients (terms outside a given vocabulary are skipped)
+            allergen_texts: Ingredient text per recipe for the allergen mask column
+            vocabulary: Fixed vocabulary (default: all terms of pairs, sorted)
+        """
+        pairs = [(recipe_id, term) for recipe_id, term in pairs if term]
+        if vocabulary is None:
+            vocabulary = sorted({term for _, term in pairs})
+        term_index = {term: i for i, term in enumerate(vocabulary)}
+        row_of = {int(recipe_id): row for row, recipe_id in enumerate(recipe_ids)}
+
+        n_words = max(1, (len(vocabulary) + WORD_BITS - 1) // WORD_BITS)
+        bits = np.zeros((len(row_of), n_words), dtype=np.uint64)
+        for recipe_id, term in pairs:
+            row = row_of.get(recipe_id)
+            col = term_index.get(term)
+            if row is None or col is None:
+                continue
+            bits[row, col // WORD_BITS] |= np.uint64(1 << (col % WORD_BITS))
+
+        allergen_mask = None
+        if allergen_texts:
+            allergen_mask = np.array(
+                [compute_allergen_mask(allergen_texts.get(int(recipe_id), "")) for recipe_id in recipe_ids],
+                dtype=np.int64
+            )
+        return cls(np.asarray(recipe_ids), vocabulary, bits, allergen_mask, fingerprint)
+
+    def save(self, path: Path):
+        """Write the matrix as .npz"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            recipe_ids=self.recipe_ids,
+            vocabulary=np.array(self.vocabulary, dtype=str),
+            bits=self.bits,
+            allergen_mask=self.allergen_mask,
+            fingerprint=np.array(self.fingerprint, dtype=np.int64)
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "RecipeBitsetMatrix":
+        """Read a matrix written by save()"""
+        with np.load(path, allow_pickle=False) as data:
+            return cls(
+                data["recipe_ids"],
+                data["vocabulary"].tolist(),
+                data["bits"],
+                data["allergen_mask"],
+                tuple(data["fingerprint"].tolist())
+            )
+
+    def encode(self, ingredients: Iterable[str]) -> np.ndarray:
+        """
+        Bitset of an ingredient list
+
+        An ingredient sets the vocabulary terms equal to it or starting with
+        it as whole words (same matching as IngredientRecipeIndex); others
+        are ignored.
+        """
+        vector = np.zeros(self.n_words, dtype=np.uint64)
+        for ing in ingredients:
+            if not ing:
+                continue
+            for term in word_prefix_keys(canonical_ingredient(ing), self._sorted_terms):
+                col = self.term_index[term]
+                vector[col // WORD_BITS] |= np.uint64(1 << (col % WORD_BITS))
+        return vector
+
+    def _allergen_vector(self, allergens: List[str]) -> np.ndarray:
+        """Bitset of vocabulary terms containing one of the allergens"""
+        key = tuple(sorted(allergens))
+        vector = self._allergen_vectors.get(key)
+        if vector is None:
+            vector = self.encode(term for term in self.vocabulary if contains_allergen(term, allergens))
+            self._allergen_vectors[key] = vector
+        return vector
+
+    def allergen_free(self, allergens: Optional[List[str]]) -> np.ndarray:
+        """Boolean mask of recipes containing none of the allergens"""
+        safe = np.ones(len(self), dtype=bool)
+        if not allergens:
+            return safe
+        vector = self._allergen_vector(allergens)
+        if vector.any():
+            safe &= ~(self.bits & vector).any(axis=1)
+        user_mask = get_allergen_mask(allergens)
+        if user_mask:
+            safe &= (self.allergen_mask & user_mask) == 0
+        return safe
+
+    def query(self, ingredients: List[str], max_missing: int = 0,
+              allergens: Optional[List[str]] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Recipes missing at most `max_missing` ingredients from the inventory
+
+        Only recipes using at least one inventory ingredient are returned.
+        Order: fewest missing, then most matched, then row order.
+
+        Returns:
+            (recipe_ids, matched counts, missing counts)
+        """
+        inventory = self.encode(ingredients)
+        matched = popcount_rows(self.bits & inventory)
+        missing = self.sizes - matched
+
+        eligible = (matched > 0) & (missing <= max_missing)
+        if allergens:
+            eligible &= self.allergen_free(allergens)
+
+        rows = np.flatnonzero(eligible)
+        order = np.lexsort((rows, -matched[rows], missing[rows]))
+        rows = rows[order]
+        return self.recipe_ids[rows], matched[rows], missing[rows]
+
+    def terms_of(self, recipe_id: int) -> List[str]:
+        """Vocabulary terms of a recipe ([] if it is not a row)"""
+        row = self.row_of.get(recipe_id)
+        if row is None:
+            return []
+        columns = np.unpackbits(self.bits[row].view(np.uint8), bitorder="little")
+        return [self.vocabulary[col] for col in np.flatnonzero(columns[:len(self.vocabulary)])]
+
+    def matching(self, ingredients: List[str], recipe_ids: Iterable[int]) -> List[str]:
+        """Inventory ingredients used by at least one of the recipes"""
+        rows = [self.row_of[recipe_id] for recipe_id in recipe_ids if recipe_id in self.row_of]
+        if not rows:
+            return []
+        used = np.bitwise_or.reduce(self.bits[rows], axis=0)
+        return [ing for ing in ingredients if ing and (self.encode([ing]) & used).any()]
+
+
+def db_fingerprint(session: Session) -> Tuple[int, int, int]:
+    """(recipe count, max recipe id, recipes data version): same as RecipeRepository's DB version check"""
+    count, max_id = session.query(
+        func.count(db_models.Recipe.id), func.max(db_models.Recipe.id)
+    ).one()
+    return (count, max_id or 0, get_data_version(session, "recipes"))
+
+
+def build_matrix_from_db(session: Session) -> RecipeBitsetMatrix:
+    """Matrix over the recipes table (available_ingredients + recipe_ingredients links)"""
+    fingerprint = db_fingerprint(session)
+    recipes = session.query(
+        db_models.Recipe.id, db_models.Recipe.available_ingredients
+    ).order_by(db_models.Recipe.id).all()
+
+    return RecipeBitsetMatrix.from_pairs(
+        [r.id for r in recipes],
+        db_ingredient_pairs(session),
+        allergen_texts={r.id: r.available_ingredients or "" for r in recipes},
+        fingerprint=fingerprint
+    )
+
+
+def build_matrix_from_text(recipes: Iterable[Tuple[int, Optional[str]]]) -> RecipeBitsetMatrix:
+    """Matrix over comma-separated ingredient lists ("Tavuk, Domates, Biber")"""
+    recipes = list(recipes)
+    return RecipeBitsetMatrix.from_pairs(
+        [recipe_id for recipe_id, _ in recipes],
+        text_ingredient_pairs(recipes),
+        allergen_texts={recipe_id: text or "" for recipe_id, text in recipes}
+    )
+
+
+def build_matrix_from_demo(recipes: Iterable[Tuple[int, Optional[str]]],
+                           en_source_ids: Dict[int, int]) -> RecipeBitsetMatrix:
+    """
+    Matrix over the JSON demo recipes
+
+    recipes_en.json recipes (en_source_ids: demo id -> recipes_en_full.json
+    id) only have free-text ingredient lines ("2 Tbsp. finely chopped
+    sage"), so they take their terms from the en_full artifact when it is
+    built; the others are split on commas.
+    """
+    recipes = list(recipes)
+    en_full = load_en_full_matrix() if en_source_ids else None
+    if en_full is None:
+        return build_matrix_from_text(recipes)
+
+    text_recipes = [(recipe_id, text) for recipe_id, text in recipes if recipe_id not in en_source_ids]
+    pairs = list(text_ingredient_pairs(text_recipes))
+    for recipe_id, _ in recipes:
+        if recipe_id in en_source_ids:
+            pairs.extend((recipe_id, term) for term in en_full.terms_of(en_source_ids[recipe_id]))
+    return RecipeBitsetMatrix.from_pairs(
+        [recipe_id for recipe_id, _ in recipes],
+        pairs,
+        allergen_texts={recipe_id: text or "" for recipe_id, text in recipes}
+    )
+
+
+def load_en_full_matrix() -> Optional[RecipeBitsetMatrix]:
+    """recipes_en_full.json matrix, None if it is not built"""
+    path = artifact_path("en_full")
+    if not path.exists():
+        return None
+    try:
+        return RecipeBitsetMatrix.load(path)
+    except Exception as e:
+        print(f"⚠️ recipe_bitsets_en_full.npz okunamadı: {e}")
+        return None
+
+
+def load_db_matrix(session: Session, use_artifact: bool = True) -> RecipeBitsetMatrix:
+    """
+    DB matrix: the built artifact if it matches the current recipes table,
+    otherwise built from the DB in memory
+
+    The artifact check includes the recipes data version, so in-place edits
+    (any process, raw SQL too) make the artifact stale.
+    """
+    path = artifact_path("db")
+    if use_artifact and path.exists():
+        try:
+            matrix = RecipeBitsetMatrix.load(path)
+            if matrix.fingerprint == db_fingerprint(session):
+                return matrix
+            print("⚠️ recipe_bitsets_db.npz eski (DB değişmiş), bellekte yeniden oluşturuluyor")
+        except Exception as e:
+            print(f"⚠️ recipe_bitsets_db.npz okunamadı: {e}")
+    return build_matrix_from_db(session)
@@ -0,0 +1,175 @@
+"""
+Ingredient -> Recipe inverted index
+Kanonik malzeme (normalize isim) -> tarif id posting listeleri, kapsama oranına göre öneri sıralaması
+"""
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from db import models as db_models
+from utils.search_utils import SearchEngine
+
+
+def canonical_ingredient(name: str) -> str:
+    """Canonical key of an ingredient name (Turkish-normalized, single spaces)"""
+    return " ".join(SearchEngine.normalize_turkish(name).split())
+
+
+def word_prefix_keys(term: str, keys: Sequence[str]) -> List[str]:
+    """
+    Keys equal to term or starting with it as whole words
+
+    "tavuk" -> ["tavuk", "tavuk gogsu", "tavuk suyu"], not "tavukgogsu".
+
+    Args:
+        term: Canonical ingredient
+        keys: Sorted canonical keys
+    """
+    if not term:
+        return []
+    result = []
+    for i in range(bisect_left(keys, term), len(keys)):
+        key = keys[i]
+        if not key.startswith(term):
+            break
+        if len(key) == len(term) or key[len(term)] == " ":
+            result.append(key)
+    return result
+
+
+class IngredientRecipeIndex:
+    """
+    Inverted index from canonical ingredient to the recipes that use it
+
+    An inventory ingredient matches the recipe ingredients equal to it or
+    starting with it as whole words ("tavuk" matches "tavuk göğsü"). For an
+    inventory, the number of recipe ingredients the user has is the number
+    of matched recipe ingredients. It is computed for all recipes at once
+    from the union of the matched posting lists, so the cost depends on the
+    posting lengths, not on the number of recipes. Recipes that use every
+    inventory ingredient come from the intersection of the per-ingredient
+    posting lists (shortest first).
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[int, str]]):
+        """
+        Args:
+            pairs: (recipe_id, canonical ingredient) pairs
+        """
+        postings: Dict[str, Set[int]] = defaultdict(set)
+        for recipe_id, ingredient in pairs:
+            if ingredient:
+                postings[ingredient].add(recipe_id)
+
+        self.postings: Dict[str, List[int]] = {key: sorted(ids) for key, ids in postings.items()}
+        self.keys = sorted(self.postings)
+        sizes = Counter()
+        for ids in self.postings.values():
+            sizes.update(ids)
+        self.recipe_sizes: Dict[int, int] = dict(sizes)
+
+    def __len__(self) -> int:
+        return len(self.recipe_sizes)
+
+    def keys_for(self, ingredient: str) -> List[str]:
+        """Index keys matched by one inventory ingredient"""
+        return word_prefix_keys(canonical_ingredient(ingredient), self.keys) if ingredient else []
+
+    def terms(self, ingredients: List[str]) -> List[str]:
+        """Distinct index keys matched by the inventory"""
+        return list(dict.fromkeys(key for ing in ingredients for key in self.keys_for(ing)))
+
+    def containing_all(self, ingredients: List[str]) -> List[int]:
+        """Recipes that use every given ingredient (posting-list intersection)"""
+        per_ingredient = []
+        for term in dict.fromkeys(canonical_ingredient(ing) for ing in ingredients if ing):
+            keys = word_prefix_keys(term, self.keys)
+            if not keys:
+                return []
+            per_ingredient.append(set().union(*(self.postings[key] for key in keys)))
+        if not per_ingredient:
+            return []
+
+        per_ingredient.sort(key=len)
+        result = per_ingredient[0]
+        for recipe_ids in per_ingredient[1:]:
+            result &= recipe_ids
+            if not result:
+                break
+        return sorted(result)
+
+    def matching(self, ingredients: List[str], recipe_ids: Iterable[int]) -> List[str]:
+        """Inventory ingredients used by at least one of the recipes"""
+        ids = set(recipe_ids)
+        return [
+            ing for ing in ingredients
+            if any(not ids.isdisjoint(self.postings[key]) for key in self.keys_for(ing))
+        ]
+
+    def rank(self, ingredients: List[str], require_all: bool = False) -> List[Tuple[int, int, int]]:
+        """
+        Recipes using at least one inventory ingredient, best first
+
+        Order: highest coverage (matched / recipe ingredient count), then
+        fewest missing ingredients, then most matched, then id.
+
+        Args:
+            ingredients: Inventory
+            require_all: Only recipes using every inventory ingredient
+                (posting-list intersection instead of union)
+
+        Returns:
+            [(recipe_id, matched, recipe_size), ...]
+        """
+        matched = Counter()
+        for key in self.terms(ingredients):
+            matched.update(self.postings[key])
+        if require_all:
+            keep = set(self.containing_all(ingredients))
+            matched = {recipe_id: count for recipe_id, count in matched.items() if recipe_id in keep}
+
+        ranked = [(recipe_id, count, self.recipe_sizes[recipe_id]) for recipe_id, count in matched.items()]
+        ranked.sort(key=lambda r: (-r[1] / r[2], r[2] - r[1], -r[1], r[0]))
+        return ranked
+
+
+def text_ingredient_pairs(recipes: Iterable[Tuple[int, Optional[str]]]) -> Iterator[Tuple[int, str]]:
+    """(recipe_id, canonical ingredient) pairs of comma-separated ingredient lists"""
+    for recipe_id, text in recipes:
+        if text:
+            for part in text.split(","):
+                yield recipe_id, canonical_ingredient(part)
+
+
+def db_ingredient_pairs(session: Session) -> Iterator[Tuple[int, str]]:
+    """
+    (recipe_id, canonical ingredient) pairs of the recipes table
+
+    The seed scripts only fill recipes.available_ingredients, so that text is
+    the source; recipe_ingredients links are added where they exist.
+    """
+    recipes = session.query(db_models.Recipe.id, db_models.Recipe.available_ingredients)
+    yield from text_ingredient_pairs((r.id, r.available_ingredients) for r in recipes)
+
+    links = session.query(
+        db_models.recipe_ingredients.c.recipe_id,
+        db_models.Ingredient.name,
+        db_models.Ingredient.name_normalized
+    ).join(
+        db_models.Ingredient, db_models.Ingredient.id == db_models.recipe_ingredients.c.ingredient_id
+    )
+    for row in links:
+        yield row.recipe_id, (" ".join(row.name_normalized.split()) if row.name_normalized
+                              else canonical_ingredient(row.name))
+
+
+def build_index_from_db(session: Session) -> IngredientRecipeIndex:
+    """Index over the recipes table (available_ingredients + recipe_ingredients links)"""
+    return IngredientRecipeIndex(db_ingredient_pairs(session))
+
+
+def build_index_from_text(recipes: Iterable[Tuple[int, Optional[str]]]) -> IngredientRecipeIndex:
+    """Index over comma-separated ingredient lists ("Tavuk, Domates, Biber")"""
+    return IngredientRecipeIndex(text_ingredient_pairs(recipes))
@@ -0,0 +1,300 @@
+"""
+Recipe Repository
+Tarif verisini process başına bir kez yükler, istek başına RecipeService view'ları buna bağlanır
+"""
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from config import settings
+from db import models as db_models
+from db.data_versions import get_data_version
+from models.recipe import Recipe
+from services.recipe_bitset import artifact_path
+from utils.allergen_mapping import compute_allergen_mask, get_recipe_allergen_text
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+RECIPES_JSON = DATA_DIR / "recipes.json"
+RECIPES_EN_JSON = DATA_DIR / "recipes_en.json"
+
+# Varsayılan yemek görselleri (placeholder)
+DEFAULT_FOOD_IMAGES = [
+    "https://images.unsplash.com/photo-1546069901-ba9599a7e63c?w=400",
+    "https://images.unsplash.com/photo-1567620905732-2d1ec7ab7445?w=400",
+    "https://images.unsplash.com/photo-1565299624946-b28f40a0ae38?w=400",
+    "https://images.unsplash.com/photo-1540189549336-e6e99c3679fe?w=400",
+    "https://images.unsplash.com/photo-1565958011703-44f9829ba187?w=400",
+    "https://images.unsplash.com/photo-1504674900247-0877df9cc836?w=400",
+    "https://images.unsplash.com/photo-1512621776951-a57141f2eefd?w=400",
+]
+
+
+def get_default_image_url() -> str:
+    """Rastgele varsayılan görsel URL'i döndür"""
+    return random.choice(DEFAULT_FOOD_IMAGES)
+
+
+def ensure_image_url(image_url: Optional[str]) -> str:
+    """Görsel URL'i kontrol et, boşsa varsayılan döndür"""
+    if image_url and image_url.strip() and not image_url.startswith("https://example.com"):
+        return image_url
+    return get_default_image_url()
+
+
+def load_hardcoded_recipes() -> List[Recipe]:
+    """Turkce demo tarifleri recipes.json dosyasindan yukle"""
+    try:
+        with open(RECIPES_JSON, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        return [
+            Recipe(
+                id=item["id"],
+                title=item["title"],
+                cooking_time=item["cooking_time"],
+                calories=item["calories"],
+                servings=item.get("servings", 4),
+                recommendation_reason=item.get("recommendation_reason"),
+                available_ingredients=item.get("available_ingredients", ""),
+                image_url=ensure_image_url(item.get("image_url", "")),
+                instructions=item.get("instructions", [])
+            )
+            for item in data
+        ]
+
+    except Exception as e:
+        print(f"[RecipeRepository] Error loading recipes.json: {e}")
+        return []
+
+
+def load_json_recipes() -> List[Recipe]:
+    """Ingilizce tarifleri recipes_en.json dosyasindan yukle"""
+    try:
+        with open(RECIPES_EN_JSON, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        return [
+            Recipe(
+                id=item["id"],
+                title=item["title"],
+                cooking_time=item.get("cooking_time", 30),
+                calories=item.get("calories", 300),
+                servings=item.get("servings", 4),
+                recommendation_reason=item.get("recommendation_reason"),
+                available_ingredients=item.get("available_ingredients", ""),
+                image_url=ensure_image_url(item.get("image_url", "")),
+                instructions=item.get("instructions", [])
+            )
+            for item in data
+        ]
+
+    except Exception as e:
+        print(f"[RecipeRepository] Error loading recipes_en.json: {e}")
+        return []
+
+
+class VersionedState:
+    """
+    One loaded version of a recipe source
+
+    Derived structures (indices etc.) are built once per version with
+    `derived(key, builder)` and dropped together with the version.
+    """
+
+    def __init__(self, version: int, fingerprint: Tuple):
+        self.version = version
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+        self._derived: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def derived(self, key: str, builder: Callable[[], Any]) -> Any:
+        """Cached value for this version, built on first use"""
+        value = self._derived.get(key)
+        if value is None:
+            with self._lock:
+                value = self._derived.get(key)
+                if value is None:
+                    value = builder()
+                    self._derived[key] = value
+        return value
+
+
+class RecipeCollection(VersionedState):
+    """JSON demo recipes (recipes.json + recipes_en.json), immutable"""
+
+    def __init__(self, recipes: List[Recipe], version: int, fingerprint: Tuple,
+                 en_source_ids: Optional[Dict[int, int]] = None):
+        super().__init__(version, fingerprint)
+        self.recipes = recipes
+        # recipes_en.json recipes: collection id -> id in the source dataset
+        # (same ids as recipes_en_full.json)
+        self.en_source_ids = en_source_ids or {}
+        self.by_id = {recipe.id: recipe for recipe in recipes}
+        # Arama için lowercase formlar bir kez hesaplanır (DB'deki title_lower / ingredients_lower gibi)
+        self.lower = [
+            (recipe.title.lower(), (recipe.available_ingredients or "").lower())
+            for recipe in recipes
+        ]
+        # Alerjen bitmask'leri (DB'deki allergen_mask kolonu gibi), id -> mask
+        self.allergen_masks = {
+            recipe.id: compute_allergen_mask(get_recipe_allergen_text(recipe)) for recipe in recipes
+        }
+
+
+class RecipeRepository:
+    """
+    Process-wide recipe data
+
+    - JSON mode: recipes are parsed once and reloaded only when the source
+      files' mtime changes
+    - DB mode: rows are queried per request, but a DB version (row count +
+      max id + the trigger-maintained data_versions counter, which also sees
+      title / ingredient edits made by other processes; bumped immediately on
+      such commits in this process) tells per-version derived structures
+      when to rebuild
+
+    Sources are re-checked at most every `ttl` seconds.
+    """
+
+    def __init__(self, ttl: float = 60):
+        self.ttl = ttl
+        self._collection: Optional[RecipeCollection] = None
+        self._collection_checked_at = 0.0
+        self._db_state: Optional[VersionedState] = None
+        self._db_checked_at = 0.0
+        self._db_dirty = False
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def invalidate(self):
+        """Re-read the DB version on next access"""
+        self._db_dirty = True
+
+    def collection(self) -> RecipeCollection:
+        """JSON demo recipes, reloaded if the files changed"""
+        collection = self._collection
+        if collection is not None and time.time() - self._collection_checked_at < self.ttl:
+            return collection
+
+        with self._lock:
+            if self._collection is not None and time.time() - self._collection_checked_at < self.ttl:
+                return self._collection
+
+            # The en_full bitsets are part of the demo matrix (RecipeService)
+            fingerprint = tuple(
+                path.stat().st_mtime_ns if path.exists() else None
+                for path in (RECIPES_JSON, RECIPES_EN_JSON, artifact_path("en_full"))
+            )
+            self._collection_checked_at = time.time()
+            if self._collection is not None and fingerprint == self._collection.fingerprint:
+                return self._collection
+
+            hardcoded = load_hardcoded_recipes()
+            json_recipes = load_json_recipes()
+            en_source_ids = {recipe.id: recipe.id for recipe in json_recipes}
+            if hardcoded and json_recipes:
+                max_id = max(r.id for r in hardcoded)
+                en_source_ids = {}
+                for recipe in json_recipes:
+                    en_source_ids[recipe.id + max_id] = recipe.id
+                    recipe.id = recipe.id + max_id
+
+            version = self._collection.version + 1 if self._collection else 1
+            self._collection = RecipeCollection(hardcoded + json_recipes, version, fingerprint, en_source_ids)
+            self.reloads += 1
+            print(f"[RecipeRepository] v{version} yuklendi: {len(hardcoded)} hardcoded + "
+                  f"{len(json_recipes)} JSON = {len(self._collection.recipes)} toplam tarif")
+            return self._collection
+
+    def db_state(self, session: Session) -> VersionedState:
+        """Current DB version of the recipes table"""
+        state = self._db_state
+        if state is not None and not self._db_dirty and time.time() - self._db_checked_at < self.ttl:
+            return state
+
+        with self._lock:
+            if self._db_state is not None and not self._db_dirty and time.time() - self._db_checked_at < self.ttl:
+                return self._db_state
+
+            dirty = self._db_dirty
+            self._db_dirty = False
+            try:
+                count, max_id = session.query(
+                    func.count(db_models.Recipe.id), func.max(db_models.Recipe.id)
+                ).one()
+                data_version = get_data_version(session, "recipes")
+            except Exception:
+                self._db_dirty = self._db_dirty or dirty
+                raise
+
+            fingerprint = (count, max_id, data_version)
+            self._db_checked_at = time.time()
+            if self._db_state is None or dirty or fingerprint != self._db_state.fingerprint:
+                version = self._db_state.version + 1 if self._db_state else 1
+                self._db_state = VersionedState(version, fingerprint)
+            return self._db_state
+
+    def stats(self) -> Dict:
+        """Repository state"""
+        return {
+            "json_version": self._collection.version if self._collection else 0,
+            "json_recipes": len(self._collection.recipes) if self._collection else 0,
+            "db_version": self._db_state.version if self._db_state else 0,
+            "reloads": self.reloads,
+            "ttl": self.ttl
+        }
+
+
+# Singleton instance
+_repository: Optional[RecipeRepository] = None
+_repository_lock = threading.Lock()
+
+def get_recipe_repository() -> RecipeRepository:
+    """Singleton recipe repository"""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = RecipeRepository(ttl=settings.recipe_repository_ttl)
+    return _repository
+
+
+# New DB version on recipe writes from this process (after the commit).
+# Popularity / view count updates do not change the recipe data, so only
+# title and ingredient edits (text or recipe_ingredients links) count as updates.
+_CHANGED_KEY = "recipes_changed"
+_CONTENT_ATTRIBUTES = ("title", "available_ingredients", "ingredients")
+
+def _mark_changed(session):
+    if session is not None:
+        session.info[_CHANGED_KEY] = True
+
+@event.listens_for(db_models.Recipe, "after_insert")
+@event.listens_for(db_models.Recipe, "after_delete")
+def _recipe_added_or_removed(mapper, connection, target):
+    _mark_changed(Session.object_session(target))
+
+@event.listens_for(db_models.Recipe, "after_update")
+def _recipe_updated(mapper, connection, target):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _CONTENT_ATTRIBUTES):
+        _mark_changed(Session.object_session(target))
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session):
+    if session.info.pop(_CHANGED_KEY, False) and _repository is not None:
+        _repository.invalidate()
+
+@event.listens_for(Session, "after_rollback")
+def _clear_on_rollback(session):
+    session.info.pop(_CHANGED_KEY, None)
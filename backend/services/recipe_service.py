@@ -4,124 +4,140 @@ Demo veriler ve tarif öneri mantığı
 """
 import time
 import json
-import random
-from pathlib import Path
 from models.recipe import Recipe
 from models.user_context import UserContext
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import Callable, List, Optional
 from sqlalchemy import or_
+from sqlalchemy.orm import Session
 from db import models as db_models
-from utils.allergen_mapping import filter_recipes_by_allergens
-
-
-# Varsayılan yemek görselleri (placeholder)
-DEFAULT_FOOD_IMAGES = [
-    "https://images.unsplash.com/photo-1546069901-ba9599a7e63c?w=400",
-    "https://images.unsplash.com/photo-1567620905732-2d1ec7ab7445?w=400",
-    "https://images.unsplash.com/photo-1565299624946-b28f40a0ae38?w=400",
-    "https://images.unsplash.com/photo-1540189549336-e6e99c3679fe?w=400",
-    "https://images.unsplash.com/photo-1565958011703-44f9829ba187?w=400",
-    "https://images.unsplash.com/photo-1504674900247-0877df9cc836?w=400",
-    "https://images.unsplash.com/photo-1512621776951-a57141f2eefd?w=400",
-]
-
-
-def get_default_image_url() -> str:
-    """Rastgele varsayılan görsel URL'i döndür"""
-    return random.choice(DEFAULT_FOOD_IMAGES)
-
-
-def ensure_image_url(image_url: Optional[str]) -> str:
-    """Görsel URL'i kontrol et, boşsa varsayılan döndür"""
-    if image_url and image_url.strip() and not image_url.startswith("https://example.com"):
-        return image_url
-    return get_default_image_url()
+from db.text_search import filter_by_text, filter_by_ingredients
+from services.recipe_bitset import RecipeBitsetMatrix, build_matrix_from_demo, load_db_matrix
+from services.recipe_index import IngredientRecipeIndex, build_index_from_db, build_index_from_text
+from services.recipe_repository import (
+    RecipeRepository,
+    get_recipe_repository,
+    ensure_image_url,
+    get_default_image_url,
+)
+from utils.allergen_mapping import contains_allergen, get_allergen_mask
+
+# Ranked recipe ids are loaded in chunks until `limit` recipes pass the SQL filters
+RANKED_FETCH_CHUNK = 500
+# Minimum batch size when rows are streamed until `limit` of them pass a Python check
+STREAM_BATCH_MIN = 50
 
 
 class RecipeService:
-    """Tarif servisi - DB + demo + JSON implementation"""
+    """
+    Tarif servisi - DB + demo + JSON implementation
+
+    Hafif, istek başına view: veri process genelindeki RecipeRepository'de
+    bir kez yüklenir, bu nesne sadece DB session'ını taşır.
+    """
 
-    def __init__(self, db: Session = None):
+    def __init__(self, db: Session = None, repository: Optional[RecipeRepository] = None):
         self.db = db
+        self.repository = repository or get_recipe_repository()
         if not self.db:
-            hardcoded = self._load_hardcoded_recipes()
-            json_recipes = self._load_json_recipes()
-
-            if hardcoded and json_recipes:
-                max_id = max(r.id for r in hardcoded)
-                for recipe in json_recipes:
-                    recipe.id = recipe.id + max_id
-
-            self.demo_recipes = hardcoded + json_recipes
-            print(f"[RecipeService] Yuklendi: {len(hardcoded)} hardcoded + {len(json_recipes)} JSON = {len(self.demo_recipes)} toplam tarif")
+            collection = self.repository.collection()
+            self._collection = collection
+            self.demo_recipes = collection.recipes
+            self._demo_by_id = collection.by_id
+            self._demo_lower = collection.lower
+            self._demo_allergen_masks = collection.allergen_masks
         else:
             self.demo_recipes = None
 
-    def _load_hardcoded_recipes(self) -> List[Recipe]:
-        """Turkce demo tarifleri recipes.json dosyasindan yukle"""
-        current_dir = Path(__file__).parent
-        json_path = current_dir.parent / "data" / "recipes.json"
-
-        try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            recipes = [
-                Recipe(
-                    id=item["id"],
-                    title=item["title"],
-                    cooking_time=item["cooking_time"],
-                    calories=item["calories"],
-                    servings=item.get("servings", 4),
-                    recommendation_reason=item.get("recommendation_reason"),
-                    available_ingredients=item.get("available_ingredients", ""),
-                    image_url=ensure_image_url(item.get("image_url", "")),
-                    instructions=item.get("instructions", [])
-                )
-                for item in data
-            ]
-            return recipes
-
-        except Exception as e:
-            print(f"[RecipeService] Error loading recipes.json: {e}")
-            return []
-
-    def _load_json_recipes(self) -> List[Recipe]:
-        """Ingilizce tarifleri recipes_en.json dosyasindan yukle"""
-        current_dir = Path(__file__).parent
-        json_path = current_dir.parent / "data" / "recipes_en.json"
-
-        try:
-            with open(json_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            recipes = [
-                Recipe(
-                    id=item["id"],
-                    title=item["title"],
-                    cooking_time=item.get("cooking_time", 30),
-                    calories=item.get("calories", 300),
-                    servings=item.get("servings", 4),
-                    recommendation_reason=item.get("recommendation_reason"),
-                    available_ingredients=item.get("available_ingredients", ""),
-                    image_url=ensure_image_url(item.get("image_url", "")),
-                    instructions=item.get("instructions", [])
-                )
-                for item in data
-            ]
-            return recipes
-
-        except Exception as e:
-            print(f"[RecipeService] Error loading recipes_en.json: {e}")
-            return []
-
     def _ensure_recipe_image(self, recipe: Recipe) -> Recipe:
         """Tarif görselini kontrol et ve gerekirse varsayılan ekle"""
         if not recipe.image_url or recipe.image_url.startswith("https://example.com"):
             recipe.image_url = get_default_image_url()
         return recipe
 
+    def _ingredient_index(self) -> IngredientRecipeIndex:
+        """Malzeme -> tarif inverted index (veri versiyonu başına bir kez kurulur)"""
+        if self.db:
+            state = self.repository.db_state(self.db)
+            return state.derived("ingredient_index", lambda: build_index_from_db(self.db))
+        return self._collection.derived("ingredient_index", lambda: build_index_from_text(
+            (recipe.id, recipe.available_ingredients) for recipe in self.demo_recipes
+        ))
+
+    def _bitset_matrix(self) -> RecipeBitsetMatrix:
+        """Tarif x malzeme bitset matrisi (veri versiyonu başına bir kez yüklenir)"""
+        if self.db:
+            state = self.repository.db_state(self.db)
+            return state.derived("bitset_matrix", lambda: load_db_matrix(self.db))
+        return self._collection.derived("bitset_matrix", lambda: build_matrix_from_demo(
+            ((recipe.id, recipe.available_ingredients) for recipe in self.demo_recipes),
+            self._collection.en_source_ids
+        ))
+
+    def _fetch_ranked(self, query, recipe_ids: List[int], limit: int,
+                      keep: Optional[Callable[[db_models.Recipe], bool]] = None) -> List[db_models.Recipe]:
+        """Rows of the ranked ids passing the query filters (and keep), in rank order"""
+        results = []
+        for start in range(0, len(recipe_ids), RANKED_FETCH_CHUNK):
+            chunk = recipe_ids[start:start + RANKED_FETCH_CHUNK]
+            rows = {r.id: r for r in query.filter(db_models.Recipe.id.in_(chunk)).all()}
+            results.extend(
+                rows[recipe_id] for recipe_id in chunk
+                if recipe_id in rows and (keep is None or keep(rows[recipe_id]))
+            )
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def _fetch_limited(self, query, limit: int,
+                       keep: Optional[Callable[[db_models.Recipe], bool]] = None,
+                       ordered: bool = False) -> List[db_models.Recipe]:
+        """
+        First `limit` rows of the query passing keep, read in batches
+
+        Unordered queries are paged by id (WHERE id > last id ORDER BY id),
+        so each batch is a primary key range scan instead of re-reading all
+        skipped rows as OFFSET would. Ordered queries (ranked text match)
+        keep their order and are read in a single pass with a streaming
+        cursor.
+        """
+        if keep is None:
+            return query.limit(limit).all()
+
+        batch = max(limit, STREAM_BATCH_MIN)
+        results = []
+        if ordered:
+            rows = self.db.execute(query.statement, execution_options={"yield_per": batch}).scalars()
+            try:
+                for row in rows:
+                    if keep(row):
+                        results.append(row)
+                        if len(results) >= limit:
+                            break
+            finally:
+                rows.close()
+            return results
+
+        query = query.order_by(db_models.Recipe.id)
+        last_id = None
+        while len(results) < limit:
+            page = query if last_id is None else query.filter(db_models.Recipe.id > last_id)
+            rows = page.limit(batch).all()
+            results.extend(r for r in rows if keep(r))
+            if len(rows) < batch:
+                break
+            last_id = rows[-1].id
+        return results[:limit]
+
+    @staticmethod
+    def _allergen_safe(allergens: List[str]) -> Callable[[db_models.Recipe], bool]:
+        """
+        Row check complementing the SQL mask filter: rows whose allergen_mask
+        is not computed yet (NULL) are checked by text
+        """
+        def is_safe(row: db_models.Recipe) -> bool:
+            return row.allergen_mask is not None or not contains_allergen(row.available_ingredients or "", allergens)
+        return is_safe
+
     def filter_recipes(self, q: Optional[str] = None, max_time: Optional[int] = None, limit: int = 20) -> List[Recipe]:
         """Filter recipes by query and max cooking time"""
         start_time = time.time()
@@ -130,12 +146,8 @@ class RecipeService:
             query = self.db.query(db_models.Recipe)
 
             if q:
-                query = query.filter(
-                    or_(
-                        db_models.Recipe.title.ilike(f"%{q}%"),
-                        db_models.Recipe.available_ingredients.ilike(f"%{q}%")
-                    )
-                )
+                # Indexed + ranked (pg_trgm / FTS5), LIKE on lowercase columns otherwise
+                query = filter_by_text(self.db, query, q)
 
             if max_time:
                 query = query.filter(db_models.Recipe.cooking_time <= max_time)
@@ -157,14 +169,13 @@ class RecipeService:
             ]
         else:
             results = []
-            for recipe in self.demo_recipes:
+            q_lower = q.lower() if q else None
+            for recipe, (title_lower, ingredients_lower) in zip(self.demo_recipes, self._demo_lower):
                 if max_time and recipe.cooking_time > max_time:
                     continue
 
-                if q:
-                    q_lower = q.lower()
-                    if q_lower not in recipe.title.lower() and q_lower not in (recipe.available_ingredients or "").lower():
-                        continue
+                if q_lower and q_lower not in title_lower and q_lower not in ingredients_lower:
+                    continue
 
                 results.append(self._ensure_recipe_image(recipe))
                 if len(results) >= limit:
@@ -182,7 +193,9 @@ class RecipeService:
         max_cooking_time: int = None,
         max_calories: int = None,
         limit: int = 20,
-        user_context: UserContext = None
+        user_context: UserContext = None,
+        max_missing: Optional[int] = None,
+        match_all: bool = False
     ) -> tuple[List[Recipe], List[str]]:
         """
         Malzemelere göre tarif önerileri döndür
@@ -194,6 +207,10 @@ class RecipeService:
             max_calories: Maksimum kalori
             limit: Sonuç limiti
             user_context: Kullanıcı bağlamı (alerjenler, tercihler vs.)
+            max_missing: Verilirse "ne pişirebilirim" modu: en fazla bu kadar
+                eksik malzemesi olan tarifler (0 = tamamen pişirilebilir)
+            match_all: Sadece verilen malzemelerin hepsini kullanan tarifler
+                (posting listelerinin kesişimi)
 
         Returns:
             Tarif listesi ve eşleşen malzemeler
@@ -213,6 +230,27 @@ class RecipeService:
             if max_calories is None:
                 max_calories = user_context.get_max_calories_from_prefs()
 
+        if max_missing is not None and ingredients:
+            return self.get_cookable_recipes(
+                ingredients, max_missing=max_missing, allergens=allergens,
+                max_cooking_time=max_cooking_time, max_calories=max_calories, limit=limit
+            )
+
+        # Inverted index: recipes ranked by coverage (matched / recipe size),
+        # then fewest missing ingredients. An ingredient matches recipe
+        # ingredients equal to it or starting with it as whole words ("tavuk"
+        # -> "tavuk göğsü"), not arbitrary substrings as the text match did.
+        # Ingredients matching no recipe ingredient are ignored while others
+        # match; text matching is the fallback only when none matches (not
+        # with match_all: then no recipe uses all of them).
+        index = self._ingredient_index() if ingredients else None
+        ranked = index.rank(ingredients, require_all=match_all) if index else []
+        match_all = match_all and bool(ingredients)
+
+        # Allergens are excluded with the precomputed masks before the limit
+        # (safe if mask & user_mask == 0)
+        user_mask = get_allergen_mask(allergens)
+
         if self.db:
             query = self.db.query(db_models.Recipe)
 
@@ -222,14 +260,25 @@ class RecipeService:
             if max_calories:
                 query = query.filter(db_models.Recipe.calories <= max_calories)
 
-            if ingredients:
-                conditions = []
-                for ing in ingredients:
-                    conditions.append(db_models.Recipe.available_ingredients.ilike(f"%{ing}%"))
-                if conditions:
-                    query = query.filter(or_(*conditions))
+            keep = None
+            if user_mask:
+                # NULL = not computed yet (not backfilled), checked by text while fetching
+                query = query.filter(or_(
+                    db_models.Recipe.allergen_mask.is_(None),
+                    db_models.Recipe.allergen_mask.op("&")(user_mask) == 0
+                ))
+                keep = self._allergen_safe(allergens)
 
-            db_recipes = query.limit(limit).all()
+            if ranked:
+                db_recipes = self._fetch_ranked(query, [recipe_id for recipe_id, _, _ in ranked], limit, keep)
+            elif match_all:
+                db_recipes = []
+            else:
+                if ingredients:
+                    # Not in the index: text match, recipes matching more ingredients first
+                    query = filter_by_ingredients(self.db, query, ingredients)
+                db_recipes = self._fetch_limited(query, limit, keep, ordered=bool(ingredients))
+            ingredients_lower_by_id = {r.id: r.ingredients_lower or "" for r in db_recipes}
 
             filtered_recipes = [
                 self._ensure_recipe_image(Recipe(
@@ -246,46 +295,118 @@ class RecipeService:
             ]
         else:
             filtered_recipes = []
+            ingredients_lower_by_id = {}
 
-            for recipe in self.demo_recipes:
-                if max_cooking_time and recipe.cooking_time > max_cooking_time:
-                    continue
+            if ranked:
+                for recipe_id, _, _ in ranked:
+                    recipe = self._demo_by_id[recipe_id]
+                    if max_cooking_time and recipe.cooking_time > max_cooking_time:
+                        continue
+                    if max_calories and recipe.calories > max_calories:
+                        continue
+                    if self._demo_allergen_masks[recipe_id] & user_mask:
+                        continue
+                    filtered_recipes.append(self._ensure_recipe_image(recipe))
+                    if len(filtered_recipes) >= limit:
+                        break
+            elif not match_all:
+                query_ingredients = [ing.lower() for ing in ingredients]
 
-                if max_calories and recipe.calories > max_calories:
-                    continue
+                for recipe, (_, recipe_ingredients) in zip(self.demo_recipes, self._demo_lower):
+                    if max_cooking_time and recipe.cooking_time > max_cooking_time:
+                        continue
+
+                    if max_calories and recipe.calories > max_calories:
+                        continue
+
+                    if self._demo_allergen_masks[recipe.id] & user_mask:
+                        continue
+
+                    if query_ingredients and not any(ing in recipe_ingredients for ing in query_ingredients):
+                        continue
 
-                if ingredients:
-                    recipe_ingredients = recipe.available_ingredients.lower() if recipe.available_ingredients else ""
-                    has_match = any(ing.lower() in recipe_ingredients for ing in ingredients)
-                    if has_match:
-                        filtered_recipes.append(self._ensure_recipe_image(recipe))
-                else:
                     filtered_recipes.append(self._ensure_recipe_image(recipe))
+                    ingredients_lower_by_id[recipe.id] = recipe_ingredients
 
-            filtered_recipes = filtered_recipes[:limit]
+                filtered_recipes = filtered_recipes[:limit]
 
-        # Apply allergen hard filter - remove recipes containing allergens
-        if allergens:
-            pre_filter_count = len(filtered_recipes)
-            # Convert Recipe objects to dicts for filtering
-            recipe_dicts = [
-                {"available_ingredients": r.available_ingredients, "recipe": r}
+        if ranked:
+            matched_ingredients = index.matching(ingredients, (r.id for r in filtered_recipes))
+        else:
+            matched_ingredients = [ing for ing in ingredients if any(
+                ing.lower() in ingredients_lower_by_id.get(r.id, "")
                 for r in filtered_recipes
-            ]
-            safe_recipe_dicts = filter_recipes_by_allergens(recipe_dicts, allergens)
-            filtered_recipes = [rd["recipe"] for rd in safe_recipe_dicts]
-            print(f"[RecipeService] Allergen filter: {pre_filter_count} -> {len(filtered_recipes)} recipes (allergens: {allergens})")
-
-        matched_ingredients = [ing for ing in ingredients if any(
-            ing.lower() in (r.available_ingredients or "").lower()
-            for r in filtered_recipes
-        )]
+            )]
 
         latency_ms = (time.time() - start_time) * 1000
         print(f"[RecipeService.recommendations] ingredients={len(ingredients)}, results={len(filtered_recipes)}, latency={latency_ms:.1f}ms")
 
         return filtered_recipes, matched_ingredients
 
+    def get_cookable_recipes(
+        self,
+        ingredients: List[str],
+        max_missing: int = 0,
+        allergens: Optional[List[str]] = None,
+        max_cooking_time: Optional[int] = None,
+        max_calories: Optional[int] = None,
+        limit: int = 20
+    ) -> tuple[List[Recipe], List[str]]:
+        """
+        Buzdolabındaki malzemelerle pişirilebilecek tarifler (bitset matrisi)
+
+        Eksik malzeme sayısı ve alerjen kontrolü tüm tarifler için tek
+        seferde AND / popcount ile yapılır; sıralama: en az eksik, sonra en
+        çok eşleşen malzeme.
+
+        Returns:
+            Tarif listesi ve eşleşen malzemeler
+        """
+        start_time = time.time()
+        matrix = self._bitset_matrix()
+        recipe_ids, _, _ = matrix.query(ingredients, max_missing=max(0, max_missing), allergens=allergens)
+        recipe_ids = recipe_ids.tolist()
+
+        if self.db:
+            query = self.db.query(db_models.Recipe)
+            if max_cooking_time:
+                query = query.filter(db_models.Recipe.cooking_time <= max_cooking_time)
+            if max_calories:
+                query = query.filter(db_models.Recipe.calories <= max_calories)
+
+            results = [
+                self._ensure_recipe_image(Recipe(
+                    id=r.id,
+                    title=r.title,
+                    cooking_time=r.cooking_time,
+                    calories=r.calories,
+                    servings=r.servings,
+                    recommendation_reason=r.recommendation_reason,
+                    available_ingredients=r.available_ingredients,
+                    image_url=r.image_url or "",
+                    instructions=json.loads(r.instructions) if r.instructions else []
+                )) for r in self._fetch_ranked(query, recipe_ids, limit)
+            ]
+        else:
+            results = []
+            for recipe_id in recipe_ids:
+                recipe = self._demo_by_id[recipe_id]
+                if max_cooking_time and recipe.cooking_time > max_cooking_time:
+                    continue
+                if max_calories and recipe.calories > max_calories:
+                    continue
+                results.append(self._ensure_recipe_image(recipe))
+                if len(results) >= limit:
+                    break
+
+        matched_ingredients = matrix.matching(ingredients, (r.id for r in results))
+
+        latency_ms = (time.time() - start_time) * 1000
+        print(f"[RecipeService.cookable] ingredients={len(ingredients)}, max_missing={max_missing}, "
+              f"results={len(results)}, latency={latency_ms:.1f}ms")
+
+        return results, matched_ingredients
+
     def search_recipes(self, query: str, limit: int = 20) -> List[Recipe]:
         """Tarif ara"""
         if not query:
@@ -310,8 +431,6 @@ class RecipeService:
                 ))
             return None
         else:
-            for recipe in self.demo_recipes:
-                if recipe.id == recipe_id:
-                    return self._ensure_recipe_image(recipe)
-            return None
+            recipe = self._demo_by_id.get(recipe_id)
+            return self._ensure_recipe_image(recipe) if recipe else None
 
@@ -0,0 +1,127 @@
+"""
+Recipe Store
+FAISS satır sırasıyla hizalı, sütun bazlı tarif metadata'sı
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from models.recipe import RecipeSearchResult
+from utils.allergen_mapping import compute_allergen_mask, get_allergen_mask, get_recipe_allergen_text
+
+# Neutral values for recipes without the attribute (never excluded by a realistic limit)
+DEFAULT_COOKING_TIME = 999
+DEFAULT_CALORIES = 9999
+
+
+class RecipeStore:
+    """
+    Columnar recipe metadata, one entry per FAISS index row
+
+    Search results are assembled by fancy-indexing these columns with the
+    FAISS result rows, so no full recipe dict is touched or copied per hit.
+    The per-row attribute columns double as the filter arrays for
+    constrained search (see eligible_rows).
+    """
+
+    def __init__(self, recipe_ids: np.ndarray, recipes_data: Dict[int, Dict[str, Any]]):
+        n_rows = len(recipe_ids)
+        self.ids = np.asarray(recipe_ids, dtype=np.int64)
+        self.row_of = {int(recipe_id): row for row, recipe_id in enumerate(self.ids)}
+
+        self.valid = np.zeros(n_rows, dtype=bool)
+        self.titles = np.full(n_rows, "", dtype=object)
+        self.ingredients = np.empty(n_rows, dtype=object)
+        self.image_names = np.full(n_rows, None, dtype=object)
+        self.popularity = np.zeros(n_rows, dtype=np.float64)
+        self.cooking_time = np.full(n_rows, DEFAULT_COOKING_TIME, dtype=np.int32)
+        self.calories = np.full(n_rows, DEFAULT_CALORIES, dtype=np.int32)
+        self.allergen_mask = np.zeros(n_rows, dtype=np.int64)
+
+        for row, recipe_id in enumerate(self.ids.tolist()):
+            recipe = recipes_data.get(recipe_id)
+            if recipe is None:
+                self.ingredients[row] = []
+                continue
+            self.valid[row] = True
+            self.titles[row] = recipe.get('title', '')
+            self.ingredients[row] = recipe.get('ingredients') or []
+            self.image_names[row] = recipe.get('image_name')
+            self.popularity[row] = recipe.get('popularity_score', 0.0)
+            self.cooking_time[row] = recipe.get('cooking_time', DEFAULT_COOKING_TIME)
+            self.calories[row] = recipe.get('calories', DEFAULT_CALORIES)
+            # Precomputed by process_full_recipes.py; older files: scan the text
+            mask = recipe.get('allergen_mask')
+            self.allergen_mask[row] = (
+                mask if mask is not None else compute_allergen_mask(get_recipe_allergen_text(recipe))
+            )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def eligible_rows(self, allergens: Optional[List[str]] = None, max_cooking_time: Optional[int] = None,
+                      max_calories: Optional[int] = None) -> np.ndarray:
+        """Boolean mask of index rows satisfying the constraints"""
+        eligible = self.valid.copy()
+
+        user_mask = get_allergen_mask(allergens)
+        if user_mask:
+            eligible &= (self.allergen_mask & user_mask) == 0
+        if max_cooking_time:
+            eligible &= self.cooking_time <= max_cooking_time
+        if max_calories:
+            eligible &= self.calories <= max_calories
+
+        return eligible
+
+    def results(self, scores: np.ndarray, rows: np.ndarray,
+                min_similarity: Optional[float] = None) -> List[RecipeSearchResult]:
+        """
+        Build result records for FAISS hits
+
+        Args:
+            scores: Cosine similarities, descending
+            rows: Index rows (-1 = no result)
+            min_similarity: Drop hits from the first score below this value
+
+        Returns:
+            RecipeSearchResult records in rank order
+        """
+        scores = np.asarray(scores)
+        rows = np.asarray(rows)
+
+        if min_similarity is not None:
+            below = np.flatnonzero(scores < min_similarity)
+            if len(below):
+                scores, rows = scores[:below[0]], rows[:below[0]]
+
+        keep = (rows >= 0) & (rows < len(self.ids))
+        scores, rows = scores[keep], rows[keep]
+        keep = self.valid[rows]
+        scores, rows = scores[keep], rows[keep]
+
+        return [
+            RecipeSearchResult.model_construct(
+                id=recipe_id,
+                title=title,
+                ingredients=ingredients,
+                similarity_score=similarity,
+                popularity_score=popularity,
+                image_name=image_name
+            )
+            for recipe_id, title, ingredients, similarity, popularity, image_name in zip(
+                self.ids[rows].tolist(),
+                self.titles[rows],
+                self.ingredients[rows],
+                np.round(scores.astype(np.float64), 4).tolist(),
+                self.popularity[rows].tolist(),
+                self.image_names[rows]
+            )
+        ]
+
+    def set_popularity(self, recipe_id: int, popularity_score: float):
+        """Keep the popularity column in sync with view tracking"""
+        row = self.row_of.get(recipe_id)
+        if row is not None:
+            self.popularity[row] = popularity_score
@@ -8,11 +8,93 @@ import numpy as np
 import time
 from pathlib import Path
 from typing import List, Optional, Tuple, Dict, Any
-from sentence_transformers import SentenceTransformer
 import faiss
 from sqlalchemy.orm import Session
 from db import models as db_models
 from models.ingredient import Ingredient
+from models.recipe import RecipeSearchResult
+from config import settings
+from services.batching import MicroBatcher
+from services.cache_service import LRUCache, get_cache
+from services.encoder_backends import create_encoder
+from services.recipe_store import RecipeStore
+
+
+EMBEDDINGS_DIR = Path(__file__).parent.parent / "data" / "embeddings"
+
+# Recipe index variants built by build_multilingual_embeddings.py
+# All variants share the same row order and ID mapping
+RECIPE_INDEX_FILES = {
+    "flat": "recipes_multilingual.index",
+    "ivf": "recipes_multilingual_ivf.index",
+    "hnsw": "recipes_multilingual_hnsw.index",
+    "ivfpq": "recipes_multilingual_ivfpq.index",
+}
+RECIPE_IDS_FILE = "recipes_multilingual.ids"
+# Raw normalized vectors (float32), used for exact re-ranking of compressed indices
+RECIPE_VECTORS_FILE = "recipes_multilingual.vectors.npy"
+# Ingredient rows (id + nutrition) in index order, written by build_embeddings.py
+INGREDIENT_META_FILE = "ingredients.meta.json"
+# Max bound parameters per IN query (SQLite limit is 999 on older builds)
+IN_QUERY_CHUNK_SIZE = 500
+# Index types whose scores are approximate (quantized codes)
+QUANTIZED_INDEX_TYPES = {"ivfpq"}
+# Index types whose inverted lists FAISS can memory-map (IO_FLAG_MMAP)
+MMAP_INDEX_TYPES = {"ivf", "ivfpq"}
+# Rows per block when a filtered search scans a memory-mapped flat index
+MMAP_SEARCH_CHUNK = 16384
+
+
+class MemmapFlatIndex:
+    """
+    Exact (flat) index over a memory-mapped .npy vector file
+
+    FAISS cannot memory-map IndexFlat storage, so flat search runs through
+    faiss.knn on a read-only NumPy memmap instead. Worker processes then share
+    the vector pages through the OS page cache rather than each holding a
+    private copy, and nothing is read up front.
+    """
+
+    def __init__(self, vectors_path: Path, metric_type: int = faiss.METRIC_INNER_PRODUCT):
+        self.vectors = np.load(vectors_path, mmap_mode='r')
+        self.ntotal, self.d = self.vectors.shape
+        self.metric_type = metric_type
+
+    def search(self, x: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        return faiss.knn(np.ascontiguousarray(x, dtype='float32'), self.vectors, k, metric=self.metric_type)
+
+    def search_subset(self, x: np.ndarray, k: int, eligible: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact inner-product search restricted to the rows set in `eligible`
+
+        The memmap is scanned in contiguous blocks (views, no copy) and
+        ineligible rows are masked out of each block's scores, so a filter
+        never copies vectors out of the shared pages. Blocks without an
+        eligible row are skipped.
+        """
+        x = np.ascontiguousarray(x, dtype='float32')
+        n = len(x)
+        best_scores = np.full((n, k), -np.inf, dtype='float32')
+        best_rows = np.full((n, k), -1, dtype='int64')
+
+        for start in range(0, self.ntotal, MMAP_SEARCH_CHUNK):
+            mask = eligible[start:start + MMAP_SEARCH_CHUNK]
+            if not mask.any():
+                continue
+            block = self.vectors[start:start + MMAP_SEARCH_CHUNK]
+            scores = (x @ block.T).astype('float32', copy=False)
+            scores[:, ~mask] = -np.inf
+
+            top = min(k, scores.shape[1])
+            cols = np.argpartition(-scores, top - 1, axis=1)[:, :top]
+            scores = np.concatenate([best_scores, np.take_along_axis(scores, cols, axis=1)], axis=1)
+            rows = np.concatenate([best_rows, cols + start], axis=1)
+            keep = np.argsort(-scores, axis=1, kind='stable')[:, :k]
+            best_scores = np.take_along_axis(scores, keep, axis=1)
+            best_rows = np.take_along_axis(rows, keep, axis=1)
+
+        best_rows[best_scores == -np.inf] = -1
+        return best_scores, best_rows
 
 
 class SemanticSearchService:
@@ -23,59 +105,224 @@ class SemanticSearchService:
     # Fallback to Turkish model for ingredients
     TURKISH_MODEL = "emrecan/bert-base-turkish-cased-mean-nli-stsb-tr"
 
-    def __init__(self, db: Session = None):
-        self.db = db
+    def __init__(self):
+        # Process-wide and shared across request threads: holds no DB
+        # session, requests pass their own (see search)
         self.model = None
         self.ingredient_index = None
         self.ingredient_ids = None
+        # Ingredient per index row (None = missing in DB), no DB access per search
+        self.ingredient_table = None
         self.recipe_index = None
+        self.recipe_index_type = None
+        self.recipe_index_benchmark = None
         self.recipe_ids = None
+        self.recipe_vectors = None
         self.recipes_data = None
+        # Columnar recipe metadata aligned with the index rows (results + filters)
+        self.recipe_store = None
+        # ANN search parameters (recall vs. latency)
+        self.nprobe = settings.recipe_index_nprobe
+        self.ef_search = settings.recipe_index_ef_search
+        self.rerank_candidates = settings.recipe_rerank_candidates
+        # Normalized query -> embedding (skips the transformer on repeats)
+        self.query_cache = LRUCache(max_size=settings.query_cache_size)
+        self.query_cache_persistent_hits = 0
+        # Concurrent recipe searches share one encode + one FAISS search
+        self.recipe_batcher = None
+        if settings.semantic_batching:
+            self.recipe_batcher = MicroBatcher(
+                self._search_recipe_batch,
+                max_batch_size=settings.semantic_batch_max_size,
+                max_wait_ms=settings.semantic_batch_wait_ms,
+                name="recipe-search-batcher"
+            )
         self._load_resources()
 
     def _load_resources(self):
-        """Load model, indices and ID mappings"""
-        try:
-            # Load multilingual model
-            print(f"Loading multilingual semantic model: {self.MULTILINGUAL_MODEL}...")
-            self.model = SentenceTransformer(self.MULTILINGUAL_MODEL)
-            print("✅ Multilingual model loaded")
+        """
+        Load model, indices and ID mappings
 
-            # Load ingredient index (old)
-            self._load_ingredient_index()
+        Load errors propagate, and a service without any index raises, so
+        callers (api.semantic warm-up) never mark an unusable service ready.
+        """
+        # Load multilingual model
+        print(f"Loading multilingual semantic model: {self.MULTILINGUAL_MODEL}...")
+        self.model = create_encoder(self.MULTILINGUAL_MODEL)
+        print(f"✅ Multilingual model loaded (backend: {self.model.backend})")
 
-            # Load recipe index (new multilingual)
-            self._load_recipe_index()
+        # Load ingredient index (old)
+        self._load_ingredient_index()
 
-        except Exception as e:
-            print(f"❌ Error loading semantic search resources: {e}")
+        # Load recipe index (new multilingual)
+        self._load_recipe_index()
+
+        if self.ingredient_index is None and self.recipe_index is None:
+            raise RuntimeError(
+                "No semantic index loaded; run build_embeddings.py / build_multilingual_embeddings.py"
+            )
+
+    def _read_index(self, index_path: Path, vectors_path: Optional[Path] = None,
+                    metric_type: int = faiss.METRIC_INNER_PRODUCT, mmap_supported: bool = False):
+        """
+        Read a FAISS index, memory-mapped when settings.semantic_index_mmap is on
+
+        Args:
+            index_path: FAISS index file
+            vectors_path: Raw .npy vectors of a flat index (served via MemmapFlatIndex)
+            metric_type: Metric of the flat index
+            mmap_supported: FAISS can mmap this index type (IVF inverted lists)
+        """
+        if not settings.semantic_index_mmap:
+            return faiss.read_index(str(index_path))
+
+        if vectors_path is not None and vectors_path.exists():
+            print(f"   mmap: {vectors_path.name}")
+            return MemmapFlatIndex(vectors_path, metric_type)
+
+        if mmap_supported:
+            print(f"   mmap: {index_path.name}")
+            return faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP)
+
+        print(f"⚠️ {index_path.name} cannot be memory-mapped, reading into memory")
+        return faiss.read_index(str(index_path))
 
     def _load_ingredient_index(self):
         """Load ingredient FAISS index"""
-        index_path = Path(__file__).parent.parent / "data" / "embeddings" / "ingredients.index"
+        index_path = EMBEDDINGS_DIR / "ingredients.index"
         if index_path.exists():
             print(f"Loading ingredient FAISS index...")
-            self.ingredient_index = faiss.read_index(str(index_path))
+            self.ingredient_index = self._ensure_cosine_index(self._read_index(
+                index_path,
+                vectors_path=index_path.with_suffix('.vectors.npy'),
+                metric_type=faiss.METRIC_INNER_PRODUCT
+            ))
+
+            if self.model and self.ingredient_index.d != self.model.dimension:
+                print(f"⚠️ Ingredient index dim {self.ingredient_index.d} != model dim {self.model.dimension}. "
+                      f"Re-run build_embeddings.py")
+                self.ingredient_index = None
+                return
 
             id_map_path = index_path.with_suffix('.ids')
             if id_map_path.exists():
                 with open(id_map_path, 'rb') as f:
-                    self.ingredient_ids = pickle.load(f)
+                    self.ingredient_ids = np.asarray(pickle.load(f), dtype=np.int64)
                 print(f"✅ Ingredient index: {self.ingredient_index.ntotal} vectors")
+                self._load_ingredient_table()
         else:
             print("⚠️ Ingredient index not found")
 
+    def _load_ingredient_table(self):
+        """Load ingredient rows saved next to the index (skipped if stale)"""
+        meta_path = EMBEDDINGS_DIR / INGREDIENT_META_FILE
+        if not meta_path.exists():
+            print(f"⚠️ {INGREDIENT_META_FILE} not found, ingredient table will be loaded from DB")
+            return
+
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)
+
+        if [row['id'] for row in rows] != self.ingredient_ids.tolist():
+            print(f"⚠️ {INGREDIENT_META_FILE} does not match the index, re-run build_embeddings.py")
+            return
+
+        self.ingredient_table = [
+            Ingredient(**{k: v for k, v in row.items() if k != 'id'}) for row in rows
+        ]
+        print(f"✅ Ingredient table: {len(self.ingredient_table)} rows")
+
+    def _load_ingredient_table_from_db(self, db: Session):
+        """Build the ingredient table with batched IN queries (once, if no meta file)"""
+        by_id = {}
+        ids = self.ingredient_ids.tolist()
+        for start in range(0, len(ids), IN_QUERY_CHUNK_SIZE):
+            chunk = ids[start:start + IN_QUERY_CHUNK_SIZE]
+            for db_ing in db.query(db_models.Ingredient).filter(db_models.Ingredient.id.in_(chunk)):
+                by_id[db_ing.id] = Ingredient(
+                    name=db_ing.name,
+                    portion_g=db_ing.portion_g,
+                    calories=db_ing.calories,
+                    fat_g=db_ing.fat_g,
+                    carbs_g=db_ing.carbs_g,
+                    protein_g=db_ing.protein_g,
+                    sugar_g=db_ing.sugar_g,
+                    fiber_g=db_ing.fiber_g
+                )
+
+        self.ingredient_table = [by_id.get(ing_id) for ing_id in ids]
+        print(f"✅ Ingredient table (DB): {len(by_id)}/{len(ids)} rows")
+
+    @staticmethod
+    def _ensure_cosine_index(index):
+        """
+        Make a flat index score by cosine similarity
+
+        Indices built before vectors were normalized (IndexFlatL2 over raw
+        embeddings) are converted in memory to a normalized IndexFlatIP.
+        Re-run build_embeddings.py to skip the conversion (and to share the
+        index via mmap).
+        """
+        if isinstance(index, MemmapFlatIndex):
+            sample = np.asarray(index.vectors[:1000], dtype='float32')
+            if np.allclose(np.linalg.norm(sample, axis=1), 1.0, atol=1e-3):
+                return index
+            vectors = np.array(index.vectors, dtype='float32')
+        elif index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            return index
+        else:
+            vectors = index.reconstruct_n(0, index.ntotal)
+
+        print("⚠️ Legacy (unnormalized L2) index, converting to cosine. Re-run build_embeddings.py")
+        faiss.normalize_L2(vectors)
+        cosine_index = faiss.IndexFlatIP(vectors.shape[1])
+        cosine_index.add(vectors)
+        return cosine_index
+
     def _load_recipe_index(self):
-        """Load recipe FAISS index"""
-        index_path = Path(__file__).parent.parent / "data" / "embeddings" / "recipes_multilingual.index"
+        """Load recipe FAISS index (flat, IVF or HNSW - see settings.recipe_index_type)"""
+        index_type = settings.recipe_index_type
+        if index_type not in RECIPE_INDEX_FILES:
+            print(f"⚠️ Unknown recipe index type '{index_type}', using flat")
+            index_type = "flat"
+
+        index_path = EMBEDDINGS_DIR / RECIPE_INDEX_FILES[index_type]
+        if not index_path.exists() and index_type != "flat":
+            print(f"⚠️ {index_type} recipe index not found, falling back to flat. "
+                  f"Run build_multilingual_embeddings.py --ann {index_type}")
+            index_type = "flat"
+            index_path = EMBEDDINGS_DIR / RECIPE_INDEX_FILES[index_type]
+
+        # Compressed-index scores are approximate inner products; without the
+        # raw vectors they could not be re-scored into cosine similarities
+        if index_type in QUANTIZED_INDEX_TYPES and not (EMBEDDINGS_DIR / RECIPE_VECTORS_FILE).exists():
+            print(f"⚠️ {RECIPE_VECTORS_FILE} not found, {index_type} scores cannot be re-scored; "
+                  f"falling back to flat. Run build_multilingual_embeddings.py --ann {index_type}")
+            index_type = "flat"
+            index_path = EMBEDDINGS_DIR / RECIPE_INDEX_FILES[index_type]
+
         if index_path.exists():
-            print(f"Loading recipe FAISS index...")
-            self.recipe_index = faiss.read_index(str(index_path))
+            print(f"Loading recipe FAISS index ({index_type})...")
+            self.recipe_index = self._read_index(
+                index_path,
+                vectors_path=EMBEDDINGS_DIR / RECIPE_VECTORS_FILE if index_type == "flat" else None,
+                mmap_supported=index_type in MMAP_INDEX_TYPES
+            )
+            self.recipe_index_type = index_type
+            self.set_search_params(nprobe=self.nprobe, ef_search=self.ef_search)
 
-            id_map_path = index_path.with_suffix('.ids')
+            if index_type in QUANTIZED_INDEX_TYPES:
+                self._load_recipe_vectors()
+
+            bench_path = index_path.with_suffix('.bench.json')
+            if bench_path.exists():
+                with open(bench_path, 'r', encoding='utf-8') as f:
+                    self.recipe_index_benchmark = json.load(f)
+
+            id_map_path = EMBEDDINGS_DIR / RECIPE_IDS_FILE
             if id_map_path.exists():
                 with open(id_map_path, 'rb') as f:
-                    self.recipe_ids = pickle.load(f)
+                    self.recipe_ids = np.asarray(pickle.load(f), dtype=np.int64)
                 print(f"✅ Recipe index: {self.recipe_index.ntotal} vectors")
 
             # Load recipes data for context
@@ -85,10 +332,233 @@ class SemanticSearchService:
                     recipes_list = json.load(f)
                     self.recipes_data = {r['id']: r for r in recipes_list}
                 print(f"✅ Loaded {len(self.recipes_data)} recipes data")
+                if self.recipe_ids is not None:
+                    self.recipe_store = RecipeStore(self.recipe_ids, self.recipes_data)
+                    print(f"✅ Recipe store: {int(self.recipe_store.valid.sum())} rows")
         else:
             print("⚠️ Recipe index not found. Run build_multilingual_embeddings.py first.")
 
-    def search_recipes(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """Cache key for a query: lowercase, collapsed whitespace"""
+        return " ".join(query.lower().split())
+
+    def _encode_query(self, query: str) -> np.ndarray:
+        """
+        Encode a query, using the in-process LRU and optional persistent cache
+
+        Returns:
+            Read-only 1-D float32 embedding
+        """
+        return self._encode_queries([query])[0]
+
+    def _encode_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Encode queries, using the in-process LRU and optional persistent cache
+
+        The normalized query is what gets encoded, so cached and fresh
+        embeddings are identical. All cache misses go through the model as
+        one batch; duplicate queries are encoded once. Embeddings are
+        L2-normalized, so inner products with the (normalized) index vectors
+        are cosine similarities.
+
+        Returns:
+            (len(queries), dim) float32 matrix
+        """
+        keys = [self._normalize_query(query) for query in queries]
+        embeddings = {}
+        missing = []
+
+        for key in dict.fromkeys(keys):
+            embedding = self.query_cache.get(key)
+            if embedding is None and settings.query_cache_persistent:
+                embedding = get_cache().get(self._persistent_query_key(key))
+                if embedding is not None:
+                    self.query_cache_persistent_hits += 1
+                    embedding = self._normalize_embeddings(embedding.reshape(1, -1))[0]
+                    embedding.setflags(write=False)
+                    self.query_cache.set(key, embedding)
+            if embedding is None:
+                missing.append(key)
+            else:
+                embeddings[key] = embedding
+
+        if missing:
+            encoded = self._normalize_embeddings(self.model.encode(missing))
+            for key, embedding in zip(missing, encoded):
+                embedding = embedding.copy()
+                if settings.query_cache_persistent:
+                    get_cache().set(self._persistent_query_key(key), embedding, expire=settings.query_cache_ttl)
+                embedding.setflags(write=False)
+                self.query_cache.set(key, embedding)
+                embeddings[key] = embedding
+
+        return np.vstack([embeddings[key] for key in keys])
+
+    @staticmethod
+    def _normalize_embeddings(embeddings) -> np.ndarray:
+        """L2-normalize embedding rows (float32 copy)"""
+        embeddings = np.array(embeddings, dtype='float32')
+        faiss.normalize_L2(embeddings)
+        return embeddings
+
+    def _persistent_query_key(self, key: str) -> str:
+        return f"query_embedding:{self.MULTILINGUAL_MODEL}:{key}"
+
+    def query_cache_stats(self) -> Dict[str, Any]:
+        """Query embedding cache counters"""
+        stats = self.query_cache.stats()
+        stats["persistent"] = settings.query_cache_persistent
+        stats["persistent_hits"] = self.query_cache_persistent_hits
+        return stats
+
+    def _load_recipe_vectors(self):
+        """
+        Load raw recipe vectors for exact re-ranking
+
+        Memory-mapped read-only: only the rows of re-ranked candidates are
+        paged in, so the compressed index stays the only resident copy.
+        """
+        self.recipe_vectors = np.load(EMBEDDINGS_DIR / RECIPE_VECTORS_FILE, mmap_mode='r')
+        print(f"✅ Re-rank vectors: {self.recipe_vectors.shape} (top max(k, {self.rerank_candidates}))")
+
+    def _search_recipe_index(self, query_embeddings: np.ndarray, k: int,
+                             eligible: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the recipe index for a matrix of queries
+
+        For compressed indices, the top max(k, rerank_candidates) hits are
+        always re-scored with the exact inner product against the raw
+        vectors, so returned scores are true cosine similarities.
+
+        Args:
+            query_embeddings: (n, dim) query matrix (a 1-D vector is one query)
+            k: Number of results per query
+            eligible: Optional boolean row mask; only these rows are searched
+
+        Returns:
+            (scores, rows) - (n, k) arrays ordered by score, rows are index
+            positions, missing results are -1
+        """
+        queries = np.ascontiguousarray(query_embeddings, dtype='float32').reshape(-1, self.recipe_index.d)
+        rerank = self.recipe_vectors is not None
+        fetch_k = min(max(k, self.rerank_candidates) if rerank else k, self.recipe_index.ntotal)
+
+        if eligible is None:
+            scores, rows = self.recipe_index.search(queries, fetch_k)
+        elif isinstance(self.recipe_index, MemmapFlatIndex):
+            scores, rows = self.recipe_index.search_subset(queries, fetch_k, eligible)
+        else:
+            # The bitmap must stay referenced until the search returns
+            bitmap = np.packbits(eligible, bitorder='little')
+            selector = faiss.IDSelectorBitmap(len(eligible), faiss.swig_ptr(bitmap))
+            params = self._filtered_search_params(selector, float(eligible.mean()))
+            scores, rows = self.recipe_index.search(queries, fetch_k, params=params)
+
+        if rerank:
+            exact_scores = np.full((len(queries), k), -np.inf, dtype='float32')
+            exact_rows = np.full((len(queries), k), -1, dtype='int64')
+            for i, (query, candidates) in enumerate(zip(queries, rows)):
+                candidates = candidates[candidates >= 0]
+                exact = self.recipe_vectors[candidates] @ query
+                order = np.argsort(-exact, kind='stable')[:k]
+                exact_scores[i, :len(order)] = exact[order]
+                exact_rows[i, :len(order)] = candidates[order]
+            scores, rows = exact_scores, exact_rows
+
+        return scores, rows
+
+    def _search_recipe_batch(
+        self, requests: List[Tuple[str, int, Optional[np.ndarray]]]
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Run a batch of recipe searches (MicroBatcher handler)
+
+        All queries are encoded together; unconstrained queries share one
+        FAISS search with the largest k and are cut to their own k.
+        Constrained queries carry different row masks and are searched one
+        by one.
+
+        Args:
+            requests: (query, k, eligible) tuples
+
+        Returns:
+            (scores, rows) 1-D arrays per request
+        """
+        embeddings = self._encode_queries([query for query, _, _ in requests])
+        results = [None] * len(requests)
+
+        unconstrained = [i for i, (_, _, eligible) in enumerate(requests) if eligible is None]
+        if unconstrained:
+            max_k = max(requests[i][1] for i in unconstrained)
+            scores, rows = self._search_recipe_index(embeddings[unconstrained], max_k)
+            for j, i in enumerate(unconstrained):
+                k = requests[i][1]
+                results[i] = (scores[j, :k], rows[j, :k])
+
+        for i, (_, k, eligible) in enumerate(requests):
+            if eligible is not None:
+                scores, rows = self._search_recipe_index(embeddings[i], k, eligible=eligible)
+                results[i] = (scores[0], rows[0])
+
+        return results
+
+    def _filtered_search_params(self, selector, selectivity: float):
+        """
+        FAISS search parameters restricted to an IDSelector
+
+        ANN indices only see the eligible rows inside the cells / graph region
+        they visit, so nprobe and efSearch grow with 1/selectivity to still
+        fill a result page.
+        """
+        boost = 1.0 / max(selectivity, 1e-3)
+        ivf = faiss.try_extract_index_ivf(self.recipe_index)
+        if ivf is not None:
+            nprobe = min(ivf.nlist, int(np.ceil(min(self.nprobe, ivf.nlist) * boost)))
+            return faiss.SearchParametersIVF(sel=selector, nprobe=nprobe)
+        if hasattr(self.recipe_index, "hnsw"):
+            ef_search = min(self.recipe_index.ntotal, int(np.ceil(self.ef_search * boost)))
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=max(ef_search, self.ef_search))
+        return faiss.SearchParameters(sel=selector)
+
+    def set_search_params(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Set ANN search parameters at runtime
+
+        Args:
+            nprobe: IVF cells to visit per query (IVF index only)
+            ef_search: HNSW candidate list size (HNSW index only)
+
+        Returns:
+            Effective search parameters
+        """
+        if nprobe is not None:
+            self.nprobe = max(1, int(nprobe))
+        if ef_search is not None:
+            self.ef_search = max(1, int(ef_search))
+
+        if isinstance(self.recipe_index, faiss.Index):
+            ivf = faiss.try_extract_index_ivf(self.recipe_index)
+            if ivf is not None:
+                ivf.nprobe = min(self.nprobe, ivf.nlist)
+            if hasattr(self.recipe_index, "hnsw"):
+                self.recipe_index.hnsw.efSearch = self.ef_search
+
+        return self.get_search_params()
+
+    def get_search_params(self) -> Dict[str, Any]:
+        """Current recipe index type and ANN search parameters"""
+        params = {"index_type": self.recipe_index_type}
+        if self.recipe_index_type in ("ivf", "ivfpq"):
+            params["nprobe"] = self.nprobe
+        elif self.recipe_index_type == "hnsw":
+            params["ef_search"] = self.ef_search
+        if self.recipe_index_type in QUANTIZED_INDEX_TYPES:
+            params["rerank_candidates"] = self.rerank_candidates
+        return params
+
+    def search_recipes(self, query: str, limit: int = 10,
+                       min_similarity: Optional[float] = None) -> List[RecipeSearchResult]:
         """
         Search recipes using multilingual semantic search
         Supports Turkish queries → English recipes
@@ -96,43 +566,71 @@ class SemanticSearchService:
         Args:
             query: Search query (Turkish or English)
             limit: Maximum number of results
+            min_similarity: Optional cosine similarity cutoff
+
+        Returns:
+            RecipeSearchResult records (rank order)
+        """
+        return self.search_recipes_filtered(query, limit=limit, min_similarity=min_similarity)
+
+    def search_recipes_filtered(
+        self,
+        query: str,
+        limit: int = 10,
+        allergens: Optional[List[str]] = None,
+        max_cooking_time: Optional[int] = None,
+        max_calories: Optional[int] = None,
+        min_similarity: Optional[float] = None
+    ) -> List[RecipeSearchResult]:
+        """
+        Search recipes, considering only those that satisfy the constraints
+
+        Constraints are evaluated on precomputed per-recipe arrays and passed
+        to FAISS as an IDSelector, so restrictive filters still return up to
+        `limit` recipes from a single search.
+
+        Args:
+            query: Search query (Turkish or English)
+            limit: Maximum number of results
+            allergens: Allergen categories to exclude (e.g., "Süt", "Gluten")
+            max_cooking_time: Maximum cooking time in minutes
+            max_calories: Maximum calories
+            min_similarity: Optional cosine similarity cutoff
 
         Returns:
-            List of recipe dictionaries with similarity scores
+            RecipeSearchResult records with cosine similarity (rank order)
         """
         start_time = time.time()
 
         if not query:
             return []
 
-        if not self.model or not self.recipe_index or not self.recipe_ids:
+        if not self.model or not self.recipe_index or self.recipe_store is None:
             print("⚠️ Recipe semantic search not available")
             return []
 
         try:
             print(f"🔍 Multilingual recipe search: '{query}'")
 
-            # Encode query
-            query_embedding = self.model.encode([query])
-
-            # Search in FAISS index
-            distances, indices = self.recipe_index.search(
-                query_embedding.astype('float32'),
-                min(limit, self.recipe_index.ntotal)
-            )
-
-            # Build results
-            results = []
-            for dist, idx in zip(distances[0], indices[0]):
-                if idx < len(self.recipe_ids):
-                    recipe_id = self.recipe_ids[idx]
-                    if self.recipes_data and recipe_id in self.recipes_data:
-                        recipe = self.recipes_data[recipe_id].copy()
-                        # Convert distance to similarity (cosine similarity)
-                        # For normalized vectors: similarity = 1 - distance/2
-                        similarity = float(1.0 / (1.0 + dist))
-                        recipe['similarity_score'] = round(similarity, 4)
-                        results.append(recipe)
+            eligible = None
+            if allergens or max_cooking_time or max_calories:
+                eligible = self.recipe_store.eligible_rows(allergens, max_cooking_time, max_calories)
+                n_eligible = int(eligible.sum())
+                print(f"🛡️ Constrained search: {n_eligible}/{len(eligible)} eligible recipes")
+                if n_eligible == 0:
+                    return []
+                if n_eligible == len(eligible):
+                    eligible = None
+                limit = min(limit, n_eligible)
+
+            # Encode query + search in FAISS index (batched with concurrent requests)
+            request = (query, min(limit, self.recipe_index.ntotal), eligible)
+            if self.recipe_batcher is not None:
+                scores, indices = self.recipe_batcher(request)
+            else:
+                scores, indices = self._search_recipe_batch([request])[0]
+
+            results = self.recipe_store.results(scores, indices, min_similarity)
 
             latency_ms = (time.time() - start_time) * 1000
             print(f"✅ Found {len(results)} recipes, latency={latency_ms:.1f}ms")
@@ -143,57 +641,56 @@ class SemanticSearchService:
             print(f"❌ Recipe search error: {e}, latency={latency_ms:.1f}ms")
             return []
 
-    def search(self, query: str, limit: int = 10) -> List[Tuple[Ingredient, float]]:
+    def search(self, query: str, limit: int = 10, min_similarity: Optional[float] = None,
+               db: Optional[Session] = None) -> List[Tuple[Ingredient, float]]:
         """
         Perform semantic search for ingredients (legacy method)
 
         Args:
             query: Search query
             limit: Maximum number of results
+            min_similarity: Optional cosine similarity cutoff
+            db: Request session, only needed to build the ingredient table
+                when ingredients.meta.json is missing
 
         Returns:
-            List of (Ingredient, similarity_score) tuples
+            List of (Ingredient, cosine similarity) tuples
         """
         start_time = time.time()
 
         if not query:
             return []
 
-        if not self.model or not self.ingredient_index or not self.ingredient_ids:
+        if not self.model or not self.ingredient_index or self.ingredient_ids is None:
             print("⚠️ Ingredient semantic search not available")
             return []
 
-        if not self.db:
+        if self.ingredient_table is None and db is None:
             print("⚠️ Database session required for ingredient search")
             return []
 
         try:
             print(f"🔍 Semantic ingredient search: '{query}'")
-            query_embedding = self.model.encode([query])
+            if self.ingredient_table is None:
+                self._load_ingredient_table_from_db(db)
+
+            query_embedding = self._encode_query(query)
 
-            distances, indices = self.ingredient_index.search(
-                query_embedding.astype('float32'),
+            scores, indices = self.ingredient_index.search(
+                query_embedding.reshape(1, -1),
                 min(limit, self.ingredient_index.ntotal)
             )
 
+            # Rows map straight to the in-memory table, in rank order
             results = []
-            for dist, idx in zip(distances[0], indices[0]):
-                if idx < len(self.ingredient_ids):
-                    ing_id = self.ingredient_ids[idx]
-                    db_ing = self.db.query(db_models.Ingredient).filter_by(id=ing_id).first()
-                    if db_ing:
-                        ingredient = Ingredient(
-                            name=db_ing.name,
-                            portion_g=db_ing.portion_g,
-                            calories=db_ing.calories,
-                            fat_g=db_ing.fat_g,
-                            carbs_g=db_ing.carbs_g,
-                            protein_g=db_ing.protein_g,
-                            sugar_g=db_ing.sugar_g,
-                            fiber_g=db_ing.fiber_g
-                        )
-                        similarity = 1.0 / (1.0 + dist)
-                        results.append((ingredient, similarity))
+            for score, idx in zip(scores[0].tolist(), indices[0].tolist()):
+                # Scores are descending
+                if min_similarity is not None and score < min_similarity:
+                    break
+                if 0 <= idx < len(self.ingredient_table):
+                    ingredient = self.ingredient_table[idx]
+                    if ingredient is not None:
+                        results.append((ingredient, score))
 
             latency_ms = (time.time() - start_time) * 1000
             print(f"✅ Found {len(results)} ingredient matches, latency={latency_ms:.1f}ms")
@@ -3,7 +3,9 @@ Allergen Mapping Utility
 Maps allergen categories to their derivative ingredients (Turkish and English)
 Used for hard filtering recipes that contain allergens
 """
-from typing import List, Set
+from collections import deque
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
 
 
 # Allergen category to derivative ingredients mapping
@@ -104,6 +106,166 @@ ALLERGEN_DERIVATIVES = {
 }
 
 
+# One bit per allergen category (order of ALLERGEN_DERIVATIVES)
+# Used for precomputed per-recipe allergen masks: safe if mask & user_mask == 0
+ALLERGEN_BITS = {allergen: 1 << i for i, allergen in enumerate(ALLERGEN_DERIVATIVES)}
+
+
+# Known false positives: words that contain a derivative without containing
+# the allergen. The matcher ignores a derivative found inside one of them
+# ("nut" in "nutmeg"); everything else is plain substring matching.
+ALLERGEN_FALSE_POSITIVES = {
+    "nut": ["nutmeg", "butternut", "doughnut"],
+    "egg": ["eggplant"],
+    "un": ["ground", "pound", "ounce", "unsalted", "tuna"],
+    "oat": ["goat"],
+    "lor": ["floret"],
+    "kek": ["kekik"],
+    "soy": ["soyul"],
+    "arpa": ["arpacık"],
+    "butter": ["butternut", "butter bean", "peanut butter", "almond butter", "nut butter",
+               "cocoa butter", "apple butter"],
+    "milk": ["coconut milk", "almond milk", "soy milk", "oat milk", "rice milk"],
+    "cream": ["coconut cream", "cream of tartar"],
+}
+
+
+class AllergenMatcher:
+    """
+    Aho-Corasick automaton over the derivatives of a set of allergen categories
+
+    Compiled once per allergen combination (see get_allergen_matcher) and
+    scans a text in a single pass instead of one substring search per
+    derivative. Derivatives match as substrings, except inside the words of
+    ALLERGEN_FALSE_POSITIVES.
+    """
+
+    def __init__(self, allergens: Iterable[str]):
+        self.allergens = tuple(allergens)
+
+        # Pattern -> category bits (a derivative can belong to several categories)
+        patterns: Dict[str, int] = {}
+        for allergen in self.allergens:
+            for derivative in get_allergen_derivatives(allergen):
+                patterns[derivative] = patterns.get(derivative, 0) | ALLERGEN_BITS[allergen]
+
+        # False positive -> derivatives it hides; derivative -> longest such word
+        suppresses: Dict[str, Set[str]] = {}
+        self._wait: Dict[str, int] = {}
+        for derivative, words in ALLERGEN_FALSE_POSITIVES.items():
+            if derivative not in patterns:
+                continue
+            for word in words:
+                suppresses.setdefault(word, set()).add(derivative)
+                self._wait[derivative] = max(self._wait.get(derivative, 0), len(word))
+
+        # Trie
+        self._goto: List[Dict[str, int]] = [{}]
+        outputs: List[List[Tuple[str, int, FrozenSet[str]]]] = [[]]
+        for pattern in set(patterns) | set(suppresses):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    outputs.append([])
+                state = next_state
+            outputs[state].append((pattern, patterns.get(pattern, 0), frozenset(suppresses.get(pattern, ()))))
+
+        # Failure links (BFS); outputs of the failure state are merged in
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                outputs[next_state] = outputs[next_state] + outputs[self._fail[next_state]]
+        self._outputs = [tuple(out) for out in outputs]
+
+    def scan(self, text: str, stop_at_first: bool = False) -> int:
+        """
+        Bitmask of the categories found in text
+
+        Args:
+            text: Text to check (lowercased here)
+            stop_at_first: Return as soon as any category is found
+        """
+        if not text:
+            return 0
+
+        text = text.lower()
+        goto, fail, outputs, wait = self._goto, self._fail, self._outputs, self._wait
+        mask = 0
+        state = 0
+        # Hits of derivatives with known false positives, kept until no such
+        # word can still end around them: (start, confirm at, derivative, bits)
+        pending: List[Tuple[int, int, str, int]] = []
+        for i, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            end = i + 1
+
+            found = outputs[state]
+            for pattern, bits, _ in found:
+                if bits & ~mask:
+                    start = end - len(pattern)
+                    if pattern in wait:
+                        pending.append((start, start + wait[pattern], pattern, bits))
+                    else:
+                        mask |= bits
+                        if stop_at_first:
+                            return mask
+            for pattern, _, hidden in found:
+                if hidden:
+                    start = end - len(pattern)
+                    pending = [hit for hit in pending if not (hit[2] in hidden and hit[0] >= start)]
+
+            if pending:
+                still_pending = []
+                for hit in pending:
+                    if hit[1] <= end:
+                        mask |= hit[3]
+                    else:
+                        still_pending.append(hit)
+                pending = still_pending
+                if stop_at_first and mask:
+                    return mask
+
+        for hit in pending:
+            mask |= hit[3]
+        return mask
+
+    def contains(self, text: str) -> bool:
+        """True if text contains a derivative of any of the allergens"""
+        return self.scan(text, stop_at_first=True) != 0
+
+
+@lru_cache(maxsize=64)
+def _compiled_matcher(allergens: Tuple[str, ...]) -> AllergenMatcher:
+    return AllergenMatcher(allergens)
+
+
+def get_allergen_matcher(allergens: Iterable[str]) -> AllergenMatcher:
+    """
+    Compiled matcher for an allergen combination (LRU cached)
+
+    Args:
+        allergens: Allergen category names (order and duplicates don't matter)
+
+    Returns:
+        AllergenMatcher over the known categories
+    """
+    return _compiled_matcher(tuple(sorted({a for a in allergens if a in ALLERGEN_BITS})))
+
+
 def get_allergen_derivatives(allergen: str) -> List[str]:
     """
     Get all derivative ingredients for a given allergen category
@@ -134,6 +296,52 @@ def get_all_allergen_derivatives(allergens: List[str]) -> Set[str]:
     return all_derivatives
 
 
+def get_allergen_mask(allergens: List[str]) -> int:
+    """
+    Get the bitmask for a list of allergen categories
+
+    Args:
+        allergens: List of allergen category names
+
+    Returns:
+        Bitmask of known categories (unknown names are ignored)
+    """
+    mask = 0
+    for allergen in allergens or []:
+        mask |= ALLERGEN_BITS.get(allergen, 0)
+    return mask
+
+
+def compute_allergen_mask(text: str) -> int:
+    """
+    Compute the bitmask of allergen categories found in a text
+
+    Args:
+        text: Text to check (e.g., recipe ingredients)
+
+    Returns:
+        Bitmask with a bit set for each category with a derivative in text
+    """
+    return get_allergen_matcher(ALLERGEN_BITS).scan(text)
+
+
+def get_recipe_allergen_text(recipe) -> str:
+    """
+    Get the ingredient text of a recipe that is checked for allergens
+
+    Args:
+        recipe: Recipe dictionary or object with available_ingredients
+
+    Returns:
+        Ingredient text (not lowercased)
+    """
+    if isinstance(recipe, dict):
+        return str(recipe.get("available_ingredients", "")) + " " + str(recipe.get("ingredients", ""))
+    if hasattr(recipe, "available_ingredients"):
+        return str(getattr(recipe, "available_ingredients", ""))
+    return ""
+
+
 def contains_allergen(text: str, allergens: List[str]) -> bool:
     """
     Check if text contains any allergen derivatives
@@ -148,14 +356,7 @@ def contains_allergen(text: str, allergens: List[str]) -> bool:
     if not text or not allergens:
         return False
 
-    text_lower = text.lower()
-    derivatives = get_all_allergen_derivatives(allergens)
-
-    for derivative in derivatives:
-        if derivative in text_lower:
-            return True
-
-    return False
+    return get_allergen_matcher(allergens).contains(text)
 
 
 def filter_recipes_by_allergens(recipes: list, allergens: List[str]) -> list:
@@ -172,27 +373,8 @@ def filter_recipes_by_allergens(recipes: list, allergens: List[str]) -> list:
     if not allergens:
         return recipes
 
-    derivatives = get_all_allergen_derivatives(allergens)
-    safe_recipes = []
-
-    for recipe in recipes:
-        # Check ingredients field
-        ingredients_text = ""
-        if isinstance(recipe, dict):
-            ingredients_text = str(recipe.get("available_ingredients", "")) + " " + str(recipe.get("ingredients", ""))
-        elif hasattr(recipe, "available_ingredients"):
-            ingredients_text = str(getattr(recipe, "available_ingredients", ""))
-
-        ingredients_lower = ingredients_text.lower()
-
-        # Check if any allergen derivative is in ingredients
-        has_allergen = False
-        for derivative in derivatives:
-            if derivative in ingredients_lower:
-                has_allergen = True
-                break
-
-        if not has_allergen:
-            safe_recipes.append(recipe)
-
-    return safe_recipes
+    matcher = get_allergen_matcher(allergens)
+    return [
+        recipe for recipe in recipes
+        if not matcher.contains(get_recipe_allergen_text(recipe))
+    ]
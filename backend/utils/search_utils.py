@@ -3,9 +3,23 @@ Advanced Search Utilities
 Trendyol-style fuzzy search with Turkish character support
 """
 import re
-from typing import List, Tuple
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 from difflib import SequenceMatcher
 
+# RapidFuzz import (opsiyonel) - C++ batch edit distance
+try:
+    from rapidfuzz import process as rf_process
+    from rapidfuzz.distance import Levenshtein as RFLevenshtein
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    RAPIDFUZZ_AVAILABLE = False
+
+# Edit-distance kernel: "rapidfuzz" (batched, native) | "python" (bit-parallel)
+# Used for the BK-tree levels and full scans; the BK-tree is always built
+DEFAULT_FUZZY_BACKEND = "rapidfuzz" if RAPIDFUZZ_AVAILABLE else "python"
+
 class SearchEngine:
     """
     Profesyonel arama motoru
@@ -78,7 +92,7 @@ class SearchEngine:
         return previous_row[-1]
     
     @staticmethod
-    def calculate_relevance(query: str, item_name: str) -> float:
+    def calculate_relevance(query: str, item_name: str, distance: Optional[int] = None) -> float:
         """
         Relevance score hesapla (0.0 - 100.0)
         
@@ -88,16 +102,32 @@ class SearchEngine:
         3. Contains (70-85)
         4. Fuzzy match (50-70)
         5. No match (0)
+        
+        Args:
+            distance: Önceden hesaplanmış normalize Levenshtein mesafesi (BKTree),
+                      max_distance'ı aşan herhangi bir değer "uzak" demektir
         """
         if not query or not item_name:
             return 0.0
         
-        query_lower = query.lower()
-        item_lower = item_name.lower()
-        
         # Turkish normalized versions
-        query_norm = SearchEngine.normalize_turkish(query)
-        item_norm = SearchEngine.normalize_turkish(item_name)
+        return SearchEngine.relevance_from_forms(
+            query, query.lower(), SearchEngine.normalize_turkish(query),
+            item_name.lower(), SearchEngine.normalize_turkish(item_name),
+            distance
+        )
+    
+    @staticmethod
+    def relevance_from_forms(query: str, query_lower: str, query_norm: str,
+                             item_lower: str, item_norm: str, distance: Optional[int] = None) -> float:
+        """
+        calculate_relevance ile aynı skor, hazır lower/normalize formlarla
+        
+        Item formları index'te (veya DB kolonlarında) bir kez hesaplanır,
+        sorgu formları sorgu başına bir kez; item başına string işlemi yapılmaz.
+        """
+        if not query or not item_lower:
+            return 0.0
         
         # 1. EXACT MATCH (100 puan)
         if query_lower == item_lower or query_norm == item_norm:
@@ -120,15 +150,16 @@ class SearchEngine:
             return 70.0 + position_bonus
         
         # 4. FUZZY MATCH - Typo tolerance (50-70 puan)
-        # Similarity score kullan
-        similarity = SearchEngine.similarity_score(query_norm, item_norm)
-        
         # Levenshtein distance kontrolü
         max_distance = max(2, len(query) // 3)  # Query uzunluğuna göre tolerance
-        distance = SearchEngine.levenshtein_distance(query_norm, item_norm)
+        if distance is None:
+            distance = SearchEngine.levenshtein_distance(query_norm, item_norm)
         
-        if distance <= max_distance and similarity > 0.5:
-            return 50.0 + (similarity * 20.0)
+        if distance <= max_distance:
+            # Similarity score kullan
+            similarity = SearchEngine.similarity_score(query_norm, item_norm)
+            if similarity > 0.5:
+                return 50.0 + (similarity * 20.0)
         
         # 5. WORD MATCHING - Kelime kelime kontrol
         query_words = set(query_norm.split())
@@ -155,18 +186,384 @@ class SearchEngine:
         Returns:
             [(item_name, score), ...] - Score'a göre sıralı
         """
+        return [
+            (items[pos], score)
+            for pos, score in SearchEngine.search_positions(query, items, threshold, limit)
+        ]
+    
+    @staticmethod
+    def search_positions(query: str, items: List[str], threshold: float = 30.0, limit: int = 50,
+                         index: Optional["TrigramIndex"] = None) -> List[Tuple[int, float]]:
+        """
+        search() ile aynı, ama item ismi yerine listedeki index'i döndürür
+        
+        Çağıran taraf sonucu isimle tekrar aramadan kendi nesnesine eşler
+        (aynı isimli item'lar da ayrı kalır).
+        
+        Args:
+            index: items için hazır TrigramIndex (yoksa cache'ten alınır)
+        
+        Returns:
+            [(item_index, score), ...] - Score'a göre sıralı
+        """
         if not query or not items:
             return []
         
-        # Her item için relevance hesapla
+        if index is None:
+            index = get_trigram_index(tuple(items))
+        query_lower = query.lower()
+        query_norm = SearchEngine.normalize_turkish(query)
+        
+        # threshold <= 0 ise 0 puanlılar da sonuca girer, tüm liste taranır
+        # (mesafeler tek bir batch çağrısında hesaplanır)
+        if threshold <= 0:
+            distances = batch_levenshtein(query_norm, index.norm, backend=index.backend)
+            results = []
+            for pos in range(len(items)):
+                score = SearchEngine.relevance_from_forms(
+                    query, query_lower, query_norm, index.lower[pos], index.norm[pos], int(distances[pos])
+                )
+                if score >= threshold:
+                    results.append((pos, score))
+            results.sort(key=lambda x: x[1], reverse=True)
+            return results[:limit]
+        
+        # Aday listesi: skoru 0'dan büyük olabilecek item'lar (orijinal sırada)
+        # Fuzzy mesafeler (BK-tree) tekrar hesaplanmaz
+        positions, distances = index.candidates(query, query_lower, query_norm)
+        far = max(2, len(query) // 3) + 1
+        
+        # Her aday için relevance hesapla
         results = []
-        for item in items:
-            score = SearchEngine.calculate_relevance(query, item)
+        for pos in positions:
+            score = SearchEngine.relevance_from_forms(
+                query, query_lower, query_norm, index.lower[pos], index.norm[pos], distances.get(pos, far)
+            )
             if score >= threshold:
-                results.append((item, score))
+                results.append((pos, score))
         
         # Score'a göre sırala (descending)
         results.sort(key=lambda x: x[1], reverse=True)
         
         # Limit uygula
         return results[:limit]
+
+
+def bit_parallel_levenshtein(s1: str, s2: str) -> int:
+    """
+    Levenshtein distance with Myers/Hyyrö bit-vector algorithm
+
+    Same result as SearchEngine.levenshtein_distance, but one pass over the
+    longer string with integer bit operations instead of a DP matrix.
+    """
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+    m = len(s2)
+    if m == 0:
+        return len(s1)
+
+    # Bit mask of positions of each character in the shorter string
+    peq = {}
+    for i, c in enumerate(s2):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for c in s1:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    return score
+
+
+def batch_levenshtein(query: str, choices: Sequence[str], max_distance: Optional[int] = None,
+                      backend: str = DEFAULT_FUZZY_BACKEND) -> Sequence[int]:
+    """
+    Edit distance of the query to every choice in one call
+
+    With max_distance, distances above it may be reported as max_distance + 1
+    (enough for "within k" checks and lets RapidFuzz stop early).
+    """
+    if backend == "rapidfuzz" and RAPIDFUZZ_AVAILABLE:
+        return rf_process.cdist(
+            [query], choices, scorer=RFLevenshtein.distance, score_cutoff=max_distance
+        )[0]
+
+    distances = [bit_parallel_levenshtein(query, choice) for choice in choices]
+    if max_distance is not None:
+        distances = [min(distance, max_distance + 1) for distance in distances]
+    return distances
+
+
+class BKTree:
+    """
+    BK-tree over strings with Levenshtein distance
+
+    Answers "all words within edit distance k" by visiting only the children
+    whose edge distance lies in [d - k, d + k] (triangle inequality).
+    """
+
+    def __init__(self, words: Iterable[str] = ()):
+        # Node: [word, {edge distance: child node}]
+        self.root = None
+        self.size = 0
+        for word in words:
+            self.add(word)
+
+    def add(self, word: str):
+        """Insert a word (duplicates are ignored)"""
+        if self.root is None:
+            self.root = [word, {}]
+            self.size = 1
+            return
+
+        node = self.root
+        while True:
+            distance = bit_parallel_levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [word, {}]
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int, backend: str = "python") -> List[Tuple[str, int]]:
+        """
+        All (word, distance) pairs with distance <= max_distance
+
+        The tree is walked level by level; the distances of a level's nodes
+        are computed in one batch_levenshtein call.
+        """
+        if self.root is None:
+            return []
+
+        results = []
+        level = [self.root]
+        while level:
+            distances = batch_levenshtein(word, [node[0] for node in level], backend=backend)
+            next_level = []
+            for (node_word, children), distance in zip(level, distances):
+                distance = int(distance)
+                if distance <= max_distance:
+                    results.append((node_word, distance))
+                low, high = distance - max_distance, distance + max_distance
+                next_level.extend(child for edge, child in children.items() if low <= edge <= high)
+            level = next_level
+        return results
+
+
+class TrigramIndex:
+    """
+    Trigram index over item names for SearchEngine candidate generation
+
+    Returns every item whose calculate_relevance score can be above 0, so
+    search() only runs the expensive scoring (SequenceMatcher + Levenshtein)
+    on a small candidate set and the scores stay identical:
+    - exact / starts with / contains: all trigrams of the query are in the
+      item (lowercase and Turkish-normalized forms, queries < 3 chars are
+      checked with a plain substring scan)
+    - fuzzy (edit distance <= k): BK-tree over the normalized names; the
+      backend only picks the kernel that scores each visited tree level
+    - word matching: a query word is an item word
+    """
+
+    Q = 3
+
+    def __init__(self, items: List[str], backend: Optional[str] = None,
+                 lower: Optional[List[str]] = None, norm: Optional[List[str]] = None):
+        """
+        Args:
+            lower, norm: Precomputed lower() / normalize_turkish forms of items
+                         (e.g. from the DB columns), computed here if missing
+        """
+        self.backend = backend or DEFAULT_FUZZY_BACKEND
+        if self.backend == "rapidfuzz" and not RAPIDFUZZ_AVAILABLE:
+            self.backend = "python"
+        self.lower = lower if lower is not None else [item.lower() if item else "" for item in items]
+        self.norm = norm if norm is not None else [SearchEngine.normalize_turkish(item) for item in items]
+
+        self._lower_grams: Dict[str, Set[int]] = defaultdict(set)
+        self._norm_grams: Dict[str, Set[int]] = defaultdict(set)
+        self._words: Dict[str, Set[int]] = defaultdict(set)
+        self._norm_positions: Dict[str, List[int]] = defaultdict(list)
+
+        for pos, (lower, norm) in enumerate(zip(self.lower, self.norm)):
+            for gram in self.grams(lower):
+                self._lower_grams[gram].add(pos)
+            for gram in self.grams(norm):
+                self._norm_grams[gram].add(pos)
+            for word in norm.split():
+                self._words[word].add(pos)
+            self._norm_positions[norm].append(pos)
+
+        self._bktree = BKTree(self._norm_positions)
+
+    @classmethod
+    def grams(cls, text: str) -> Set[str]:
+        """Distinct trigrams of a string"""
+        return {text[i:i + cls.Q] for i in range(len(text) - cls.Q + 1)}
+
+    def _containing(self, query: str, forms: List[str], postings: Dict[str, Set[int]]) -> Set[int]:
+        """Positions whose form may contain the query (superset)"""
+        if len(query) < self.Q:
+            return {pos for pos, form in enumerate(forms) if query in form}
+
+        lists = sorted((postings.get(gram, set()) for gram in self.grams(query)), key=len)
+        result = set(lists[0])
+        for posting in lists[1:]:
+            result &= posting
+            if not result:
+                break
+        return result
+
+    def within_distance(self, query_norm: str, max_distance: int) -> Dict[int, int]:
+        """Positions whose normalized form is within max_distance edits -> distance"""
+        matches = self._bktree.search(query_norm, max_distance, backend=self.backend)
+        return {
+            pos: distance
+            for norm, distance in matches
+            for pos in self._norm_positions[norm]
+        }
+
+    def candidates(self, query: str, query_lower: Optional[str] = None,
+                   query_norm: Optional[str] = None) -> Tuple[List[int], Dict[int, int]]:
+        """
+        Item positions that can score above 0 for the query
+
+        Returns:
+            (positions, distances) - sorted positions (original item order, so
+            score ties keep their order) and the edit distances of the
+            positions within the fuzzy tolerance
+        """
+        if query_lower is None:
+            query_lower = query.lower()
+        if query_norm is None:
+            query_norm = SearchEngine.normalize_turkish(query)
+
+        positions = self._containing(query_lower, self.lower, self._lower_grams)
+        positions |= self._containing(query_norm, self.norm, self._norm_grams)
+
+        # Same tolerance as calculate_relevance
+        distances = self.within_distance(query_norm, max(2, len(query) // 3))
+        positions.update(distances)
+
+        for word in set(query_norm.split()):
+            positions |= self._words.get(word, set())
+
+        return sorted(positions), distances
+
+
+@lru_cache(maxsize=8)
+def get_trigram_index(items: Tuple[str, ...]) -> TrigramIndex:
+    """Trigram index for an item list, built once per distinct list"""
+    return TrigramIndex(list(items))
+
+
+class PrefixTrie:
+    """
+    Prefix trie with precomputed top-k completions per node (autocomplete)
+
+    Every item is inserted under its lowercase and Turkish-normalized forms,
+    both for the full name and for each word start ("salça" -> "Domates
+    Salçası"). Each node keeps the k best item positions reachable below it,
+    so a lookup walks len(prefix) nodes and reads the stored list.
+
+    lower / norm: optional precomputed forms (same as TrigramIndex).
+
+    Ranking (lower is better):
+    1. full name starts with the prefix (exact spelling before normalized)
+    2. a later word starts with the prefix
+    3. shorter names first, then alphabetical
+    """
+
+    # Rank tiers
+    NAME_LOWER, NAME_NORM, WORD_LOWER, WORD_NORM = range(4)
+
+    def __init__(self, items: List[str], top_k: int = 10,
+                 lower: Optional[List[str]] = None, norm: Optional[List[str]] = None):
+        self.top_k = max(1, top_k)
+        # Node: [{char: child node}, [(rank, pos), ...]]
+        self.root = [{}, []]
+
+        entries = []
+        for pos, item in enumerate(items):
+            if not item:
+                continue
+            item_lower = lower[pos] if lower is not None else item.lower()
+            item_norm = norm[pos] if norm is not None else SearchEngine.normalize_turkish(item)
+            tiebreak = (len(item), item_lower, pos)
+            entries.append(((self.NAME_LOWER,) + tiebreak, pos, item_lower))
+            entries.append(((self.NAME_NORM,) + tiebreak, pos, item_norm))
+            for word in self._word_suffixes(item_lower):
+                entries.append(((self.WORD_LOWER,) + tiebreak, pos, word))
+            for word in self._word_suffixes(item_norm):
+                entries.append(((self.WORD_NORM,) + tiebreak, pos, word))
+
+        # Best ranks first: each node's list fills up in rank order
+        entries.sort(key=lambda entry: entry[0])
+        for rank, pos, key in entries:
+            self._insert(key, rank, pos)
+
+    @staticmethod
+    def _word_suffixes(text: str) -> List[str]:
+        """Name tails starting at the 2nd, 3rd, ... word"""
+        starts = [match.start() for match in re.finditer(r'\S+', text)]
+        return [text[start:] for start in starts[1:]]
+
+    def _insert(self, key: str, rank: tuple, pos: int):
+        node = self.root
+        for char in key:
+            node = node[0].setdefault(char, [{}, []])
+            top = node[1]
+            if len(top) < self.top_k and all(p != pos for _, p in top):
+                top.append((rank, pos))
+
+    def _node(self, prefix: str):
+        node = self.root
+        for char in prefix:
+            node = node[0].get(char)
+            if node is None:
+                return None
+        return node
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[int]:
+        """Item positions completing the prefix, best first (at most top_k)"""
+        limit = min(limit or self.top_k, self.top_k)
+        prefix_lower = prefix.strip().lower()
+        if not prefix_lower:
+            return []
+
+        candidates = []
+        node = self._node(prefix_lower)
+        if node is not None:
+            candidates.extend(node[1])
+
+        # Normalized form also catches "sut" -> "Süt"; these are not exact
+        # spelling matches for this prefix, so they move to the *_NORM tiers
+        prefix_norm = SearchEngine.normalize_turkish(prefix_lower)
+        if prefix_norm != prefix_lower:
+            node = self._node(prefix_norm)
+            if node is not None:
+                candidates.extend(((rank[0] | 1,) + rank[1:], pos) for rank, pos in node[1])
+        candidates.sort()
+
+        positions = []
+        for _, pos in candidates:
+            if pos not in positions:
+                positions.append(pos)
+                if len(positions) == limit:
+                    break
+        return positions
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Search Benchmark
+Full-scan scoring vs. indexed search (python / rapidfuzz distance backends)
+
+Usage:
+    python scripts/benchmark_fuzzy_search.py                  # 1k + 100k names
+    python scripts/benchmark_fuzzy_search.py --sizes 1000 --queries 50
+
+Names are synthesized from data/ingredients.json (combinations + typos), so
+the 100k list has realistic Turkish ingredient-like strings. Every backend
+must return exactly the same (name, score) lists as the original full scan
+for every query (the 100k full scan takes several seconds per query;
+--full-scan-queries limits the check to the first N queries). Any mismatch
+exits with status 1.
+
+Results are written to docs/fuzzy_search_benchmark.md (--output).
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from datetime import date
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent
+BACKEND_DIR = PROJECT_ROOT / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from utils.search_utils import (  # noqa: E402
+    SearchEngine,
+    TrigramIndex,
+    batch_levenshtein,
+    RAPIDFUZZ_AVAILABLE,
+)
+
+THRESHOLD = 30.0
+LIMIT = 50
+OUTPUT_PATH = PROJECT_ROOT / "docs" / "fuzzy_search_benchmark.md"
+
+
+def make_typo(rng: random.Random, word: str) -> str:
+    """One random edit (delete / swap / replace)"""
+    if len(word) < 3:
+        return word
+    i = rng.randrange(len(word) - 1)
+    op = rng.choice(("delete", "swap", "replace"))
+    if op == "delete":
+        return word[:i] + word[i + 1:]
+    if op == "swap":
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice("aeiıoöuüklmnrst") + word[i + 1:]
+
+
+def synthesize_names(base: list, size: int, seed: int = 42) -> list:
+    """`size` distinct names: originals, then two-name combinations"""
+    rng = random.Random(seed)
+    names = list(dict.fromkeys(base))[:size]
+    seen = set(names)
+    while len(names) < size:
+        name = f"{rng.choice(base)} {rng.choice(base).lower()}"
+        if rng.random() < 0.3:
+            name = make_typo(rng, name)
+        if name not in seen:
+            seen.add(name)
+            names.append(name)
+    return names
+
+
+def make_queries(base: list, count: int, seed: int = 7) -> list:
+    """Exact, prefix, typo and Turkish-normalized queries"""
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        name = rng.choice(base).lower()
+        kind = i % 4
+        if kind == 0:
+            queries.append(name)
+        elif kind == 1:
+            queries.append(name[:max(2, len(name) // 2)])
+        elif kind == 2:
+            queries.append(make_typo(rng, name))
+        else:
+            queries.append(SearchEngine.normalize_turkish(name))
+    return queries
+
+
+def full_scan(query: str, names: list) -> list:
+    """Original search: calculate_relevance (DP Levenshtein) on every name"""
+    results = []
+    for name in names:
+        score = SearchEngine.calculate_relevance(query, name)
+        if score >= THRESHOLD:
+            results.append((name, score))
+    results.sort(key=lambda x: x[1], reverse=True)
+    return results[:LIMIT]
+
+
+def indexed_search(index: TrigramIndex, query: str, names: list) -> list:
+    """SearchEngine.search with a prebuilt index"""
+    return [
+        (names[pos], score)
+        for pos, score in SearchEngine.search_positions(query, names, THRESHOLD, LIMIT, index=index)
+    ]
+
+
+def time_per_query(fn, queries: list) -> tuple:
+    fn(queries[0])  # warm-up (lazy native init)
+    start = time.perf_counter()
+    results = [fn(query) for query in queries]
+    return (time.perf_counter() - start) * 1000 / len(queries), results
+
+
+def benchmark(base: list, size: int, n_queries: int, n_full_scan: int, backends: list) -> dict:
+    """Timings and identity check of one name list size"""
+    names = synthesize_names(base, size)
+    queries = make_queries(base, n_queries)
+    norms = [SearchEngine.normalize_turkish(name) for name in names]
+    row = {"size": size, "queries": len(queries), "kernel": {}, "search": {}}
+
+    print(f"\n📊 {size:,} names, {len(queries)} queries")
+    print("-" * 60)
+
+    # Distance kernel: one query against every name
+    for backend in backends:
+        kernel_ms, _ = time_per_query(lambda q: batch_levenshtein(q, norms, backend=backend), queries[:10])
+        row["kernel"][backend] = kernel_ms
+        print(f"   kernel   {backend:<10} {kernel_ms:10.2f} ms/query (all {size:,} distances)")
+
+    # Reference: original full scan (DP Levenshtein on every name)
+    checked = queries[:n_full_scan]
+    full_ms, reference = time_per_query(lambda q: full_scan(q, names), checked)
+    row["full_scan"] = full_ms
+    row["checked"] = len(checked)
+    print(f"   search   {'full-scan':<10} {full_ms:10.2f} ms/query ({len(checked)} queries)")
+
+    for backend in backends:
+        start = time.perf_counter()
+        index = TrigramIndex(names, backend=backend)
+        build_s = time.perf_counter() - start
+
+        ms, results = time_per_query(lambda q: indexed_search(index, q, names), queries)
+        mismatched = [query for query, a, b in zip(checked, results, reference) if a != b]
+        row["search"][backend] = {"ms": ms, "build_s": build_s, "mismatches": len(mismatched)}
+
+        status = "✅ identical" if not mismatched else f"❌ {len(mismatched)} mismatches"
+        print(f"   search   {backend:<10} {ms:10.2f} ms/query  x{full_ms / ms:,.0f} vs full scan  "
+              f"(index build {build_s:.1f}s) {status} ({len(checked)} queries)")
+        for query in mismatched[:5]:
+            print(f"      mismatch: '{query}'")
+
+    return row
+
+
+def write_report(rows: list, backends: list, path: Path):
+    """Markdown table of the benchmark results"""
+    lines = [
+        "# Fuzzy Search Benchmark",
+        "",
+        f"Generated by `scripts/benchmark_fuzzy_search.py` on {date.today().isoformat()} "
+        f"(Python {platform.python_version()}, {platform.machine()}).",
+        "",
+        "Per-query latency in ms. *Identical* = queries whose (name, score) list",
+        "equals the original full scan (`SearchEngine.calculate_relevance` on",
+        "every name).",
+        "",
+        "| names | full scan | " + " | ".join(f"{b} kernel | {b} search | {b} identical" for b in backends) + " |",
+        "|---|---|" + "---|---|---|" * len(backends),
+    ]
+    for row in rows:
+        cells = [f"{row['size']:,}", f"{row['full_scan']:.2f}"]
+        for backend in backends:
+            search = row["search"][backend]
+            cells += [
+                f"{row['kernel'][backend]:.2f}",
+                f"{search['ms']:.2f}",
+                f"{row['checked'] - search['mismatches']}/{row['checked']}",
+            ]
+        lines.append("| " + " | ".join(cells) + " |")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    print(f"\n📝 {path}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fuzzy ingredient search")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000])
+    parser.add_argument("--queries", type=int, default=300, help="Queries per size")
+    parser.add_argument("--full-scan-queries", type=int, default=None,
+                        help="Queries checked against the (slow) full scan (default: all)")
+    parser.add_argument("--backends", nargs="+", default=None, help="python and/or rapidfuzz")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="Markdown report")
+    args = parser.parse_args()
+
+    backends = args.backends or (["python", "rapidfuzz"] if RAPIDFUZZ_AVAILABLE else ["python"])
+    if "rapidfuzz" in backends and not RAPIDFUZZ_AVAILABLE:
+        print("❌ rapidfuzz kurulu değil: pip install rapidfuzz")
+        sys.exit(1)
+
+    with open(BACKEND_DIR / "data" / "ingredients.json", 'r', encoding='utf-8') as f:
+        base = [item["name"] for item in json.load(f)]
+
+    print("=" * 60)
+    print("Fuzzy Search Benchmark")
+    print("=" * 60)
+
+    n_full_scan = min(args.full_scan_queries or args.queries, args.queries)
+    rows = [benchmark(base, size, args.queries, n_full_scan, backends) for size in args.sizes]
+    write_report(rows, backends, args.output)
+    ok = all(search["mismatches"] == 0 for row in rows for search in row["search"].values())
+
+    print("\n" + "=" * 60)
+    print("✅ All backends identical to full scan" if ok else "❌ Results differ")
+    print("=" * 60)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,15 +16,15 @@ import faiss
 from db.base import SessionLocal
 from db.models import Ingredient, Recipe, Embedding
 
-# Model for Turkish text embeddings
-MODEL_NAME = "emrecan/bert-base-turkish-cased-mean-nli-stsb-tr"
-EMBEDDING_DIM = 768  # BERT base dimension
+# Same model the API uses to encode queries (SemanticSearchService.MULTILINGUAL_MODEL),
+# so query and index vectors share one embedding space
+MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
 
 def load_or_create_model():
     """Load the sentence transformer model"""
     print(f"Loading model: {MODEL_NAME}...")
     model = SentenceTransformer(MODEL_NAME)
-    print(f"✅ Model loaded. Embedding dimension: {EMBEDDING_DIM}")
+    print(f"✅ Model loaded. Embedding dimension: {model.get_sentence_embedding_dimension()}")
     return model
 
 def build_ingredient_embeddings(session, model):
@@ -41,8 +41,8 @@ def build_ingredient_embeddings(session, model):
         texts.append(text)
         ids.append(ing.id)
 
-    # Generate embeddings
-    embeddings = model.encode(texts, show_progress_bar=True, batch_size=32)
+    # Generate embeddings (L2-normalized: inner product = cosine similarity)
+    embeddings = model.encode(texts, show_progress_bar=True, batch_size=32, normalize_embeddings=True)
 
     # Store embeddings in embeddings table
     for i, ing in enumerate(ingredients):
@@ -67,6 +67,34 @@ def build_ingredient_embeddings(session, model):
 
     return embeddings, ids
 
+def save_ingredient_meta(session, ids, meta_path):
+    """
+    Save ingredient rows in index order
+
+    The API serves ingredient search results from this table instead of
+    querying the database for every hit.
+    """
+    by_id = {ing.id: ing for ing in session.query(Ingredient).all()}
+    rows = [
+        {
+            "id": ing_id,
+            "name": by_id[ing_id].name,
+            "portion_g": by_id[ing_id].portion_g,
+            "calories": by_id[ing_id].calories,
+            "fat_g": by_id[ing_id].fat_g,
+            "carbs_g": by_id[ing_id].carbs_g,
+            "protein_g": by_id[ing_id].protein_g,
+            "sugar_g": by_id[ing_id].sugar_g,
+            "fiber_g": by_id[ing_id].fiber_g
+        }
+        for ing_id in ids
+    ]
+
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(rows, f, ensure_ascii=False)
+
+    print(f"✅ Ingredient table saved to {meta_path}")
+
 def build_recipe_embeddings(session, model):
     """Generate embeddings for recipes (title + first 3 ingredients)"""
     recipes = session.query(Recipe).all()
@@ -89,8 +117,8 @@ def build_recipe_embeddings(session, model):
         print("No recipes to embed")
         return [], []
 
-    # Generate embeddings
-    embeddings = model.encode(texts, show_progress_bar=True, batch_size=32)
+    # Generate embeddings (L2-normalized: inner product = cosine similarity)
+    embeddings = model.encode(texts, show_progress_bar=True, batch_size=32, normalize_embeddings=True)
 
     # Store embeddings in embeddings table
     for i, recipe in enumerate(recipes):
@@ -121,9 +149,10 @@ def build_faiss_index(embeddings, ids, index_path):
 
     # Convert to numpy array
     embeddings_array = np.array(embeddings).astype('float32')
+    faiss.normalize_L2(embeddings_array)
 
-    # Create FAISS index (using L2 distance)
-    index = faiss.IndexFlatL2(EMBEDDING_DIM)
+    # Create FAISS index (inner product of normalized vectors = cosine similarity)
+    index = faiss.IndexFlatIP(embeddings_array.shape[1])
 
     # Add vectors to index
     index.add(embeddings_array)
@@ -136,8 +165,13 @@ def build_faiss_index(embeddings, ids, index_path):
     with open(id_map_path, 'wb') as f:
         pickle.dump(ids, f)
 
+    # Save raw vectors (memory-mapped by the API when SEMANTIC_INDEX_MMAP=true)
+    vectors_path = index_path.with_suffix('.vectors.npy')
+    np.save(vectors_path, embeddings_array)
+
     print(f"✅ FAISS index saved to {index_path}")
     print(f"✅ ID mapping saved to {id_map_path}")
+    print(f"✅ Vectors saved to {vectors_path}")
 
     return index
 
@@ -146,19 +180,19 @@ def test_search(model, index, ids, query="domates"):
     print(f"\n🔍 Testing semantic search with query: '{query}'")
 
     # Encode query
-    query_embedding = model.encode([query])
+    query_embedding = model.encode([query], normalize_embeddings=True)
 
     # Search in index
     k = 5  # Top 5 results
-    distances, indices = index.search(query_embedding.astype('float32'), k)
+    scores, indices = index.search(query_embedding.astype('float32'), k)
 
     print(f"Top {k} results:")
     session = SessionLocal()
-    for i, (dist, idx) in enumerate(zip(distances[0], indices[0])):
+    for i, (score, idx) in enumerate(zip(scores[0], indices[0])):
         ing_id = ids[idx]
         ingredient = session.query(Ingredient).filter_by(id=ing_id).first()
         if ingredient:
-            print(f"  {i+1}. {ingredient.name} (distance: {dist:.3f})")
+            print(f"  {i+1}. {ingredient.name} (cosine: {score:.3f})")
     session.close()
 
 def main():
@@ -188,6 +222,7 @@ def main():
         if ing_embeddings:
             ing_index_path = output_dir / "ingredients.index"
             ing_index = build_faiss_index(ing_embeddings, ing_ids, ing_index_path)
+            save_ingredient_meta(session, ing_ids, output_dir / "ingredients.meta.json")
 
             # Test ingredient search
             test_search(model, ing_index, ing_ids)
@@ -3,14 +3,27 @@
 Build multilingual FAISS index for recipe search
 Uses paraphrase-multilingual-MiniLM-L12-v2 model
 Supports Turkish queries → English recipes
+
+Usage:
+    python scripts/build_multilingual_embeddings.py                  # flat index
+    python scripts/build_multilingual_embeddings.py --ann ivf hnsw   # + ANN variants
+    python scripts/build_multilingual_embeddings.py --reuse-vectors --ann ivfpq
+
+ANN variants are benchmarked with held-out query texts (not recipe vectors
+already in the index) against exact IndexFlatIP ground truth; recall@10 and
+latency per nlist/nprobe (IVF) and M/efSearch (HNSW) setting are written next
+to the index as ``<index>.bench.json`` / ``<index>.bench.md`` and shown on
+/api/semantic/status.
 """
 
+import argparse
 import json
+import math
 import pickle
+import time
 import numpy as np
 import faiss
 from pathlib import Path
-from sentence_transformers import SentenceTransformer
 
 # Paths
 PROJECT_ROOT = Path(__file__).parent.parent
@@ -18,6 +31,48 @@ RECIPES_PATH = PROJECT_ROOT / "backend" / "data" / "recipes_en_full.json"
 OUTPUT_DIR = PROJECT_ROOT / "backend" / "data" / "embeddings"
 INDEX_PATH = OUTPUT_DIR / "recipes_multilingual.index"
 IDS_PATH = OUTPUT_DIR / "recipes_multilingual.ids"
+VECTORS_PATH = OUTPUT_DIR / "recipes_multilingual.vectors.npy"
+
+# ANN index variants (same row order and ID mapping as the flat index)
+ANN_INDEX_PATHS = {
+    "ivf": OUTPUT_DIR / "recipes_multilingual_ivf.index",
+    "hnsw": OUTPUT_DIR / "recipes_multilingual_hnsw.index",
+    "ivfpq": OUTPUT_DIR / "recipes_multilingual_ivfpq.index",
+}
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+# IVF-PQ: PQ_M bytes per vector (384-d -> 8 dims per sub-quantizer)
+PQ_M = 48
+PQ_NBITS = 8
+
+# Benchmark settings
+BENCH_K = 10
+RERANK_CANDIDATES = 100  # IVF-PQ: candidates re-scored with exact vectors
+NPROBE_VALUES = [1, 2, 4, 8, 16, 32, 64]
+EF_SEARCH_VALUES = [16, 32, 64, 128, 256]
+# nlist = factor x ivf_nlist(N); the 1.0 variant is the one saved
+NLIST_FACTORS = [0.5, 1.0, 2.0]
+HNSW_M_VALUES = [16, 32, 48]
+
+# Held-out benchmark queries: user-style texts that are not recipe texts, so a
+# query never trivially finds its own vector. Extend with --bench-queries.
+BENCH_QUERY_TEXTS = [
+    "tavuk yemeği", "tavuklu makarna", "fırında tavuk but", "kremalı mantarlı tavuk",
+    "kıymalı patates", "köfte nasıl yapılır", "etli sebze yemeği", "kuzu incik",
+    "fırında somon", "ızgara levrek", "karides güveç", "ton balıklı salata",
+    "mercimek çorbası", "domates çorbası", "sebze çorbası", "kremalı brokoli çorbası",
+    "zeytinyağlı fasulye", "nohut yemeği", "vejetaryen akşam yemeği", "vegan tarif",
+    "glutensiz ekmek", "sütsüz tatlı", "yumurtasız kek", "şekersiz tatlı",
+    "çikolatalı kek", "elmalı turta", "limonlu cheesecake", "fırın sütlaç",
+    "kahvaltılık yumurta", "menemen", "pankek", "yulaf lapası",
+    "hızlı akşam yemeği", "15 dakikada yemek", "düşük kalorili salata", "yüksek proteinli yemek",
+    "patlıcan yemeği", "kabak mücver", "ıspanaklı börek", "peynirli poğaça",
+    "pilav tarifi", "bulgur pilavı", "fırında sebze", "mantar sote",
+    "chicken pasta", "quick weeknight dinner", "spicy beef tacos", "creamy tomato soup",
+    "grilled salmon with lemon", "vegetarian chili", "gluten free dessert", "chocolate chip cookies",
+    "roasted vegetables", "shrimp stir fry", "healthy breakfast", "apple pie",
+    "mushroom risotto", "pork chops", "lentil curry", "banana bread",
+]
 
 # Model
 MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
@@ -39,22 +94,27 @@ def create_recipe_text(recipe: dict) -> str:
     return f"{title}. {ingredients_text}"
 
 
-def main():
-    print("=" * 60)
-    print("Building Multilingual Recipe Embeddings")
-    print("=" * 60)
+def load_model():
+    """Load the multilingual sentence encoder"""
+    from sentence_transformers import SentenceTransformer
 
-    # Load recipes
-    print(f"\n📂 Loading recipes from {RECIPES_PATH}...")
-    with open(RECIPES_PATH, 'r', encoding='utf-8') as f:
-        recipes = json.load(f)
-    print(f"✅ Loaded {len(recipes)} recipes")
-
-    # Load model
     print(f"\n🤖 Loading model: {MODEL_NAME}...")
     model = SentenceTransformer(MODEL_NAME)
     embedding_dim = model.get_sentence_embedding_dimension()
     print(f"✅ Model loaded. Embedding dimension: {embedding_dim}")
+    return model
+
+
+def encode_queries(model, texts: list) -> np.ndarray:
+    """Encode query texts as normalized float32 vectors (as the API does)"""
+    queries = np.asarray(model.encode(texts, show_progress_bar=False), dtype='float32')
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def encode_recipes(recipes: list) -> tuple:
+    """Encode recipes with the multilingual model, return (matrix, ids, model)"""
+    model = load_model()
 
     # Prepare texts
     print("\n📝 Preparing recipe texts...")
@@ -87,13 +147,236 @@ def main():
     # Normalize for cosine similarity
     faiss.normalize_L2(embeddings_matrix)
 
+    return embeddings_matrix, ids, model
+
+
+def ivf_nlist(n_vectors: int) -> int:
+    """Number of IVF cells: ~4*sqrt(N), keeping >= 39 training points per cell"""
+    return max(1, min(int(4 * math.sqrt(n_vectors)), n_vectors // 39))
+
+
+def pq_m(dim: int) -> int:
+    """Largest sub-quantizer count <= PQ_M that divides the dimension"""
+    m = min(PQ_M, dim)
+    while dim % m:
+        m -= 1
+    return m
+
+
+def build_ann_index(index_type: str, embeddings_matrix: np.ndarray,
+                    nlist: int = None, hnsw_m: int = HNSW_M):
+    """
+    Build an IVF-Flat, HNSW or IVF-PQ index over normalized vectors (inner product)
+
+    Args:
+        nlist: IVF cells (default: ivf_nlist(N))
+        hnsw_m: HNSW graph degree
+    """
+    n_vectors, dim = embeddings_matrix.shape
+    nlist = nlist or ivf_nlist(n_vectors)
+
+    if index_type == "ivf":
+        print(f"   IVF-Flat: nlist={nlist}")
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFFlat(quantizer, dim, nlist, faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings_matrix)
+    elif index_type == "hnsw":
+        print(f"   HNSW: M={hnsw_m}, efConstruction={HNSW_EF_CONSTRUCTION}")
+        index = faiss.IndexHNSWFlat(dim, hnsw_m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    elif index_type == "ivfpq":
+        m = pq_m(dim)
+        print(f"   IVF-PQ: nlist={nlist}, m={m}, nbits={PQ_NBITS} ({m * PQ_NBITS // 8} bytes/vector)")
+        quantizer = faiss.IndexFlatIP(dim)
+        index = faiss.IndexIVFPQ(quantizer, dim, nlist, m, PQ_NBITS, faiss.METRIC_INNER_PRODUCT)
+        index.train(embeddings_matrix)
+    else:
+        raise ValueError(f"Unknown ANN index type: {index_type}")
+
+    index.add(embeddings_matrix)
+    return index
+
+
+def recall_at_k(found: np.ndarray, ground_truth: np.ndarray) -> float:
+    """Share of exact top-k rows that were returned"""
+    hits = sum(len(set(found[i][found[i] >= 0]) & set(ground_truth[i])) for i in range(len(ground_truth)))
+    return hits / ground_truth.size
+
+
+def benchmark_ann_variants(index_type: str, index, embeddings_matrix: np.ndarray):
+    """
+    (build setting, index) pairs to benchmark: the saved index plus rebuilt
+    variants with other nlist (IVF) / M (HNSW) values
+    """
+    if index_type == "hnsw":
+        return [
+            ({"M": m}, index if m == HNSW_M else build_ann_index(index_type, embeddings_matrix, hnsw_m=m))
+            for m in HNSW_M_VALUES
+        ]
+
+    default_nlist = index.nlist
+    nlists = sorted({max(1, min(int(default_nlist * factor), len(embeddings_matrix) // 39 or 1))
+                     for factor in NLIST_FACTORS})
+    return [
+        ({"nlist": nlist}, index if nlist == default_nlist else build_ann_index(index_type, embeddings_matrix, nlist=nlist))
+        for nlist in nlists
+    ]
+
+
+def benchmark_ann_index(index_type: str, index, flat_index, embeddings_matrix: np.ndarray,
+                        queries: np.ndarray) -> dict:
+    """
+    Measure recall@10 and latency for each nlist/nprobe (IVF) or M/efSearch
+    (HNSW) setting
+
+    Queries are held-out query embeddings (not rows of the index); ground
+    truth is the exact top-10 of the flat IndexFlatIP.
+    """
+    _, ground_truth = flat_index.search(queries, BENCH_K)
+
+    is_ivf = index_type in ("ivf", "ivfpq")
+    search_param = "nprobe" if is_ivf else "efSearch"
+
+    rows = []
+    for build_setting, variant in benchmark_ann_variants(index_type, index, embeddings_matrix):
+        values = [v for v in NPROBE_VALUES if v <= variant.nlist] if is_ivf else EF_SEARCH_VALUES
+        for value in values:
+            if is_ivf:
+                variant.nprobe = value
+            else:
+                variant.hnsw.efSearch = value
+
+            # One query at a time, like the API does
+            start = time.perf_counter()
+            found = np.empty_like(ground_truth)
+            for i in range(len(queries)):
+                _, I = variant.search(queries[i:i + 1], BENCH_K)
+                found[i] = I[0]
+            latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+            recall = recall_at_k(found, ground_truth)
+
+            row = {
+                **build_setting,
+                search_param: value,
+                "recall_at_10": round(recall, 4),
+                "latency_ms": round(latency_ms, 3),
+            }
+            setting = "  ".join(f"{name}={v:<4}" for name, v in {**build_setting, search_param: value}.items())
+            line = f"   {setting} recall@10={recall:.4f}  latency={latency_ms:.3f}ms"
+
+            if index_type == "ivfpq":
+                # Exact re-rank of the top candidates from the raw vectors
+                start = time.perf_counter()
+                reranked = np.full_like(ground_truth, -1)
+                for i in range(len(queries)):
+                    _, I = variant.search(queries[i:i + 1], max(BENCH_K, RERANK_CANDIDATES))
+                    candidates = I[0][I[0] >= 0]
+                    exact = embeddings_matrix[candidates] @ queries[i]
+                    top = candidates[np.argsort(-exact)[:BENCH_K]]
+                    reranked[i, :len(top)] = top
+                rerank_latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+                rerank_recall = recall_at_k(reranked, ground_truth)
+
+                row["rerank_candidates"] = RERANK_CANDIDATES
+                row["rerank_recall_at_10"] = round(rerank_recall, 4)
+                row["rerank_latency_ms"] = round(rerank_latency_ms, 3)
+                line += f"  | rerank@{RERANK_CANDIDATES}: recall@10={rerank_recall:.4f}  latency={rerank_latency_ms:.3f}ms"
+
+            rows.append(row)
+            print(line)
+
+    # Flat baseline for comparison
+    start = time.perf_counter()
+    for i in range(len(queries)):
+        flat_index.search(queries[i:i + 1], BENCH_K)
+    flat_latency_ms = (time.perf_counter() - start) * 1000 / len(queries)
+    print(f"   flat baseline     recall@10=1.0000  latency={flat_latency_ms:.3f}ms")
+
+    return {
+        "index_type": index_type,
+        "ntotal": index.ntotal,
+        "index_bytes": int(faiss.serialize_index(index).size),
+        "saved_setting": {"M": HNSW_M} if index_type == "hnsw" else {"nlist": index.nlist},
+        "queries": len(queries),
+        "query_source": "held-out query texts",
+        "flat_latency_ms": round(flat_latency_ms, 3),
+        "settings": rows,
+    }
+
+
+def benchmark_markdown(report: dict) -> str:
+    """Benchmark report as a Markdown table (for DEPLOYMENT_GUIDE.md)"""
+    columns = [c for c in ("nlist", "M", "nprobe", "efSearch", "recall_at_10", "latency_ms",
+                           "rerank_recall_at_10", "rerank_latency_ms")
+               if any(c in row for row in report["settings"])]
+    lines = [
+        f"{report['index_type']}: {report['ntotal']} vectors, {report['queries']} held-out queries, "
+        f"saved {report['saved_setting']}, flat latency {report['flat_latency_ms']} ms",
+        "",
+        "| " + " | ".join(columns) + " |",
+        "|" + "|".join("---" for _ in columns) + "|",
+    ]
+    for row in report["settings"]:
+        lines.append("| " + " | ".join(str(row.get(c, "")) for c in columns) + " |")
+    return "\n".join(lines) + "\n"
+
+
+def load_bench_queries(path) -> list:
+    """Held-out benchmark query texts (built-in list + optional file, one per line)"""
+    texts = list(BENCH_QUERY_TEXTS)
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            texts.extend(line.strip() for line in f if line.strip())
+    return list(dict.fromkeys(texts))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Build multilingual recipe FAISS indices")
+    parser.add_argument(
+        "--ann", nargs="*", choices=sorted(ANN_INDEX_PATHS), default=[],
+        help="Also build approximate (ANN) index variants"
+    )
+    parser.add_argument(
+        "--reuse-vectors", action="store_true",
+        help=f"Reuse {VECTORS_PATH.name} and IDs instead of re-encoding recipes"
+    )
+    parser.add_argument(
+        "--bench-queries", type=Path, default=None,
+        help="Extra held-out benchmark query texts (one per line)"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("=" * 60)
+    print("Building Multilingual Recipe Embeddings")
+    print("=" * 60)
+
+    model = None
+    if args.reuse_vectors and VECTORS_PATH.exists() and IDS_PATH.exists():
+        print(f"\n♻️ Reusing vectors from {VECTORS_PATH}...")
+        embeddings_matrix = np.load(VECTORS_PATH)
+        with open(IDS_PATH, 'rb') as f:
+            ids = pickle.load(f)
+        recipes = None
+    else:
+        # Load recipes
+        print(f"\n📂 Loading recipes from {RECIPES_PATH}...")
+        with open(RECIPES_PATH, 'r', encoding='utf-8') as f:
+            recipes = json.load(f)
+        print(f"✅ Loaded {len(recipes)} recipes")
+
+        embeddings_matrix, ids, model = encode_recipes(recipes)
+
     # Create FAISS index
     print("\n🏗️ Building FAISS index...")
-    index = faiss.IndexFlatIP(embedding_dim)  # Inner product for cosine similarity
+    index = faiss.IndexFlatIP(embeddings_matrix.shape[1])  # Inner product for cosine similarity
     index.add(embeddings_matrix)
     print(f"✅ Index contains {index.ntotal} vectors")
 
-    # Save index and IDs
+    # Save index, IDs and raw vectors
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
     print(f"\n💾 Saving index to {INDEX_PATH}...")
@@ -103,20 +386,51 @@ def main():
     with open(IDS_PATH, 'wb') as f:
         pickle.dump(ids, f)
 
+    print(f"💾 Saving vectors to {VECTORS_PATH}...")
+    np.save(VECTORS_PATH, embeddings_matrix)
+
+    # ANN variants
+    if args.ann:
+        if model is None:
+            model = load_model()
+        bench_texts = load_bench_queries(args.bench_queries)
+        bench_queries = encode_queries(model, bench_texts)
+        print(f"\n📋 Benchmark: {len(bench_texts)} held-out query texts")
+
+    for index_type in args.ann:
+        ann_path = ANN_INDEX_PATHS[index_type]
+        print(f"\n🏗️ Building {index_type.upper()} index...")
+        ann_index = build_ann_index(index_type, embeddings_matrix)
+
+        print(f"📊 Benchmarking {index_type.upper()} (recall@{BENCH_K} vs. flat)...")
+        report = benchmark_ann_index(index_type, ann_index, index, embeddings_matrix, bench_queries)
+
+        print(f"💾 Saving {index_type.upper()} index to {ann_path}...")
+        faiss.write_index(ann_index, str(ann_path))
+        with open(ann_path.with_suffix('.bench.json'), 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        with open(ann_path.with_suffix('.bench.md'), 'w', encoding='utf-8') as f:
+            f.write(benchmark_markdown(report))
+
     print("\n" + "=" * 60)
     print("✅ DONE! Multilingual embeddings created successfully.")
     print(f"   Index: {INDEX_PATH}")
     print(f"   IDs: {IDS_PATH}")
+    for index_type in args.ann:
+        print(f"   {index_type.upper()} index: {ANN_INDEX_PATHS[index_type]}")
     print(f"   Total vectors: {index.ntotal}")
     print("=" * 60)
 
+    if model is None or recipes is None:
+        return
+
     # Quick test
     print("\n🧪 Quick test: searching for 'tavuk yemeği'...")
     test_query = "tavuk yemeği"
-    query_embedding = model.encode([test_query])
-    faiss.normalize_L2(query_embedding.reshape(1, -1).astype('float32'))
+    query_embedding = model.encode([test_query]).astype('float32')
+    faiss.normalize_L2(query_embedding)
 
-    D, I = index.search(query_embedding.astype('float32'), 5)
+    D, I = index.search(query_embedding, 5)
 
     print(f"Top 5 results for '{test_query}':")
     for i, (dist, idx) in enumerate(zip(D[0], I[0])):
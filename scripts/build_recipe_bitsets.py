@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Build recipe x ingredient bitset matrices ("what can I cook" queries)
+
+Usage:
+    python scripts/build_recipe_bitsets.py                    # DB + recipes_en_full.json
+    python scripts/build_recipe_bitsets.py --source db
+    python scripts/build_recipe_bitsets.py --source en_full --min-df 5
+
+Outputs (backend/data/embeddings/):
+    recipe_bitsets_db.npz       rows = recipes table, terms = canonical
+                                ingredients of available_ingredients (+
+                                recipe_ingredients links); stamped with the
+                                recipe count / max id / recipes data version
+                                so the API can detect a stale artifact
+    recipe_bitsets_en_full.npz  rows = recipes_en_full.json ids; used for the
+                                recipes_en.json recipes in JSON demo mode
+
+recipes_en_full.json only has free-text ingredient lines ("2 Tbsp. finely
+chopped sage"). Each line is reduced to an ingredient phrase by dropping
+quantities, units and preparation words ("sage"); phrases used by at least
+--min-df recipes form the vocabulary. Rerun after reseeding or editing recipe
+ingredients.
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+BACKEND_DIR = PROJECT_ROOT / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services.recipe_bitset import (  # noqa: E402
+    RecipeBitsetMatrix,
+    artifact_path,
+    build_matrix_from_db,
+)
+from services.recipe_index import canonical_ingredient  # noqa: E402
+
+RECIPES_EN_FULL_PATH = BACKEND_DIR / "data" / "recipes_en_full.json"
+
+# Words that describe amount / preparation, not the ingredient itself
+NON_INGREDIENT_WORDS = {
+    "a", "an", "and", "or", "of", "the", "to", "for", "with", "into", "about", "plus",
+    "more", "total", "each", "divided", "optional", "taste", "serving", "garnish",
+    "cup", "cups", "tbsp", "tsp", "tablespoon", "tablespoons", "teaspoon", "teaspoons",
+    "lb", "lbs", "pound", "pounds", "oz", "ounce", "ounces", "g", "kg", "ml", "l", "qt",
+    "quart", "quarts", "pint", "pints", "gallon", "can", "cans", "jar", "jars",
+    "package", "packages", "pkg", "bunch", "bunches", "clove", "cloves", "sprig",
+    "sprigs", "pinch", "dash", "handful", "slice", "slices", "stick", "sticks", "piece",
+    "pieces", "head", "heads", "inch", "large", "small", "medium", "whole", "fresh",
+    "freshly", "finely", "coarsely", "roughly", "thinly", "chopped", "minced", "sliced",
+    "diced", "grated", "ground", "crushed", "peeled", "melted", "softened", "cold",
+    "warm", "hot", "room", "temperature", "cut", "trimmed", "halved", "quartered",
+    "packed", "thawed", "frozen", "drained", "rinsed", "torn", "shredded", "cubed",
+    "toasted", "cooked", "uncooked", "dried", "extra", "virgin", "kosher", "unsalted",
+}
+_WORD_RE = re.compile(r"\w+")
+_PARENTHESES_RE = re.compile(r"\([^)]*\)")
+
+
+def ingredient_phrases(line: str):
+    """Candidate ingredient phrases of a free-text line, longest first"""
+    text = _PARENTHESES_RE.sub(" ", str(line).lower()).split(",")[0]
+    # isalpha: also drops vulgar fractions ("¾"), which \w matches
+    words = [w for w in _WORD_RE.findall(text) if w.isalpha() and w not in NON_INGREDIENT_WORDS]
+    if not words:
+        return []
+    phrases = [canonical_ingredient(" ".join(words[-2:]))]
+    if len(words) > 1:
+        phrases.append(canonical_ingredient(words[-1]))
+    return phrases
+
+
+def build_en_full(min_df: int) -> RecipeBitsetMatrix:
+    """Matrix over recipes_en_full.json"""
+    with open(RECIPES_EN_FULL_PATH, 'r', encoding='utf-8') as f:
+        recipes = json.load(f)
+    print(f"Loaded {len(recipes)} recipes from {RECIPES_EN_FULL_PATH.name}")
+
+    candidates = {}
+    df = Counter()
+    for recipe in recipes:
+        lines = [ingredient_phrases(line) for line in recipe.get('ingredients') or []]
+        candidates[recipe['id']] = lines
+        df.update({phrase for phrases in lines for phrase in phrases})
+
+    vocabulary = sorted(phrase for phrase, count in df.items() if count >= min_df)
+    in_vocabulary = set(vocabulary)
+    print(f"Vocabulary: {len(vocabulary)} phrases (min_df={min_df}, {len(df)} distinct)")
+
+    pairs = []
+    for recipe_id, lines in candidates.items():
+        for phrases in lines:
+            term = next((phrase for phrase in phrases if phrase in in_vocabulary), None)
+            if term:
+                pairs.append((recipe_id, term))
+
+    return RecipeBitsetMatrix.from_pairs(
+        [recipe['id'] for recipe in recipes],
+        pairs,
+        allergen_texts={recipe['id']: " ".join(recipe.get('ingredients') or []) for recipe in recipes},
+        vocabulary=vocabulary
+    )
+
+
+def build_db() -> RecipeBitsetMatrix:
+    """Matrix over the database (available_ingredients + recipe_ingredients)"""
+    from db.base import SessionLocal
+
+    session = SessionLocal()
+    try:
+        return build_matrix_from_db(session)
+    finally:
+        session.close()
+
+
+def report(name: str, matrix: RecipeBitsetMatrix, path: Path, elapsed: float):
+    """Print matrix stats and a sample query latency"""
+    sizes = matrix.sizes
+    print(f"✅ {name}: {len(matrix)} recipes x {len(matrix.vocabulary)} terms "
+          f"({matrix.n_words} words/row, {matrix.bits.nbytes / 1024:.0f} KB), "
+          f"built in {elapsed:.1f}s -> {path}")
+    if len(matrix):
+        print(f"   ingredients/recipe: mean {sizes.mean():.1f}, max {sizes.max()}, "
+              f"empty rows {int((sizes == 0).sum())}")
+        # Sample inventory: the 8 most used terms
+        columns = np.unpackbits(matrix.bits.view(np.uint8), axis=1, bitorder="little")
+        usage = columns.sum(axis=0)[:len(matrix.vocabulary)]
+        sample = [matrix.vocabulary[i] for i in np.argsort(-usage)[:8]]
+        start = time.perf_counter()
+        for _ in range(100):
+            matrix.query(sample, max_missing=2)
+        print(f"   query(max_missing=2): {(time.perf_counter() - start) * 10:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=["all", "db", "en_full"], default="all")
+    parser.add_argument("--min-df", type=int, default=3,
+                        help="en_full: minimum number of recipes using a phrase")
+    args = parser.parse_args()
+
+    if args.source in ("all", "en_full"):
+        if RECIPES_EN_FULL_PATH.exists():
+            start = time.time()
+            matrix = build_en_full(args.min_df)
+            path = artifact_path("en_full")
+            matrix.save(path)
+            report("en_full", matrix, path, time.time() - start)
+        else:
+            print(f"⚠️ {RECIPES_EN_FULL_PATH} not found. Run process_full_recipes.py first.")
+
+    if args.source in ("all", "db"):
+        start = time.time()
+        matrix = build_db()
+        path = artifact_path("db")
+        matrix.save(path)
+        report("db", matrix, path, time.time() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Export the multilingual query encoder to ONNX (optionally int8-quantized)
+Used by the API when ENCODER_BACKEND=onnx
+
+Usage:
+    python scripts/export_onnx_encoder.py              # fp32 + int8
+    python scripts/export_onnx_encoder.py --no-quantize
+
+A parity check compares ONNX embeddings with the PyTorch SentenceTransformer
+embeddings (cosine similarity per sentence) and fails if they disagree.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).parent.parent
+BACKEND_DIR = PROJECT_ROOT / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from services.encoder_backends import (  # noqa: E402
+    OnnxEncoder,
+    get_onnx_model_dir,
+    ONNX_MODEL_FILE,
+    ONNX_QUANTIZED_MODEL_FILE,
+    ONNX_CONFIG_FILE,
+)
+
+MODEL_NAME = "paraphrase-multilingual-MiniLM-L12-v2"
+OPSET = 14
+
+# Minimum per-sentence cosine similarity vs. PyTorch
+MIN_COSINE_FP32 = 0.999
+MIN_COSINE_INT8 = 0.97
+
+PARITY_SENTENCES = [
+    "tavuk", "makarna", "tavuklu makarna", "mercimek çorbası",
+    "akşam yemeği için hızlı bir şey öner", "tatlı yapmak istiyorum",
+    "glutensiz kahvaltı", "zeytinyağlı sebze yemeği", "ızgara köfte",
+    "chicken pasta", "chocolate cake", "vegan lentil soup",
+    "Roasted Salmon with Lemon and Dill", "Spicy Thai Peanut Noodles",
+    "Classic Buttermilk Pancakes. flour, buttermilk, eggs, butter, sugar",
+]
+
+
+def export_onnx(model, output_dir: Path) -> Path:
+    """Export the transformer (token embeddings) to ONNX"""
+    import torch
+
+    transformer = model[0].auto_model
+    tokenizer = model.tokenizer
+    transformer.eval()
+
+    sample = tokenizer(["örnek sorgu", "sample query"], padding=True, return_tensors="pt")
+    input_names = list(sample.keys())
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+
+    class TokenEmbeddings(torch.nn.Module):
+        def __init__(self, transformer):
+            super().__init__()
+            self.transformer = transformer
+
+        def forward(self, *inputs):
+            return self.transformer(**dict(zip(input_names, inputs)))[0]
+
+    onnx_path = output_dir / ONNX_MODEL_FILE
+    with torch.no_grad():
+        torch.onnx.export(
+            TokenEmbeddings(transformer),
+            tuple(sample[name] for name in input_names),
+            str(onnx_path),
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=OPSET,
+        )
+
+    tokenizer.save_pretrained(str(output_dir))
+    with open(output_dir / ONNX_CONFIG_FILE, 'w', encoding='utf-8') as f:
+        json.dump({
+            "model_name": MODEL_NAME,
+            "max_seq_length": model.max_seq_length,
+            "pooling": "mean",
+            "opset": OPSET,
+        }, f, indent=2)
+
+    return onnx_path
+
+
+def quantize(onnx_path: Path) -> Path:
+    """Dynamic int8 quantization of the weights"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    quantized_path = onnx_path.with_name(ONNX_QUANTIZED_MODEL_FILE)
+    quantize_dynamic(str(onnx_path), str(quantized_path), weight_type=QuantType.QInt8)
+    return quantized_path
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def time_single_queries(encode, sentences, repeats: int = 5) -> float:
+    """Average latency (ms) of batch-size-1 encodes, like API queries"""
+    encode([sentences[0]])  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for sentence in sentences:
+            encode([sentence])
+    return (time.perf_counter() - start) * 1000 / (repeats * len(sentences))
+
+
+def parity_check(model, output_dir: Path, variants: list) -> dict:
+    """Compare ONNX embeddings with PyTorch embeddings"""
+    reference = model.encode(PARITY_SENTENCES, show_progress_bar=False)
+    torch_ms = time_single_queries(
+        lambda texts: model.encode(texts, show_progress_bar=False), PARITY_SENTENCES
+    )
+    print(f"   torch        latency={torch_ms:.2f}ms/query")
+
+    report = {"sentences": len(PARITY_SENTENCES), "torch_latency_ms": round(torch_ms, 2), "variants": {}}
+    passed = True
+
+    for quantized in variants:
+        name = "int8" if quantized else "fp32"
+        threshold = MIN_COSINE_INT8 if quantized else MIN_COSINE_FP32
+        encoder = OnnxEncoder(output_dir, quantized=quantized)
+
+        cosines = cosine_rows(encoder.encode(PARITY_SENTENCES), reference)
+        latency_ms = time_single_queries(encoder.encode, PARITY_SENTENCES)
+        ok = bool(cosines.min() >= threshold)
+        passed &= ok
+
+        report["variants"][name] = {
+            "min_cosine": round(float(cosines.min()), 5),
+            "mean_cosine": round(float(cosines.mean()), 5),
+            "threshold": threshold,
+            "latency_ms": round(latency_ms, 2),
+            "passed": ok,
+        }
+        status = "✅" if ok else "❌"
+        print(f"   {status} onnx-{name:<5} min_cos={cosines.min():.5f} mean_cos={cosines.mean():.5f} "
+              f"latency={latency_ms:.2f}ms/query")
+
+    report["passed"] = passed
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export query encoder to ONNX")
+    parser.add_argument("--output-dir", type=Path, default=None, help="Default: settings.encoder_onnx_dir")
+    parser.add_argument("--no-quantize", action="store_true", help="Skip int8 dynamic quantization")
+    args = parser.parse_args()
+
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = args.output_dir or get_onnx_model_dir()
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    print("=" * 60)
+    print("Exporting Query Encoder to ONNX")
+    print("=" * 60)
+
+    print(f"\n🤖 Loading model: {MODEL_NAME}...")
+    model = SentenceTransformer(MODEL_NAME)
+    pooling = model[1].get_pooling_mode_str()
+    if pooling != "mean" or len(model) != 2:
+        print(f"❌ Unsupported pipeline (pooling={pooling}, modules={len(model)}), expected Transformer + mean Pooling")
+        sys.exit(1)
+
+    print(f"\n📦 Exporting to {output_dir}...")
+    onnx_path = export_onnx(model, output_dir)
+    print(f"✅ {onnx_path.name}: {onnx_path.stat().st_size / 1e6:.1f} MB")
+
+    variants = [False]
+    if not args.no_quantize:
+        quantized_path = quantize(onnx_path)
+        print(f"✅ {quantized_path.name}: {quantized_path.stat().st_size / 1e6:.1f} MB")
+        variants.append(True)
+
+    print("\n🧪 Parity check (cosine vs. PyTorch)...")
+    report = parity_check(model, output_dir, variants)
+    with open(output_dir / "parity.json", 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print("\n" + "=" * 60)
+    if not report["passed"]:
+        print("❌ Parity check FAILED - keep ENCODER_BACKEND=torch")
+        print("=" * 60)
+        sys.exit(1)
+    print("✅ DONE! Set ENCODER_BACKEND=onnx to use the exported encoder.")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,15 @@ import pandas as pd
 import json
 import re
 import ast
+import sys
 from pathlib import Path
 
 # Dosya yolları
 PROJECT_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / "backend"))
+
+from utils.allergen_mapping import compute_allergen_mask, get_recipe_allergen_text  # noqa: E402
+
 CSV_PATH = PROJECT_ROOT / "data" / "Food Ingredients and Recipe Dataset with Image Name Mapping.csv"
 OUTPUT_PATH = PROJECT_ROOT / "backend" / "data" / "recipes_en_full.json"
 
@@ -140,6 +145,8 @@ def process_recipes():
             'view_count': 0,
             'favorite_count': 0
         }
+        # Alerjen kategorileri (ALLERGEN_BITS), RecipeStore metin taraması yapmadan kullanır
+        recipe['allergen_mask'] = compute_allergen_mask(get_recipe_allergen_text(recipe))
 
         recipes.append(recipe)
 
@@ -12,6 +12,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
 from db.base import SessionLocal, engine, Base
 from db.models import Ingredient, Recipe
 from sqlalchemy.exc import IntegrityError
+from utils.allergen_mapping import compute_allergen_mask
+from utils.search_utils import SearchEngine
 
 def load_json_data(filename):
     """Load data from JSON file"""
@@ -125,6 +127,38 @@ def seed_recipes(session):
     session.commit()
     return count
 
+def backfill_search_forms(session):
+    """
+    Fill lower / Turkish-normalized columns that are still NULL
+    (rows written outside the ORM; ORM inserts fill them automatically)
+    """
+    count = 0
+    for ingredient in session.query(Ingredient).filter(Ingredient.name_normalized.is_(None)):
+        ingredient.name_lower = ingredient.name.lower()
+        ingredient.name_normalized = SearchEngine.normalize_turkish(ingredient.name)
+        count += 1
+
+    for recipe in session.query(Recipe).filter(Recipe.title_normalized.is_(None)):
+        recipe.title_lower = recipe.title.lower()
+        recipe.title_normalized = SearchEngine.normalize_turkish(recipe.title)
+        if recipe.available_ingredients is not None:
+            recipe.ingredients_lower = recipe.available_ingredients.lower()
+            recipe.ingredients_normalized = SearchEngine.normalize_turkish(recipe.available_ingredients)
+        count += 1
+
+    session.commit()
+    return count
+
+def backfill_allergen_masks(session):
+    """Compute recipes.allergen_mask where it is still NULL (from ALLERGEN_DERIVATIVES)"""
+    count = 0
+    for recipe in session.query(Recipe).filter(Recipe.allergen_mask.is_(None)):
+        recipe.allergen_mask = compute_allergen_mask(recipe.available_ingredients or "")
+        count += 1
+
+    session.commit()
+    return count
+
 def main():
     """Main seed function"""
     print("Starting database seed...")
@@ -138,6 +172,12 @@ def main():
         existing_ingredients = session.query(Ingredient).count()
         if existing_ingredients > 0:
             print(f"Database already contains {existing_ingredients} ingredients. Skipping seed.")
+            backfilled = backfill_search_forms(session)
+            if backfilled:
+                print(f"✅ Search columns backfilled for {backfilled} rows")
+            masked = backfill_allergen_masks(session)
+            if masked:
+                print(f"✅ Allergen masks computed for {masked} recipes")
             return
 
         # Seed data
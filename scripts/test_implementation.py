@@ -3,14 +3,22 @@ Test script for database and semantic search implementation
 """
 import sys
 import os
+import json
+import random
 import time
-import requests
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
 
 # Add parent directory to path
-sys.path.append(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+sys.path.append(PROJECT_ROOT)
+sys.path.append(os.path.join(PROJECT_ROOT, "backend"))
 
 from db.base import SessionLocal
-from db.models import Ingredient, Recipe
+from db.models import Base, Ingredient, Recipe
+
+DEMO_RECIPES_PATH = os.path.join(PROJECT_ROOT, "backend", "data", "recipes.json")
+INGREDIENTS_PATH = os.path.join(PROJECT_ROOT, "backend", "data", "ingredients.json")
 
 def test_database():
     """Test database connectivity and data"""
@@ -41,10 +49,219 @@ def test_database():
     finally:
         session.close()
 
+def test_recommend_db_mode():
+    """Test /recommend logic (RecipeService) on a database seeded like seed scripts do"""
+    print("\n=== Testing Recommendations (DB mode) ===")
+    from services.recipe_service import RecipeService
+    from services.recipe_repository import RecipeRepository
+
+    # In-memory DB: only recipes.available_ingredients is filled, recipe_ingredients stays empty
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        with open(DEMO_RECIPES_PATH, 'r', encoding='utf-8') as f:
+            for r in json.load(f):
+                session.add(Recipe(
+                    title=r['title'],
+                    cooking_time=r['cooking_time'],
+                    calories=r['calories'],
+                    servings=r['servings'],
+                    recommendation_reason=r['recommendation_reason'],
+                    available_ingredients=r['available_ingredients'],
+                    instructions=json.dumps(r['instructions'], ensure_ascii=False)
+                ))
+        # Recipe ingredients are matched by whole-word prefix: "tavuk" -> "tavuk göğsü"
+        session.add(Recipe(title="Yogurtlu Tavuk", cooking_time=25, calories=320, servings=2,
+                           available_ingredients="Tavuk Göğsü, Yoğurt", instructions="[]"))
+        session.commit()
+
+        service = RecipeService(db=session, repository=RecipeRepository(ttl=0))
+        inventory = ["Tavuk", "Domates", "Biber"]
+        checks = [
+            ("ranked", {}, "Tavuk Sote"),
+            ("match_all", {"match_all": True}, ["Tavuk Sote"]),
+            ("max_missing=0", {"max_missing": 0}, ["Tavuk Sote"]),
+            ("max_missing=1", {"max_missing": 1}, ["Tavuk Sote", "Yumurtali Menemen", "Yogurtlu Tavuk"]),
+        ]
+        ok = True
+        for name, kwargs, expected in checks:
+            recipes, _ = service.get_recipe_recommendations(inventory, **kwargs)
+            titles = [r.title for r in recipes]
+            passed = titles[:1] == [expected] if isinstance(expected, str) else titles == expected
+            print(f"{'✅' if passed else '❌'} {name}: {titles}")
+            ok = ok and passed
+
+        # Word-prefix matching, not substring: "tavuk" covers "Tavuk Göğsü", "tav" nothing
+        recipes, matched = service.get_recipe_recommendations(["tavuk", "yoğurt"], max_missing=0)
+        passed = [r.title for r in recipes] == ["Yogurtlu Tavuk"] and matched == ["tavuk", "yoğurt"]
+        recipes, _ = service.get_recipe_recommendations(["tav", "yoğurt"], match_all=True)
+        passed = passed and recipes == []
+        print(f"{'✅' if passed else '❌'} whole-word prefix matching")
+        ok = ok and passed
+
+        # In-place edit: the per-version index / matrix must be rebuilt
+        recipe = session.query(Recipe).filter_by(title="Yumurtali Menemen").one()
+        recipe.available_ingredients = "Tavuk, Domates"
+        session.commit()
+        recipes, _ = service.get_recipe_recommendations(inventory, max_missing=0)
+        titles = [r.title for r in recipes]
+        passed = titles == ["Tavuk Sote", "Yumurtali Menemen"]
+        print(f"{'✅' if passed else '❌'} max_missing=0 after edit: {titles}")
+        return ok and passed
+    except Exception as e:
+        print(f"❌ Recommendation error: {e}")
+        return False
+    finally:
+        session.close()
+
+def test_allergen_matcher():
+    """Test allergen matching: substring semantics minus known false positives"""
+    print("\n=== Testing Allergen Matcher ===")
+    from utils.allergen_mapping import contains_allergen, compute_allergen_mask, get_allergen_mask
+
+    cases = [
+        # (text, allergens, expected)
+        ("eggwash", ["Yumurta"], True),
+        ("2 egg whites", ["Yumurta"], True),
+        ("sütlü tatlı", ["Süt"], True),
+        ("sütlaç", ["Süt"], True),
+        ("oatmeal", ["Gluten"], True),
+        ("nutmeg, walnuts", ["Fındık/Fıstık"], True),
+        ("peanut butter", ["Fındık/Fıstık"], True),
+        ("nutmeg", ["Fındık/Fıstık"], False),
+        ("eggplant", ["Yumurta"], False),
+        ("eggplant, egg", ["Yumurta"], True),
+        ("butternut squash", ["Süt", "Fındık/Fıstık"], False),
+        ("peanut butter", ["Süt"], False),
+        ("coconut milk", ["Süt"], False),
+        ("ground beef", ["Gluten"], False),
+        ("kekik", ["Gluten"], False),
+    ]
+    ok = True
+    for text, allergens, expected in cases:
+        found = contains_allergen(text, allergens)
+        # Precomputed masks must agree with the request-time check
+        masked = bool(compute_allergen_mask(text) & get_allergen_mask(allergens))
+        passed = found == expected and masked == expected
+        if not passed:
+            print(f"❌ '{text}' {allergens}: expected {expected}, got {found} (mask {masked})")
+        ok = ok and passed
+    print(f"{'✅' if ok else '❌'} {len(cases)} allergen cases")
+    return ok
+
+def test_search_structures():
+    """Test the fuzzy search structures against brute force (no server needed)"""
+    print("\n=== Testing Search Structures ===")
+    from utils.search_utils import (
+        RAPIDFUZZ_AVAILABLE, BKTree, PrefixTrie, SearchEngine, TrigramIndex, bit_parallel_levenshtein
+    )
+
+    with open(INGREDIENTS_PATH, "r", encoding="utf-8") as f:
+        names = [item["name"] for item in json.load(f)]
+    with open(DEMO_RECIPES_PATH, "r", encoding="utf-8") as f:
+        names += [recipe["title"] for recipe in json.load(f)]
+    rng = random.Random(42)
+    ok = True
+
+    def check(label, passed, detail=""):
+        nonlocal ok
+        if not passed:
+            print(f"❌ {label} {detail}")
+        ok = ok and passed
+
+    # Bit-parallel Levenshtein == DP Levenshtein (incl. empty and > 64 chars)
+    alphabet = "abcçdeğıioöşuü "
+    pairs = [("", ""), ("", "süt"), ("domates", "")]
+    pairs += [(rng.choice(names).lower(), rng.choice(names).lower()) for _ in range(300)]
+    pairs += [
+        ("".join(rng.choice(alphabet) for _ in range(rng.randint(0, 90))),
+         "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 90))))
+        for _ in range(300)
+    ]
+    for a, b in pairs:
+        expected = SearchEngine.levenshtein_distance(a, b)
+        check("bit_parallel_levenshtein", bit_parallel_levenshtein(a, b) == expected, f"{a!r} {b!r}")
+    print(f"   bit_parallel_levenshtein: {len(pairs)} pairs")
+
+    # Queries: names, typos of names (drop / replace a char), 2-char prefixes
+    norms = sorted({SearchEngine.normalize_turkish(name) for name in names})
+    queries = []
+    for name in rng.sample(names, 60):
+        i = rng.randrange(len(name))
+        queries += [name, name[:i] + name[i + 1:], name[:i] + rng.choice(alphabet) + name[i + 1:], name[:2]]
+    queries += ["", "a", "sut", "domtes", "tavuk gogsu", "xyzzy"]
+
+    # BK-tree == brute force, every backend
+    backends = ["python"] + (["rapidfuzz"] if RAPIDFUZZ_AVAILABLE else [])
+    tree = BKTree(norms)
+    check("BKTree size", tree.size == len(norms))
+    for query in queries:
+        query_norm = SearchEngine.normalize_turkish(query)
+        distances = [(norm, SearchEngine.levenshtein_distance(query_norm, norm)) for norm in norms]
+        for k in (0, 1, 2, 3):
+            expected = [(norm, d) for norm, d in distances if d <= k]
+            for backend in backends:
+                found = sorted(tree.search(query_norm, k, backend=backend))
+                check(f"BKTree.search[{backend}]", found == expected, f"{query!r} k={k}")
+    print(f"   BKTree.search: {len(queries)} queries x k=0..3, backends {backends}")
+
+    # Indexed search == full scan with calculate_relevance (same scores, same order)
+    indexes = {backend: TrigramIndex(names, backend=backend) for backend in backends}
+    for query in queries:
+        if not query:
+            continue
+        scores = [(pos, SearchEngine.calculate_relevance(query, name)) for pos, name in enumerate(names)]
+        for threshold in (30.0, 0.0):
+            expected = sorted(
+                ((pos, score) for pos, score in scores if score >= threshold), key=lambda x: x[1], reverse=True
+            )
+            for backend, index in indexes.items():
+                found = SearchEngine.search_positions(query, names, threshold, limit=len(names), index=index)
+                check(f"search_positions[{backend}]", found == expected, f"{query!r} threshold={threshold}")
+    print(f"   TrigramIndex search: {len(queries)} queries, backends {backends}")
+
+    # PrefixTrie == ranking every name by the documented tiers
+    trie = PrefixTrie(names, top_k=10)
+
+    def reference_completions(prefix):
+        prefix_lower = prefix.strip().lower()
+        prefix_norm = SearchEngine.normalize_turkish(prefix_lower)
+        ranked = []
+        for pos, name in enumerate(names):
+            lower, norm = name.lower(), SearchEngine.normalize_turkish(name)
+            tiers = []
+            for tier, form in ((PrefixTrie.NAME_LOWER, lower), (PrefixTrie.NAME_NORM, norm)):
+                if form.startswith(prefix_lower):
+                    tiers.append(tier)
+                elif form.startswith(prefix_norm):
+                    tiers.append(tier | 1)
+            for tier, form in ((PrefixTrie.WORD_LOWER, lower), (PrefixTrie.WORD_NORM, norm)):
+                words = PrefixTrie._word_suffixes(form)
+                if any(word.startswith(prefix_lower) for word in words):
+                    tiers.append(tier)
+                elif any(word.startswith(prefix_norm) for word in words):
+                    tiers.append(tier | 1)
+            if tiers:
+                ranked.append((min(tiers), len(name), lower, pos))
+        return [pos for *_, pos in sorted(ranked)[:10]]
+
+    prefixes = ["", "s", "su", "sut", "süt", "dom", "tav", "salca", "biber", "kırmızı", "zz"]
+    prefixes += [name[:rng.randint(1, 5)] for name in rng.sample(names, 60)]
+    for prefix in prefixes:
+        expected = reference_completions(prefix) if prefix.strip() else []
+        check("PrefixTrie.complete", trie.complete(prefix) == expected, repr(prefix))
+    print(f"   PrefixTrie.complete: {len(prefixes)} prefixes")
+
+    print(f"{'✅' if ok else '❌'} Search structures match brute force")
+    return ok
+
 def test_fuzzy_search(base_url="http://localhost:8000"):
     """Test fuzzy search endpoint"""
     print("\n=== Testing Fuzzy Search ===")
     try:
+        import requests
+
         # Test with typo
         start = time.time()
         response = requests.get(f"{base_url}/api/ingredients?q=domtes&limit=5")
@@ -70,6 +287,8 @@ def test_semantic_search(base_url="http://localhost:8000"):
     """Test semantic search endpoint"""
     print("\n=== Testing Semantic Search ===")
     try:
+        import requests
+
         # Check status first
         status_response = requests.get(f"{base_url}/api/semantic/status")
         if status_response.status_code == 200:
@@ -113,6 +332,15 @@ def main():
     # Test database
     db_ok = test_database()
 
+    # Test allergen matching
+    allergen_ok = test_allergen_matcher()
+
+    # Test search structures against brute force
+    search_ok = test_search_structures()
+
+    # Test recommendations on a seeded in-memory DB
+    recommend_ok = test_recommend_db_mode()
+
     # Test API (assuming server is running)
     print("\n⚠️ Testing API endpoints...")
 
@@ -126,6 +354,9 @@ def main():
     print("\n" + "=" * 50)
     print("📊 Test Summary:")
     print(f"   Database: {'✅ PASS' if db_ok else '❌ FAIL'}")
+    print(f"   Allergen Matcher: {'✅ PASS' if allergen_ok else '❌ FAIL'}")
+    print(f"   Search Structures: {'✅ PASS' if search_ok else '❌ FAIL'}")
+    print(f"   Recommendations (DB): {'✅ PASS' if recommend_ok else '❌ FAIL'}")
     print(f"   Fuzzy Search: {'✅ PASS' if fuzzy_ok else '❌ FAIL'}")
     if fuzzy_ok:
         print(f"      Latency: {fuzzy_latency:.1f}ms")
@@ -43,7 +43,7 @@ def test_multilingual_search():
         if results:
             print(f"   ✅ Found {len(results)} results:")
             for i, r in enumerate(results[:3], 1):
-                print(f"      {i}. {r['title']} (score: {r.get('similarity_score', 0):.4f})")
+                print(f"      {i}. {r.title} (score: {r.similarity_score:.4f})")
         else:
             print(f"   ❌ No results found!")
             all_passed = False